@@ -0,0 +1,88 @@
+"""Streaks and rolling windows: a sort-and-scan reference vs reading_analytics' bincount/cumsum.
+
+Libraries span 1950-2025 with a few gap years (so the first streak isn't
+the longest) and finish dates for about half the books. The reference
+sorts the distinct years and days and walks them, and counts each dated
+book's 30-day window with bisect - the obvious pure-Python way. Both must
+agree. The "old streak" column is quick_stats' former walk from the first
+year, which stopped at the first gap.
+
+Usage: python benchmarks/bench_analytics.py [--sizes 10000,100000,1000000]
+"""
+import argparse
+import os
+import sys
+import time
+from bisect import bisect_left
+from datetime import date
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reading_analytics import compute_analytics  # noqa: E402
+
+GAP_YEARS = {1957, 1958, 1971, 1990, 1991, 1992}
+TODAY = date(2025, 12, 31)
+
+
+def make_columns(n, seed=0):
+    rng = np.random.default_rng(seed)
+    years = rng.integers(1950, 2026, n)
+    years = np.where(np.isin(years, list(GAP_YEARS)), years + 3, years)
+    day_in_year = rng.integers(0, 365, n)
+    days = (years - 1970) * 365 + (years - 1969) // 4 + day_in_year  # close enough to a calendar
+    days = np.where(rng.random(n) < 0.5, days, np.nan)
+    pages = np.where(rng.random(n) < 0.85, rng.integers(80, 1200, n), np.nan)
+    return years.astype(np.float64), pages, days
+
+
+def longest_run(sorted_values):
+    best, run = 0, 0
+    for i, value in enumerate(sorted_values):
+        run = run + 1 if i and value == sorted_values[i - 1] + 1 else 1
+        best = max(best, run)
+    return best
+
+
+def reference(years, days):
+    distinct_years = sorted(set(int(y) for y in years))
+    dated = sorted(int(d) for d in days if d == d)
+    best_30 = max((i + 1 - bisect_left(dated, day - 29) for i, day in enumerate(dated)), default=0)
+    return longest_run(distinct_years), longest_run(sorted(set(dated))), best_30
+
+
+def old_streak(years):
+    present = set(int(y) for y in years)
+    start, streak = min(present), 0
+    while start + streak in present:
+        streak += 1
+    return streak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    args = parser.parse_args()
+
+    print(f"{'books':>10}{'reference':>12}{'analytics':>12}{'speedup':>9}"
+          f"{'longest':>9}{'old streak':>12}{'days':>6}{'best 30d':>10}")
+    for n in (int(s) for s in args.sizes.split(',')):
+        years, pages, days = make_columns(n)
+        start = time.perf_counter()
+        expected = reference(years, days)
+        reference_time = time.perf_counter() - start
+        start = time.perf_counter()
+        analytics = compute_analytics(years, pages, days, today=TODAY)
+        analytics_time = time.perf_counter() - start
+        got = (analytics['streaks']['years']['longest']['length'],
+               analytics['streaks']['days']['longest']['length'],
+               analytics['windows']['30_days']['best_books'])
+        assert got == expected, (got, expected)
+        print(f"{n:>10,}{reference_time * 1e3:>10.1f}ms{analytics_time * 1e3:>10.1f}ms"
+              f"{reference_time / analytics_time:>8.1f}x{got[0]:>9}{old_streak(years):>12}"
+              f"{got[1]:>6}{got[2]:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Load test of book_api: requests/sec and latency percentiles at 100k books.
+
+The server runs in its own process over a synthetic library; client
+threads each hold a keep-alive connection and ask for gzip. They draw
+from a fixed pool of requests: pages of /books (sorted and filtered),
+/books/<id>, /search and /stats. There are three phases:
+
+    first       every pooled request once - each one rendered from the index
+    repeat      random requests from the pool - rendered responses come from the cache
+    revalidate  the same, sending If-None-Match - answered 304 with no body
+
+Then a journal edit is appended and the time until the server answers
+with the new data is measured (its mtime check plus a full reload).
+The client shares the machine with the server, so on few cores these
+numbers are a floor.
+
+Usage: python benchmarks/bench_api.py [--books 100000] [--clients 8] [--seconds 10]
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import COMMON, GENRES, make_library  # noqa: E402
+
+SORTS = ('title', 'author', 'rating', 'year_read', 'pages')
+
+
+def request_pool(rng, books, size):
+    """``size`` distinct request paths, about the mix a dashboard session makes"""
+    pool = set()
+    while len(pool) < size:
+        kind = rng.random()
+        if kind < 0.35:
+            path = '/books?' + urlencode({'page': rng.randint(1, 200), 'sort': rng.choice(SORTS),
+                                          'order': rng.choice(('asc', 'desc'))})
+        elif kind < 0.5:
+            path = '/books?' + urlencode({'year': rng.randint(1990, 2025), 'genre': rng.choice(GENRES),
+                                          'page': rng.randint(1, 3)})
+        elif kind < 0.75:
+            path = f"/books/{rng.randrange(books)}"
+        elif kind < 0.95:
+            path = '/search?' + urlencode({'q': ' '.join(rng.sample(COMMON, rng.randint(1, 2)))})
+        else:
+            path = '/stats'
+        pool.add(path)
+    return sorted(pool)
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+def run_phase(port, paths, clients, seconds=None, etags=None):
+    """(latencies, statuses, bytes) from ``clients`` threads - over ``paths`` once, or randomly for ``seconds``"""
+    latencies, statuses, received = [], {}, [0]
+    lock = threading.Lock()
+    queue = list(paths)
+
+    def client(seed):
+        rng = random.Random(seed)
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        mine, counts, size = [], {}, 0
+        stop_at = time.perf_counter() + seconds if seconds else None
+        while True:
+            if stop_at is None:
+                with lock:
+                    if not queue:
+                        break
+                    path = queue.pop()
+            elif time.perf_counter() < stop_at:
+                path = rng.choice(paths)
+            else:
+                break
+            headers = {'Accept-Encoding': 'gzip'}
+            if etags is not None and seconds and path in etags:
+                headers['If-None-Match'] = etags[path]
+            start = time.perf_counter()
+            conn.request('GET', path, headers=headers)
+            response = conn.getresponse()
+            body = response.read()
+            mine.append(time.perf_counter() - start)
+            counts[response.status] = counts.get(response.status, 0) + 1
+            size += len(body)
+            if etags is not None and not seconds:
+                etags[path] = response.getheader('ETag')
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            received[0] += size
+            for status, count in counts.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, statuses, received[0], time.perf_counter() - start
+
+
+def get(port, path):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('GET', path)
+    body = conn.getresponse().read()
+    conn.close()
+    return json.loads(body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=100000)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--pool', type=int, default=2000, help="distinct requests")
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    data_file = os.path.join(work_dir, 'books.json')
+    with open(data_file, 'w', encoding='utf-8') as f:
+        json.dump(make_library(args.books), f)
+
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'book_api.py'), data_file,
+                               '--port', str(args.port)], stdout=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                get(args.port, '/')
+                break
+            except OSError:
+                if server.poll() is not None:
+                    raise SystemExit("❌ server didn't start")
+                time.sleep(0.05)
+        print(f"{args.books:,} books, {args.clients} clients, {os.cpu_count()} CPUs; "
+              f"server ready in {time.perf_counter() - start:.2f}s")
+
+        paths = request_pool(random.Random(0), args.books, args.pool)
+        etags = {}
+        print(f"{'phase':<12}{'requests':>10}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+              f"{'KB/req':>8}  statuses")
+        for phase, seconds, tags in (('first', None, etags), ('repeat', args.seconds, None),
+                                     ('revalidate', args.seconds, etags)):
+            latencies, statuses, received, elapsed = run_phase(args.port, paths, args.clients,
+                                                               seconds, tags)
+            print(f"{phase:<12}{len(latencies):>10,}{len(latencies) / elapsed:>9,.0f}"
+                  f"{percentile(latencies, 50) * 1e3:>9.2f}{percentile(latencies, 99) * 1e3:>9.2f}"
+                  f"{max(latencies) * 1e3:>9.1f}{received / len(latencies) / 1e3:>8.1f}  "
+                  f"{dict(sorted(statuses.items()))}")
+
+        rating = get(args.port, '/books/0').get('rating')
+        new_rating = 1 if rating != 1 else 2
+        with open(f"{data_file}.journal", 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'op': 'set', 'index': 0, 'fields': {'rating': new_rating}}) + '\n')
+        start = time.perf_counter()
+        while get(args.port, '/books/0').get('rating') != new_rating:
+            time.sleep(0.02)
+        print(f"journal edit served after {time.perf_counter() - start:.2f}s (mtime check + reload)")
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Memory per book and filter/export speed: a list of Book dataclasses vs BookCollection.
+
+Books are built from freshly parsed JSON (so every author and tag string is
+its own object, as after a real load), then the parsed dicts are dropped and
+tracemalloc reports what the books alone hold on to. The export rows write
+the whole library with write_books: the list as a dict per book, the
+collection with json_rows (checked to be the same bytes).
+
+Usage: python benchmarks/bench_book_collection.py [--books 100000]
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_collection import Book, BookCollection  # noqa: E402
+from book_store import write_books  # noqa: E402
+from synthetic import make_library  # noqa: E402
+
+
+def to_book(record):
+    return Book(title=record['title'], author=record['author'], year_read=record['year_read'],
+                date_finished=record['date_finished'], format=record['format'],
+                rating=record['rating'], pages=record['pages'], genres=record['categories'],
+                personal_tags=record['personal_tags'], summary=record['description'],
+                favorite_quotes=record['favorite_quotes'])
+
+
+def legacy_export(books):
+    """The original export_to_json loop: a dict per book, field by field"""
+    return [{
+        'title': book.title, 'author': book.author, 'year_read': book.year_read,
+        'date_finished': book.date_finished, 'format': book.format, 'rating': book.rating,
+        'pages': book.pages, 'genres': book.genres or [], 'isbn': book.isbn,
+        'personal_tags': book.personal_tags or [], 'summary': book.summary,
+        'favorite_quotes': book.favorite_quotes or [],
+        'readwise_highlights_count': book.readwise_highlights_count,
+        'reading_time_days': book.reading_time_days, 'reread': book.reread,
+        'recommended_by': book.recommended_by, 'mood_when_reading': book.mood_when_reading,
+        'location_read': book.location_read,
+    } for book in books]
+
+
+def measure(text, build):
+    """(structure, bytes it holds) for books built from ``text`` by ``build``"""
+    gc.collect()
+    tracemalloc.start()
+    records = json.loads(text)
+    books = build(to_book(record) for record in records)
+    del records
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return books, held
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=100000)
+    args = parser.parse_args()
+
+    text = json.dumps(make_library(args.books))
+    books, list_bytes = measure(text, list)
+    collection, collection_bytes = measure(text, BookCollection)
+    n = args.books
+    print(f"{n:,} books{'list':>35}{'collection':>12}")
+    print(f"{'bytes per book':<34}{list_bytes / n:>10.0f}{collection_bytes / n:>12.0f}"
+          f"   ({list_bytes / collection_bytes:.1f}x smaller)")
+
+    # Long books read in 2020, unrated
+    count, old = timed(lambda: sum(1 for b in books
+                                   if b.year_read == 2020 and b.rating is None
+                                   and b.pages and b.pages > 500))
+    mask = lambda: ((collection.column('year_read') == 2020) &  # noqa: E731
+                    collection.mask(rating=None) & (collection.column('pages') > 500))
+    new_count, new = timed(lambda: int(mask().sum()))
+    assert count == new_count
+    print(f"{'filter (year, unrated, >500 pages)':<34}{old * 1e3:>8.1f}ms{new * 1e3:>10.1f}ms")
+
+    exported, old = timed(lambda: legacy_export(books), 1)
+    streamed, new = timed(lambda: list(collection.records()), 1)
+    assert exported == streamed
+    print(f"{'export records':<34}{old * 1e3:>8.1f}ms{new * 1e3:>10.1f}ms")
+
+    out_dir = tempfile.mkdtemp()
+    old_file, new_file = os.path.join(out_dir, 'list.json'), os.path.join(out_dir, 'collection.json')
+    for style in ('indent', 'compact'):
+        _, old = timed(lambda: write_books(old_file, legacy_export(books), style), 1)
+        _, new = timed(lambda: write_books(new_file, collection.json_rows(style), style,
+                                           encoded=True), 1)
+        with open(old_file, 'rb') as a, open(new_file, 'rb') as b:
+            assert a.read() == b.read()
+        print(f"{'export_to_json (' + style + ')':<34}{old * 1e3:>8.1f}ms{new * 1e3:>10.1f}ms")
+    for path in (old_file, new_file):
+        os.remove(path)
+    os.rmdir(out_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""What the React app loads before its first paint: the whole library vs the bundle's summary.
+
+Today useBooks imports enhanced_books.json into the JS bundle, so the
+first paint waits for (and parses) every book. With dashboard_bundle the
+dashboard page needs only the summary file, whose size follows the years
+and genres rather than the book count. Sizes are raw and gzipped (as a
+server would send them). The rebuild column edits one book's rating and
+rebuilds: only that year's shard and the summary are rewritten.
+
+Usage: python benchmarks/bench_bundle.py [--sizes 1000,10000,100000]
+"""
+import argparse
+import gzip
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dashboard_bundle import write_bundle  # noqa: E402
+from synthetic import make_library  # noqa: E402
+
+
+def sizes(payload: bytes):
+    return len(payload) / 1e3, len(gzip.compress(payload)) / 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    args = parser.parse_args()
+
+    print(f"{'books':>9}{'library KB':>16}{'summary KB':>16}{'largest shard':>15}"
+          f"{'build':>9}{'rebuild':>9}{'rewritten':>11}")
+    for n in (int(s) for s in args.sizes.split(',')):
+        books = make_library(n)
+        out_dir = tempfile.mkdtemp()
+        library = json.dumps(books, indent=2).encode('utf-8')  # as enhanced_books.json is written
+
+        start = time.perf_counter()
+        write_bundle(books, out_dir)
+        build = time.perf_counter() - start
+        with open(os.path.join(out_dir, 'bundle.json'), encoding='utf-8') as f:
+            manifest = json.load(f)
+        with open(os.path.join(out_dir, manifest['summary']), 'rb') as f:
+            summary = f.read()
+        largest = max(os.path.getsize(os.path.join(out_dir, name)) for name in manifest['files']
+                      if name != manifest['summary'])
+
+        books[n // 2]['rating'] = 5 if books[n // 2]['rating'] != 5 else 4
+        start = time.perf_counter()
+        stats = write_bundle(books, out_dir)
+        rebuild = time.perf_counter() - start
+        assert stats['written'] == 2 and stats['removed'] == 2, stats
+
+        raw, zipped = sizes(library)
+        summary_raw, summary_zipped = sizes(summary)
+        print(f"{n:>9,}{raw:>9,.0f}/{zipped:<6,.0f}{summary_raw:>9,.1f}/{summary_zipped:<6,.1f}"
+              f"{largest / 1e3:>12,.0f}KB{build:>8.2f}s{rebuild:>8.2f}s"
+              f"{stats['written']:>5} of {len(manifest['files'])}")
+        shutil.rmtree(out_dir)
+
+
+if __name__ == "__main__":
+    main()
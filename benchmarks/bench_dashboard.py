@@ -0,0 +1,85 @@
+"""Compare the single-figure dashboard with panel-cached, process-pool rendering.
+
+Times the old 20x24 figure (drawn panel by panel, saved as PNG and PDF),
+then PanelRenderer from a cold cache, an unchanged rerun, and a rerun
+after editing one rating (only the rating and summary panels redraw).
+
+Usage: python benchmarks/bench_dashboard.py [--books 20000] [--dpi 150]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use('Agg')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib.pyplot as plt  # noqa: E402
+from dashboard_panels import PanelRenderer  # noqa: E402
+from reading_dashboard import ReadingAnalyzer  # noqa: E402
+from synthetic import make_library  # noqa: E402
+
+
+def legacy_dashboard(analyzer, out_dir, dpi):
+    """The original create_dashboard: one figure, every panel, every time"""
+    fig = plt.figure(figsize=(20, 24))
+    fig.suptitle('📚 YOUR READING JOURNEY (2011-2025)', fontsize=24, fontweight='bold', y=0.98)
+    gs = fig.add_gridspec(6, 2, hspace=0.3, wspace=0.2)
+    analyzer.plot_books_per_year(fig.add_subplot(gs[0, :]))
+    analyzer.plot_genre_distribution(fig.add_subplot(gs[1, 0]))
+    analyzer.plot_page_analysis(fig.add_subplot(gs[1, 1]))
+    analyzer.plot_reading_heatmap(fig.add_subplot(gs[2, :]))
+    analyzer.plot_rating_analysis(fig.add_subplot(gs[3, 0]), fig.add_subplot(gs[3, 1]))
+    analyzer.plot_top_authors(fig.add_subplot(gs[4, 0]))
+    analyzer.plot_reading_patterns(fig.add_subplot(gs[4, 1]))
+    analyzer.plot_summary_stats(fig.add_subplot(gs[5, :]))
+    plt.tight_layout()
+    plt.savefig(os.path.join(out_dir, 'legacy.png'), dpi=dpi, bbox_inches='tight')
+    plt.savefig(os.path.join(out_dir, 'legacy.pdf'), bbox_inches='tight')
+    plt.close(fig)
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<28}{time.perf_counter() - start:8.2f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=20000)
+    parser.add_argument('--dpi', type=int, default=150)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    out_dir = tempfile.mkdtemp()
+    data_file = os.path.join(out_dir, 'enhanced_books.json')
+    with open(data_file, 'w') as f:
+        json.dump(make_library(args.books), f)
+    analyzer = ReadingAnalyzer(data_file)
+    paths = [os.path.join(out_dir, 'dashboard.png'), os.path.join(out_dir, 'dashboard.pdf')]
+
+    def panels():
+        renderer = PanelRenderer(os.path.join(out_dir, 'cache'), args.workers)
+        renderer.save(renderer.render(analyzer.df, dpi=args.dpi), paths, args.dpi)
+        return renderer.stats['rendered']
+
+    print(f"{args.books:,} books, {args.dpi} dpi, {args.workers} workers")
+    timed("single figure", lambda: legacy_dashboard(analyzer, out_dir, args.dpi))
+    drawn = timed("panels, cold cache", panels)
+    print(f"{'':<28}{drawn} panels drawn")
+    timed("panels, unchanged", panels)
+
+    analyzer.df.loc[0, 'rating'] = 5 if analyzer.df.loc[0, 'rating'] != 5 else 4
+    analyzer.df['has_rating'] = analyzer.df['rating'].notna()
+    drawn = timed("panels, one rating edited", panels)
+    print(f"{'':<28}{drawn} panels drawn")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare sequential vs concurrent Google Books enrichment against a local stub server.
+
+Usage: python benchmarks/bench_enrichment.py [--books 200] [--latency 0.05]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_enrichment import EnrichmentEngine  # noqa: E402
+from simple_book_processor import get_book_info_from_api  # noqa: E402
+
+VOLUME = {
+    'totalItems': 1,
+    'items': [{'volumeInfo': {
+        'pageCount': 320,
+        'publishedDate': '1999-01-01',
+        'categories': ['Fiction'],
+        'description': 'A stub description.'
+    }}]
+}
+
+
+def start_stub_server(latency):
+    """Serve a canned Google Books response after ``latency`` seconds"""
+    body = json.dumps(VOLUME).encode('utf-8')
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=200)
+    parser.add_argument('--sequential-books', type=int, default=10,
+                        help='the old path sleeps 0.5s per book, so sample fewer')
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=100.0)
+    args = parser.parse_args()
+
+    server = start_stub_server(args.latency)
+    base_url = f"http://127.0.0.1:{server.server_port}/books/v1/volumes"
+    books = [(f"Title {i}", f"Author {i}") for i in range(args.books)]
+
+    start = time.perf_counter()
+    for title, author in books[:args.sequential_books]:
+        get_book_info_from_api(title, author, base_url=base_url)
+    sequential = args.sequential_books / (time.perf_counter() - start)
+
+    engine = EnrichmentEngine(workers=args.workers, rate=args.rate, base_url=base_url)
+    start = time.perf_counter()
+    results = engine.enrich_all(books)
+    concurrent = len(results) / (time.perf_counter() - start)
+    engine.close()
+    server.shutdown()
+
+    print(f"sequential: {sequential:8.1f} books/s")
+    print(f"concurrent: {concurrent:8.1f} books/s "
+          f"({args.workers} workers, {args.rate:.0f} req/s limit)")
+    print(f"speedup:    {concurrent / sequential:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
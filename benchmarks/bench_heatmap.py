@@ -0,0 +1,68 @@
+"""Heatmap matrix: the old per-year Dirichlet simulation vs binning real finish dates.
+
+Both start from the analyzer's columns (year_read, and finished_day for
+the new path). The error columns are the mean absolute difference from
+the true books-per-month counts of the dated books.
+
+Usage: python benchmarks/bench_heatmap.py [--sizes 10000,100000,1000000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reading_timeline import finished_days, month_matrix  # noqa: E402
+
+
+def legacy_matrix(df):
+    """The old plot_reading_heatmap: a random monthly split of each year's total"""
+    years = sorted(df['year_read'].unique())
+    np.random.seed(42)
+    yearly_totals = df['year_read'].value_counts()
+    return np.array([np.random.dirichlet(np.ones(12)) * yearly_totals.get(year, 0)
+                     for year in years])
+
+
+def make_columns(n, seed=0):
+    """year_read and date_finished for ``n`` books, read with a seasonal pattern"""
+    rng = np.random.default_rng(seed)
+    years = rng.integers(1990, 2026, n)
+    seasonal = np.array([3, 2, 2, 1, 1, 2, 4, 4, 2, 1, 1, 3], dtype=float)
+    months = rng.choice(12, n, p=seasonal / seasonal.sum()) + 1
+    days = rng.integers(1, 29, n)
+    dates = pd.Series([f"{y}-{m:02d}-{d:02d}" for y, m, d in zip(years, months, days)], dtype=object)
+    return pd.DataFrame({'year_read': years, 'date_finished': dates})
+
+
+def timed(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    args = parser.parse_args()
+
+    print(f"{'books':>10}{'simulated':>12}{'error':>8}{'parse dates':>13}{'binned':>10}{'error':>8}")
+    for n in (int(s) for s in args.sizes.split(',')):
+        df = make_columns(n)
+        truth = pd.crosstab(df['year_read'], pd.to_datetime(df['date_finished']).dt.month).to_numpy()
+        old, old_time = timed(lambda: legacy_matrix(df))
+        days, parse_time = timed(lambda: finished_days(df['date_finished']), 1)
+        (new, _, _), new_time = timed(lambda: month_matrix(df['year_read'], days))
+        print(f"{n:>10,}{old_time * 1e3:>10.1f}ms{np.abs(old - truth).mean():>8.1f}"
+              f"{parse_time * 1e3:>11.1f}ms{new_time * 1e3:>8.1f}ms{np.abs(new - truth).mean():>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
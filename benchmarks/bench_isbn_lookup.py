@@ -0,0 +1,82 @@
+"""Re-enriching a library: title search for every book vs ISBN first, batched.
+
+Offline stub providers stand in for Google Books (one ISBN per request) and
+OpenLibrary (ISBN_BATCH per bibkeys request). Title search sometimes
+returns another edition with a different page count, the way a real
+``maxResults=1`` search drifts between runs; an ISBN always finds its own
+edition. Each path runs twice to count books whose result changed.
+
+Usage: python benchmarks/bench_isbn_lookup.py [--books 2000] [--with-isbn 0.9]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_providers import ISBN_BATCH, MetadataResolver, StubProvider  # noqa: E402
+from synthetic import make_library  # noqa: E402
+
+
+def stub(name, library, coverage, delay, batch_size):
+    by_title = {(b['title'], b['author']): b for b in library}
+    by_isbn = {b['isbn']: b for b in library if b['isbn']}
+
+    def answer(title, author, isbn):
+        book = by_isbn.get(isbn) if isbn else by_title.get((title, author))
+        if book is None or random.Random(f"{name}{book['title']}").random() >= coverage:
+            return None
+        pages = book['pages'] or 300
+        if not isbn:
+            # Search ranking: now and then the first hit is another edition
+            pages += random.choice([0, 0, 0, 16, -24])
+        return {'title': book['title'], 'author': book['author'], 'pages': pages,
+                'published_year': book['published_year'],
+                'categories': book['categories'] or ['Fiction'],
+                'description': book['description'], 'isbn': book['isbn']}
+
+    return StubProvider(name, answer, delay=delay, batch_size=batch_size)
+
+
+def run(label, library, books, workers):
+    outcomes = []
+    for _ in range(2):
+        providers = [stub('google', library, 0.75, 0.02, 1),
+                     stub('openlibrary', library, 0.85, 0.05, ISBN_BATCH)]
+        resolver = MetadataResolver(providers, mode='failover', workers=workers)
+        start = time.perf_counter()
+        results = resolver.enrich_all(books)
+        seconds = time.perf_counter() - start
+        resolver.close()
+        outcomes.append(results)
+    requests = sum(p.calls for p in providers)
+    complete = sum(1 for r in results if r['pages'] and r['categories'])
+    changed = sum(1 for a, b in zip(*outcomes) if a != b)
+    print(f"\n{label}: {seconds:.2f}s, {requests:,} requests, "
+          f"{complete}/{len(books)} with pages and genres, {changed} changed between runs")
+    print(resolver.report())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=2000)
+    parser.add_argument('--with-isbn', type=float, default=0.9,
+                        help="share of the library whose ISBN is already known")
+    parser.add_argument('--workers', type=int, default=16)
+    args = parser.parse_args()
+
+    library = make_library(args.books)
+    rng = random.Random(2)
+    for i, book in enumerate(library):
+        book['isbn'] = f"978{i:010d}" if rng.random() < args.with_isbn else None
+
+    print(f"{args.books:,} books, {args.with_isbn:.0%} with a known ISBN, {args.workers} workers")
+    run("title search only", library, [(b['title'], b['author']) for b in library], args.workers)
+    run("ISBN first, batched", library, [(b['title'], b['author'], b['isbn']) for b in library],
+        args.workers)
+
+
+if __name__ == "__main__":
+    main()
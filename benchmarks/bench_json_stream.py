@@ -0,0 +1,80 @@
+"""Write and read throughput and peak memory: json.dump of a full list vs streaming.
+
+"list + json.dump" is the old save path: every book built into a list, then
+dumped with indent=2 by atomic_write_json. write_books takes the books from a generator, one at
+a time. Reading compares json.load of the whole file with iterating
+iter_books. Peak memory is tracemalloc's, measured in a separate run.
+
+Usage: python benchmarks/bench_json_stream.py [--sizes 10000,100000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_store import JSON_STYLES, atomic_write_json, iter_books, write_books  # noqa: E402
+from synthetic import make_library  # noqa: E402
+
+
+POOL = make_library(2000)
+
+
+def generate(n):
+    """``n`` distinct book dicts, made on demand (copies of a pool, so generating is cheap)"""
+    return (dict(POOL[i % len(POOL)], title=f"{POOL[i % len(POOL)]['title']} {i}")
+            for i in range(n))
+
+
+def legacy_write(path, n):
+    """The old save_results: build the list, then json.dump it (indent=2, fsynced)"""
+    atomic_write_json(path, list(generate(n)))
+
+
+def legacy_read(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return len(json.load(f))
+
+
+def run(fn):
+    """(seconds, peak MB) - timed without tracing, then traced for the peak"""
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='10000,100000')
+    args = parser.parse_args()
+
+    out_dir = tempfile.mkdtemp()
+    print(f"{'books':>8}  {'path':<26}{'MB':>7}{'write':>9}{'books/s':>10}{'peak MB':>9}"
+          f"{'read':>9}{'peak MB':>9}")
+    for n in (int(s) for s in args.sizes.split(',')):
+        cases = [('list + json.dump', 'indent', lambda p: legacy_write(p, n), legacy_read)]
+        cases += [(f"write_books {style}", style,
+                   lambda p, style=style: write_books(p, generate(n), style),
+                   lambda p: sum(1 for _ in iter_books(p))) for style in JSON_STYLES]
+        for label, style, write, read in cases:
+            path = os.path.join(out_dir, f"books-{n}-{style}.json")
+            write_seconds, write_peak = run(lambda: write(path))
+            read_seconds, read_peak = run(lambda: read(path))
+            print(f"{n:>8,}  {label:<26}{os.path.getsize(path) / 1e6:>7.1f}"
+                  f"{write_seconds:>8.2f}s{n / write_seconds:>10,.0f}{write_peak:>9.1f}"
+                  f"{read_seconds:>8.2f}s{read_peak:>9.1f}")
+            os.remove(path)
+    os.rmdir(out_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Batch stats for many readers' libraries: worker scaling, the reduce step, and a warm rerun.
+
+A directory of synthetic libraries (of mixed sizes) is run through
+library_batch with 1, 2, 4... workers up to the CPU count, from cold (no
+stored summaries or analytics) each time. The warm run repeats the batch
+with the stored files in place, as a nightly job over mostly unchanged
+libraries would. The reduce line times merging one partial cohort per
+library - the most the reduce step ever gets - which only adds counters. The cohort totals are checked against one ReadingSummary built over
+every book.
+
+Usage: python benchmarks/bench_library_batch.py [--libraries 32] [--books 20000]
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_summary import ReadingSummary  # noqa: E402
+from library_batch import CohortSummary, _map_libraries, batch_stats, discover_libraries  # noqa: E402
+from synthetic import make_library  # noqa: E402
+
+
+def clear_derived(work_dir):
+    for pattern in ('*.summary.json', '*.analytics.json'):
+        for path in glob.glob(os.path.join(work_dir, pattern)):
+            os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--libraries', type=int, default=32)
+    parser.add_argument('--books', type=int, default=20000, help="books in the largest library")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    total = 0
+    reference = ReadingSummary()
+    smallest = args.books // 10
+    for i in range(args.libraries):
+        # Sizes from a tenth of --books up to all of it, so chunks aren't equal work
+        size = smallest + (args.books - smallest) * i // max(1, args.libraries - 1)
+        books = make_library(size, seed=i)
+        reference.merge(ReadingSummary.build(books))
+        total += len(books)
+        with open(os.path.join(work_dir, f"reader{i:03d}.json"), 'w', encoding='utf-8') as f:
+            json.dump(books, f)
+    libraries = discover_libraries(work_dir)
+    cpus = os.cpu_count() or 1
+    print(f"{len(libraries)} libraries, {total:,} books, {cpus} CPUs")
+
+    counts = sorted({1, cpus} | {2 ** k for k in range(1, 8) if 2 ** k < cpus})
+    print(f"{'workers':>8}{'cold':>10}{'speedup':>9}{'books/s':>12}")
+    base = None
+    for workers in counts:
+        clear_derived(work_dir)
+        start = time.perf_counter()
+        rows, cohort = batch_stats(libraries, workers)
+        seconds = time.perf_counter() - start
+        base = base or seconds
+        assert cohort.books.total == reference.total and cohort.readers == len(libraries)
+        assert cohort.books.authors == reference.authors and cohort.books.pages_total == reference.pages_total
+        print(f"{workers:>8}{seconds:>9.2f}s{base / seconds:>8.2f}x{total / seconds:>12,.0f}")
+
+    start = time.perf_counter()
+    rows, cohort = batch_stats(libraries, cpus)
+    print(f"{'warm':>8}{time.perf_counter() - start:>9.2f}s  (stored summaries and analytics reused)")
+    partials = [_map_libraries([library])[1] for library in libraries]
+    start = time.perf_counter()
+    cohort = CohortSummary()
+    for partial in partials:
+        cohort.merge(partial)
+    print(f"{'reduce':>8}{(time.perf_counter() - start) * 1e3:>8.1f}ms  ({len(partials)} partial cohorts)")
+    assert cohort.books.authors == reference.authors
+    if cpus == 1:
+        print("⚠️  Only one CPU here, so there is no scaling to show")
+    shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Compare the nested-loop Readwise matcher with the indexed FuzzyMatcher.
+
+Readwise titles are generated from the tracked ones with subtitles, typos,
+articles and case changes, plus unrelated decoys, so precision and recall
+can be checked against the known pairs.
+
+Usage: python benchmarks/bench_matching.py [--books 20000] [--sources 20000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_matching import match_books  # noqa: E402
+from synthetic import make_library  # noqa: E402
+
+
+def legacy_match(books, sources):
+    """The original bidirectional substring check, one pair at a time"""
+    matches = {}
+    for i, (title, _) in enumerate(books):
+        for j, (rw_title, _) in enumerate(sources):
+            if title.lower() in rw_title.lower() or rw_title.lower() in title.lower():
+                matches[i] = j
+    return matches
+
+
+def perturb(rng, title):
+    choice = rng.random()
+    if choice < 0.25:
+        return f"{title}: A Novel"
+    if choice < 0.45 and len(title) > 6:
+        k = rng.randrange(3, len(title) - 1)
+        return title[:k] + title[k + 1] + title[k] + title[k + 2:]
+    if choice < 0.6:
+        return f"The {title}"
+    if choice < 0.75:
+        return title.upper()
+    return title
+
+
+def make_pairs(n_books, n_sources, seed=7):
+    rng = random.Random(seed)
+    library = make_library(n_books, seed=seed)
+    # Make titles distinct so there is exactly one right answer per book
+    books = [(f"{b['title']} {w}", b['author'])
+             for b, w in zip(library, (f"vol{i}" for i in range(n_books)))]
+    truth = {}
+    sources = []
+    for i in rng.sample(range(n_books), min(n_books, n_sources // 2)):
+        truth[i] = len(sources)
+        sources.append((perturb(rng, books[i][0]), books[i][1]))
+    decoys = make_library(n_sources - len(sources), seed=seed + 1)
+    sources.extend((f"{d['title']} extra{i}", d['author']) for i, d in enumerate(decoys))
+    return books, sources, truth
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=20000)
+    parser.add_argument('--sources', type=int, default=20000)
+    parser.add_argument('--legacy-sample', type=int, default=200,
+                        help='the nested loop is O(n*m), so time a sample and extrapolate')
+    args = parser.parse_args()
+
+    books, sources, truth = make_pairs(args.books, args.sources)
+
+    start = time.perf_counter()
+    matches = match_books(books, sources)
+    elapsed = time.perf_counter() - start
+
+    found = {m.book_index: m.source_index for m in matches}
+    correct = sum(1 for i, j in found.items() if truth.get(i) == j)
+    print(f"indexed matcher: {elapsed:.2f}s for {len(books):,} x {len(sources):,}")
+    print(f"  precision {correct / max(1, len(found)):.3f}, recall {correct / max(1, len(truth)):.3f}")
+
+    sample = books[:args.legacy_sample]
+    start = time.perf_counter()
+    legacy = legacy_match(sample, sources)
+    legacy_elapsed = (time.perf_counter() - start) * len(books) / len(sample)
+    sample_truth = {i: j for i, j in truth.items() if i < len(sample)}
+    legacy_correct = sum(1 for i, j in legacy.items() if sample_truth.get(i) == j)
+    print(f"nested loop:     ~{legacy_elapsed:.1f}s (extrapolated from {len(sample)} books)")
+    print(f"  precision {legacy_correct / max(1, len(legacy)):.3f}, "
+          f"recall {legacy_correct / max(1, len(sample_truth)):.3f} (on the sample)")
+
+
+if __name__ == "__main__":
+    main()
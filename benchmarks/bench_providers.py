@@ -0,0 +1,77 @@
+"""Google-only lookups vs the multi-provider resolver, against offline stub providers.
+
+The stubs stand in for Google Books and OpenLibrary with their own latency,
+coverage and error rate; some books appear several times (re-reads, the
+same book in two lists) so duplicate in-flight lookups get coalesced.
+Reports wall time, how many books end up with pages and genres, and the
+per-provider metrics.
+
+Usage: python benchmarks/bench_providers.py [--books 2000] [--workers 16]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_providers import MetadataResolver, StubProvider  # noqa: E402
+from synthetic import make_library  # noqa: E402
+
+
+def stub(name, library, coverage, delay, error_rate, seed, has_genres=True):
+    """A provider that knows ``coverage`` of the library (decided per title, reproducibly)"""
+    known = {(b['title'], b['author']): b for b in library}
+
+    def answer(title, author, isbn):
+        book = known.get((title, author))
+        if book is None or random.Random(f"{name}{title}").random() >= coverage:
+            return None
+        return {'title': title, 'author': author, 'pages': book['pages'] or 300,
+                'published_year': book['published_year'],
+                'categories': (book['categories'] or ['Fiction']) if has_genres else [],
+                'description': book['description'] if has_genres else None, 'isbn': None}
+
+    return StubProvider(name, answer, delay=delay, error_rate=error_rate, seed=seed)
+
+
+def run(label, providers, mode, pairs, workers):
+    resolver = MetadataResolver(providers, mode=mode, workers=workers)
+    start = time.perf_counter()
+    results = resolver.enrich_all(pairs)
+    seconds = time.perf_counter() - start
+    resolver.close()
+    complete = sum(1 for r in results if r['pages'] and r['categories'])
+    print(f"\n{label}: {seconds:.2f}s, {complete}/{len(pairs)} books with pages and genres "
+          f"({complete / len(pairs):.0%})")
+    print(resolver.report())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=2000)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--duplicates', type=float, default=0.2,
+                        help="share of lookups that repeat another book")
+    args = parser.parse_args()
+
+    library = make_library(args.books)
+    rng = random.Random(1)
+    pairs = [(b['title'], b['author']) for b in library]
+    pairs += [rng.choice(pairs) for _ in range(int(len(pairs) * args.duplicates))]
+    rng.shuffle(pairs)
+
+    def providers():
+        return [stub('google', library, coverage=0.75, delay=0.02, error_rate=0.02, seed=1),
+                stub('openlibrary', library, coverage=0.85, delay=0.04, error_rate=0.02, seed=2,
+                     has_genres=True)]
+
+    print(f"{len(pairs):,} lookups ({args.books:,} distinct books), {args.workers} workers")
+    run("google only", providers()[:1], 'failover', pairs, args.workers)
+    run("failover google -> openlibrary", providers(), 'failover', pairs, args.workers)
+    run("concurrent google + openlibrary", providers(), 'concurrent', pairs, args.workers)
+
+
+if __name__ == "__main__":
+    main()
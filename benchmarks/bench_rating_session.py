@@ -0,0 +1,82 @@
+"""Rating many books in a row: the old batch loop vs a RatingSession.
+
+The old add_ratings_batch rescanned every book for the unrated ones on
+each batch of 10 and, with "Save progress? y", flushed the journal with
+compaction - so every few hundred edits the whole library was rewritten.
+The session pops from a heap built once and appends ratings to the
+journal without compacting (and in priority order - most recent first
+here - where the old loop went in file order).
+
+Usage: python benchmarks/bench_rating_session.py [--books 100000] [--ratings 1000]
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from enhance_books import BookEnhancer  # noqa: E402
+from rating_session import RatingSession  # noqa: E402
+from synthetic import make_library  # noqa: E402
+
+
+def legacy(enhancer, ratings, batch=10):
+    """The old loop: rescan, rate 10 (rating, then tags), save"""
+    rated = []
+    while len(rated) < ratings:
+        unrated = [book for book in enhancer.books if book.get('rating') is None]
+        for book in unrated[:batch]:
+            enhancer._edit(book, rating=4)
+            enhancer._edit(book, personal_tags=['benchmark'])
+            rated.append(book['title'])
+        enhancer.store.flush()
+    return rated
+
+
+def session(enhancer, ratings):
+    rated = []
+    run = RatingSession(enhancer, 'recency', resume=False)
+    for _ in range(ratings):
+        book = run.next_book()
+        run.rate(book, 4, personal_tags=['benchmark'])
+        rated.append(book['title'])
+    run.save()
+    return rated
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=100000)
+    parser.add_argument('--ratings', type=int, default=1000)
+    args = parser.parse_args()
+
+    library = make_library(args.books)
+    work_dir = tempfile.mkdtemp()
+    source = os.path.join(work_dir, 'source.json')
+    with open(source, 'w', encoding='utf-8') as f:
+        json.dump(library, f)
+    unrated = sum(1 for book in library if book['rating'] is None)
+    print(f"{args.books:,} books ({unrated:,} unrated), rating {args.ratings:,} in a row")
+
+    results = {}
+    for label, run in (('batch rescans + flush', legacy), ('rating session', session)):
+        data_file = os.path.join(work_dir, f"{label.split()[0]}.json")
+        shutil.copy(source, data_file)
+        enhancer = BookEnhancer(data_file)
+        enhancer.store.backup_retention = 0
+        start = time.perf_counter()
+        results[label] = run(enhancer, args.ratings)
+        seconds = time.perf_counter() - start
+        journal = enhancer.store.journal_file
+        print(f"{label:<24}{seconds:>8.2f}s  {seconds / args.ratings * 1e3:>7.2f}ms/rating  "
+              f"journal {os.path.getsize(journal) / 1e3 if os.path.exists(journal) else 0:>6.0f}KB")
+    assert all(len(rated) == args.ratings for rated in results.values())
+    shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Run ReadwiseSync against a local fake Readwise API.
+
+The fake server paginates /books/ and /highlights/ with ``next`` cursors,
+honours ``updated__gt`` and ``book_id``, and can fail requests to show a
+sync resuming. Reports a full sync with 1 and N workers, an incremental
+sync after a few books change, and an interrupted-then-resumed sync.
+
+Usage: python benchmarks/bench_readwise_sync.py [--books 300] [--latency 0.02]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from readwise_sync import ReadwiseSync  # noqa: E402
+from synthetic import make_library  # noqa: E402
+
+
+class FakeReadwise:
+    """In-memory Readwise books and highlights served over HTTP"""
+
+    def __init__(self, library, highlights_per_book=12, latency=0.0, page_size=50):
+        self.latency = latency
+        self.page_size = page_size
+        self.fail_after = None  # answer 500 once this many requests were served
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.books, self.highlights = [], []
+        old = self.now() - timedelta(days=30)
+        for book_id, book in enumerate(library, 1):
+            self.books.append({'id': book_id, 'title': book['title'], 'author': book['author'],
+                               'category': 'books', 'num_highlights': highlights_per_book,
+                               'updated': old.isoformat()})
+            for n in range(highlights_per_book):
+                self.highlights.append({'id': len(self.highlights) + 1, 'book_id': book_id,
+                                        'text': f"Highlight {n} of {book['title']}",
+                                        'updated': old.isoformat()})
+
+    @staticmethod
+    def now():
+        return datetime.now(timezone.utc)
+
+    def add_highlight(self, book_id, text):
+        stamp = self.now().isoformat()
+        self.highlights.append({'id': len(self.highlights) + 1, 'book_id': book_id,
+                                'text': text, 'updated': stamp})
+        book = self.books[book_id - 1]
+        book['num_highlights'] += 1
+        book['updated'] = stamp
+
+    def page(self, path, query):
+        rows = self.books if path.endswith('/books/') else self.highlights
+        if 'book_id' in query:
+            rows = [r for r in rows if r['book_id'] == int(query['book_id'])]
+        if 'updated__gt' in query:
+            since = datetime.fromisoformat(query['updated__gt'])
+            rows = [r for r in rows if datetime.fromisoformat(r['updated']) > since]
+        page = int(query.get('page', 1))
+        size = min(int(query.get('page_size', self.page_size)), self.page_size)
+        results = rows[(page - 1) * size:page * size]
+        next_url = None
+        if page * size < len(rows):
+            next_url = f"http://{self.address}{path}?{urlencode(dict(query, page=page + 1))}"
+        return {'count': len(rows), 'next': next_url, 'results': results}
+
+    def start(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(fake.latency)
+                with fake.lock:
+                    fake.requests += 1
+                    failing = fake.fail_after is not None and fake.requests > fake.fail_after
+                if failing:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                body = json.dumps(fake.page(url.path, query)).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.address = f"127.0.0.1:{self.server.server_port}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://{self.address}/api/v2"
+
+    def stop(self):
+        self.server.shutdown()
+
+
+def run_sync(base_url, state_file, workers, retries=3):
+    syncer = ReadwiseSync('fake-token', state_file=state_file, base_url=base_url,
+                          workers=workers, rate=10000, retries=retries)
+    start = time.perf_counter()
+    try:
+        changed = syncer.sync()
+    finally:
+        syncer.close()
+    return syncer, changed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=300)
+    parser.add_argument('--highlights', type=int, default=12)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--workers', type=int, default=8)
+    args = parser.parse_args()
+
+    library = make_library(args.books)
+    fake = FakeReadwise(library, args.highlights, args.latency)
+    base_url = fake.start()
+    tmp = tempfile.mkdtemp()
+
+    for workers in (1, args.workers):
+        state_file = os.path.join(tmp, f"state-{workers}.json")
+        syncer, changed, elapsed = run_sync(base_url, state_file, workers)
+        print(f"full sync, {workers:2d} workers: {elapsed:6.2f}s, {len(changed)} books, "
+              f"{syncer.stats['highlights']} highlights, {syncer.stats['requests']} requests")
+
+    for book_id in (1, 2, 3):
+        fake.add_highlight(book_id, f"A new highlight for book {book_id}")
+    syncer, changed, elapsed = run_sync(base_url, state_file, args.workers)
+    print(f"incremental sync:        {elapsed:6.2f}s, {len(changed)} books, "
+          f"{syncer.stats['highlights']} highlights, {syncer.stats['requests']} requests")
+    assert sorted(changed) == ['1', '2', '3']
+    assert syncer.state['books']['1']['num_highlights'] == args.highlights + 1
+
+    state_file = os.path.join(tmp, "state-resume.json")
+    fake.fail_after = fake.requests + args.books // 2
+    try:
+        run_sync(base_url, state_file, args.workers, retries=0)
+    except RuntimeError as e:
+        print(f"interrupted sync:        {e}")
+    fake.fail_after = None
+    syncer, changed, elapsed = run_sync(base_url, state_file, args.workers)
+    print(f"resumed sync:            {elapsed:6.2f}s, {syncer.stats['books']} books left, "
+          f"{syncer.stats['requests']} requests")
+    assert len(syncer.state['books']) == args.books
+
+    books = [dict(b, favorite_quotes=[]) for b in library]
+    updated = syncer.apply_to_books(books)
+    print(f"applied to library:      {len(updated)} books got highlights")
+    fake.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare the linear substring scan in search_books with the inverted SearchIndex.
+
+Usage: python benchmarks/bench_search.py [--books 100000]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_search import SearchIndex  # noqa: E402
+from synthetic import make_library  # noqa: E402
+
+QUERIES = ["kaloten", "golden king", "author12", "vorsil", "winter city kal", "marelfen",
+           "Author999", "glass", "peace", "shadow road", "dream vor", "favorite", "river"]
+
+
+def legacy_search(books, query):
+    """The original BookEnhancer.search_books scan"""
+    query = query.lower()
+    return [b for b in books if query in b['title'].lower() or query in b['author'].lower()]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--books', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    books = make_library(args.books)
+
+    start = time.perf_counter()
+    index = SearchIndex(books)
+    print(f"index build: {time.perf_counter() - start:.2f}s for {len(books):,} books "
+          f"({len(index.terms):,} terms)")
+
+    start = time.perf_counter()
+    index.update(0, dict(books[0], notes="freshly edited notes"))
+    print(f"incremental update: {(time.perf_counter() - start) * 1000:.3f} ms")
+
+    print(f"\n{'query':<18}{'scan ms':>10}{'index ms':>10}{'hits':>8}")
+    for query in QUERIES:
+        scan, _ = timed(lambda: legacy_search(books, query), max(1, args.repeat // 10))
+        indexed, _ = timed(lambda: index.search(query, limit=20), args.repeat)
+        hits = len(index.search(query))
+        print(f"{query:<18}{scan:>10.2f}{indexed:>10.3f}{hits:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Cold-start time of ReadingAnalyzer: parsing enhanced_books.json vs the columnar snapshot.
+
+Each load runs in a fresh interpreter, so the timings include nothing cached
+in-process. "json" is a first run (parse, derive columns, write the
+snapshot); "snapshot" is every later run until the library changes. Large
+libraries use lean records (no description, notes or quotes) to fit in memory.
+
+Usage: python benchmarks/bench_snapshot.py [--sizes 1000,100000,1000000]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_snapshot import snapshot_dir  # noqa: E402
+from synthetic import make_library  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEAN_ABOVE = 100000
+LEAN_DROP = ('original_text', 'description', 'notes', 'favorite_quotes')
+
+# Run in the child: load once, report load seconds and peak RSS as JSON
+CHILD = """
+import json, resource, sys, time
+start = time.perf_counter()
+from reading_dashboard import ReadingAnalyzer
+analyzer = ReadingAnalyzer(sys.argv[1])
+seconds = time.perf_counter() - start
+print(json.dumps({'seconds': seconds, 'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3}))
+"""
+
+
+def write_library(path, n):
+    with open(path, 'w') as f:
+        f.write('[')
+        # In chunks so a million books never sit in memory all at once
+        for start in range(0, n, 50000):
+            books = make_library(min(50000, n - start), seed=start)
+            if n > LEAN_ABOVE:
+                books = [{k: v for k, v in b.items() if k not in LEAN_DROP} for b in books]
+            if start:
+                f.write(',')
+            f.write(json.dumps(books)[1:-1])
+        f.write(']')
+
+
+def cold_load(data_file):
+    output = subprocess.run([sys.executable, '-c', CHILD, data_file], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def directory_mb(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path)) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', default='1000,100000,1000000')
+    args = parser.parse_args()
+
+    out_dir = tempfile.mkdtemp()
+    print(f"{'books':>10}{'json MB':>9}{'snap MB':>9}{'json load':>11}{'snapshot':>10}"
+          f"{'speedup':>9}{'json RSS':>10}{'snap RSS':>10}")
+    try:
+        for n in (int(s) for s in args.sizes.split(',')):
+            data_file = os.path.join(out_dir, f"books-{n}.json")
+            write_library(data_file, n)
+            first = cold_load(data_file)
+            second = cold_load(data_file)
+            print(f"{n:>10,}{os.path.getsize(data_file) / 1e6:>9.1f}"
+                  f"{directory_mb(snapshot_dir(data_file)):>9.1f}"
+                  f"{first['seconds']:>10.2f}s{second['seconds']:>9.2f}s"
+                  f"{first['seconds'] / second['seconds']:>8.1f}x"
+                  f"{first['peak_mb']:>8.0f}MB{second['peak_mb']:>8.0f}MB")
+            os.remove(data_file)
+            shutil.rmtree(snapshot_dir(data_file), ignore_errors=True)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Import time of the CLI entry points, with a regression threshold.
+
+Each module is imported in a fresh interpreter under ``-X importtime``; the
+fastest cumulative time over a few runs is compared with ``--max-ms`` (noise
+from a busy machine only ever adds time, so the best run is the stable
+figure), and any heavyweight library (pandas, numpy, matplotlib, seaborn,
+requests) pulled in at import time counts as a failure too. Exits 1 on a
+regression, so it can run in CI.
+
+Usage: python benchmarks/bench_startup.py [--max-ms 100] [--runs 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = ['quick_stats', 'enhance_books', 'quick_fix', 'book_tracker_system',
+                'reading_dashboard', 'readwise_sync', 'library_batch',
+                'book_api']
+HEAVY = ['pandas', 'numpy', 'matplotlib', 'seaborn', 'requests']
+
+
+def import_profile(module):
+    """(cumulative microseconds for ``module``, set of top-level packages imported)"""
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+                            cwd=ROOT, check=True, capture_output=True, text=True).stderr
+    total, packages = None, set()
+    # Lines look like "import time:   self [us] | cumulative | imported package"
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or '[us]' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        packages.add(name.strip().split('.')[0])
+        if name.strip() == module:
+            total = int(cumulative)
+    return total, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--max-ms', type=float, default=100,
+                        help="fail when an entry point takes longer than this to import")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('modules', nargs='*', default=ENTRY_POINTS)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<22}{'best ms':>10}  heavy imports")
+    for module in args.modules:
+        profiles = [import_profile(module) for _ in range(args.runs)]
+        ms = min(total for total, _ in profiles) / 1000
+        heavy = sorted(set(HEAVY) & profiles[0][1])
+        slow = ms > args.max_ms
+        failed = failed or slow or bool(heavy)
+        mark = '❌' if slow or heavy else '✅'
+        print(f"{module:<22}{ms:>10.1f}  {', '.join(heavy) or '-'} {mark}")
+
+    if failed:
+        print(f"❌ startup regression (limit {args.max_ms:g} ms, no {', '.join(HEAVY)})")
+        sys.exit(1)
+    print(f"✅ every entry point imports in under {args.max_ms:g} ms")
+
+
+if __name__ == "__main__":
+    main()
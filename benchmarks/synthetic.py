@@ -0,0 +1,49 @@
+"""Synthetic libraries in the enhanced_books.json format, shared by the benchmarks."""
+import itertools
+import random
+
+COMMON = ("river night house garden war peace empire stone fire winter city light shadow "
+          "road sea king queen secret history mind money power world story time dream "
+          "wild iron glass silver silent last first long lost hidden broken golden").split()
+# A few thousand made-up words on top, drawn with a Zipf-like skew like real text
+SYLLABLES = "ka lo mi ra ten vor sil an del qu ost bri mar el fen do".split()
+WORDS = COMMON + [''.join(p) for p in itertools.product(SYLLABLES, repeat=3)]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(WORDS))]
+GENRES = ["Fiction", "History", "Biography & Autobiography", "Science", "Business & Economics",
+          "Fantasy", "Philosophy", "Psychology", "Travel", "Poetry", "Self-Help", "Religion"]
+TAGS = ["favorite", "re-read", "classic", "book-club", "audio", "gift", "slow", "fun"]
+FORMATS = ["physical", "ebook", "audio", "unknown"]
+
+
+def words(rng, k):
+    return rng.choices(WORDS, weights=WEIGHTS, k=k)
+
+
+def make_book(rng, i, start_year=1990, end_year=2025):
+    year = rng.randint(start_year, end_year)
+    title = ' '.join(w.capitalize() for w in words(rng, rng.randint(1, 4)))
+    author = f"{words(rng, 1)[0].capitalize()} Author{rng.randint(1, max(1, i // 8 + 1))}"
+    rated = rng.random() < 0.6
+    dated = rng.random() < 0.5
+    return {
+        'original_text': f"{title} by {author}",
+        'title': title,
+        'author': author,
+        'year_read': year,
+        'format': rng.choice(FORMATS),
+        'pages': rng.randint(80, 1200) if rng.random() < 0.85 else None,
+        'published_year': str(rng.randint(1850, year)),
+        'categories': rng.sample(GENRES, rng.randint(0, 2)),
+        'description': ' '.join(words(rng, rng.randint(10, 40))),
+        'rating': rng.randint(1, 5) if rated else None,
+        'personal_tags': rng.sample(TAGS, rng.randint(0, 2)),
+        'notes': ' '.join(words(rng, rng.randint(0, 12))),
+        'favorite_quotes': [' '.join(words(rng, 8))] if rng.random() < 0.1 else [],
+        'date_finished': f"{year}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if dated else None,
+    }
+
+
+def make_library(n, seed=42, start_year=1990, end_year=2025):
+    """``n`` reproducible fake books spread over ``start_year``..``end_year``"""
+    rng = random.Random(seed)
+    return [make_book(rng, i, start_year, end_year) for i in range(n)]
@@ -0,0 +1,433 @@
+import gzip
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from book_search import SearchIndex
+from book_store import data_fingerprint, load_books
+from book_summary import ReadingSummary
+from reading_analytics import book_columns, compute_analytics
+
+# Books per page unless the request asks, and the most it may ask for
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# The sorts the frontend offers (SortOptions)
+SORT_FIELDS = ('title', 'author', 'rating', 'year_read', 'pages')
+# Smaller responses aren't worth compressing
+GZIP_MIN_BYTES = 1024
+# The library files are stat'ed for changes at most this often
+RELOAD_CHECK_SECONDS = 1.0
+# Rendered responses kept per library version, by total size
+CACHE_BYTES = 64 * 1024 * 1024
+# Ranked results kept per library version, so paging through a search doesn't redo it
+SEARCHES_KEPT = 256
+TOP = 20
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Response:
+    """A rendered JSON body with its ETag, gzipped on first request"""
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = f'"{hashlib.sha1(body).hexdigest()[:20]}"'
+        self._gzipped = None
+
+    @property
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6)
+        return self._gzipped
+
+
+def _sort_key(field):
+    if field in ('title', 'author'):
+        return lambda book: (not book.get(field), (book.get(field) or '').casefold())
+
+    def key(book):
+        try:
+            return (False, float(book.get(field)))
+        except (TypeError, ValueError):
+            return (True, 0.0)  # missing values last
+    return key
+
+
+class LibraryState:
+    """One version of the library as the API serves it, never modified once built
+
+    Books keep their library positions as ids. ``prepare`` builds the
+    year, genre and tag indexes, search index and sort orders up front, so
+    no request waits on one. Rendered responses are cached here too, so
+    they go away with the version they were rendered from.
+    """
+
+    def __init__(self, books: List[Dict], fingerprint):
+        self.books = books
+        self.fingerprint = fingerprint
+        self.summary = ReadingSummary.build(books)
+        self.by_year = defaultdict(list)
+        self.by_genre = defaultdict(list)
+        self.by_tag = defaultdict(list)
+        for i, book in enumerate(books):
+            self.by_year[book.get('year_read')].append(i)
+            for genre in book.get('categories') or []:
+                self.by_genre[genre.casefold()].append(i)
+            for tag in book.get('personal_tags') or []:
+                self.by_tag[tag.casefold()].append(i)
+        self._search = None
+        self._orders = {}
+        self._build_lock = threading.Lock()  # held while the search index or an order is built
+        self._lock = threading.Lock()  # the response cache
+        self._cache = OrderedDict()
+        self._cache_bytes = 0
+        self._searches = OrderedDict()
+
+    @property
+    def search(self) -> SearchIndex:
+        with self._build_lock:
+            if self._search is None:
+                self._search = SearchIndex(self.books)
+            return self._search
+
+    def order(self, field: str) -> Tuple[List[int], List[int]]:
+        """Book ids sorted ascending by ``field`` (ties in library order), and each book's place in that"""
+        with self._build_lock:
+            if field not in self._orders:
+                key = _sort_key(field)
+                order = sorted(range(len(self.books)), key=lambda i: key(self.books[i]))
+                ranks = [0] * len(order)
+                for rank, i in enumerate(order):
+                    ranks[i] = rank
+                self._orders[field] = (order, ranks)
+            return self._orders[field]
+
+    def search_ids(self, text: str) -> List[int]:
+        """Book ids matching ``text``, best first (the last SEARCHES_KEPT queries are kept)"""
+        key = ' '.join(text.casefold().split())
+        with self._lock:
+            ids = self._searches.get(key)
+            if ids is not None:
+                self._searches.move_to_end(key)
+                return ids
+        ids = self.search.search(key)
+        with self._lock:
+            self._searches[key] = ids
+            if len(self._searches) > SEARCHES_KEPT:
+                self._searches.popitem(last=False)
+        return ids
+
+    def cached(self, key, render) -> Response:
+        """The response for ``key``, rendering (and keeping) it the first time"""
+        with self._lock:
+            response = self._cache.get(key)
+            if response is not None:
+                self._cache.move_to_end(key)
+                return response
+        response = Response(render())
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = response
+                self._cache_bytes += len(response.body)
+                while self._cache_bytes > CACHE_BYTES and len(self._cache) > 1:
+                    _, old = self._cache.popitem(last=False)
+                    self._cache_bytes -= len(old.body)
+        return response
+
+    def prepare(self) -> 'LibraryState':
+        self.search
+        for field in SORT_FIELDS:
+            self.order(field)
+        return self
+
+
+class LibraryIndex:
+    """The library in memory, swapped for a fresh LibraryState when its files change
+
+    The data file, its journal and SQLite WAL are stat'ed at most every
+    RELOAD_CHECK_SECONDS (data_fingerprint). A change is loaded in a
+    background thread while requests keep getting the previous state; the
+    new one replaces it once fully built. Loading never writes to the library.
+    """
+
+    def __init__(self, data_file='enhanced_books.json'):
+        self.data_file = data_file
+        self._lock = threading.Lock()
+        self._checked = time.monotonic()
+        self._reloading = False
+        self.reloads = 0
+        self._state = self._load()
+
+    def _load(self) -> LibraryState:
+        fingerprint = data_fingerprint(self.data_file)
+        return LibraryState(load_books(self.data_file), fingerprint).prepare()
+
+    def _reload(self):
+        try:
+            self._state = self._load()
+            self.reloads += 1
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Couldn't reload {self.data_file}, still serving the last version: {e}")
+        finally:
+            self._reloading = False
+
+    def current(self) -> LibraryState:
+        now = time.monotonic()
+        if now - self._checked >= RELOAD_CHECK_SECONDS:
+            with self._lock:
+                if now - self._checked >= RELOAD_CHECK_SECONDS and not self._reloading:
+                    self._checked = now
+                    if data_fingerprint(self.data_file) != self._state.fingerprint:
+                        self._reloading = True
+                        threading.Thread(target=self._reload, daemon=True).start()
+        return self._state
+
+
+def _param(query: Dict, name: str, cast=str, default=None):
+    values = query.get(name)
+    if not values:
+        return default
+    try:
+        return cast(values[0])
+    except ValueError:
+        raise ApiError(400, f"bad value for {name}: {values[0]!r}")
+
+
+def _page(query: Dict, positions: List[int], state: LibraryState) -> Dict:
+    page = _param(query, 'page', int, 1)
+    per_page = _param(query, 'per_page', int, PAGE_SIZE)
+    if page < 1 or not 1 <= per_page <= MAX_PAGE_SIZE:
+        raise ApiError(400, f"page must be 1 or more and per_page 1 to {MAX_PAGE_SIZE}")
+    start = (page - 1) * per_page
+    return {
+        'page': page,
+        'per_page': per_page,
+        'total': len(positions),
+        'pages': -(-len(positions) // per_page),
+        'books': [dict(state.books[i], id=i) for i in positions[start:start + per_page]],
+    }
+
+
+def list_books(state: LibraryState, query: Dict) -> Dict:
+    """Books filtered by year, genre, tag, rating, author and format, sorted and paginated"""
+    filters = []
+    year = _param(query, 'year', int)
+    if year is not None:
+        filters.append(state.by_year.get(year, []))
+    for name, index in (('genre', state.by_genre), ('tag', state.by_tag)):
+        value = _param(query, name)
+        if value is not None:
+            filters.append(index.get(value.casefold(), []))
+    filters.sort(key=len)
+
+    rating = _param(query, 'rating', float)  # half stars: ratings are stored as floats
+    author = _param(query, 'author')
+    book_format = _param(query, 'format')
+    checks = [set(ids) for ids in filters[1:]]
+    if rating is not None:
+        checks.append(lambda book: book.get('rating') == rating)
+    if author is not None:
+        checks.append(lambda book: (book.get('author') or '').casefold() == author.casefold())
+    if book_format is not None:
+        checks.append(lambda book: book.get('format') == book_format)
+
+    sort = _param(query, 'sort')
+    order = _param(query, 'order', default='asc')
+    if sort is not None and sort not in SORT_FIELDS:
+        raise ApiError(400, f"sort must be one of {', '.join(SORT_FIELDS)}")
+    if order not in ('asc', 'desc'):
+        raise ApiError(400, "order must be asc or desc")
+
+    if filters:
+        positions = list(filters[0])
+    elif sort is not None:
+        # Everything, sorted: walk the precomputed order instead of sorting
+        positions = state.order(sort)[0]
+        positions = positions[::-1] if order == 'desc' else positions
+        sort = None
+    else:
+        positions = range(len(state.books))
+    if checks:
+        positions = [i for i in positions
+                     if all(i in check if isinstance(check, set) else check(state.books[i])
+                            for check in checks)]
+    if sort is not None:
+        positions = sorted(positions, key=state.order(sort)[1].__getitem__, reverse=order == 'desc')
+    return _page(query, positions, state)
+
+
+def get_book(state: LibraryState, book_id: int) -> Dict:
+    if not 0 <= book_id < len(state.books):
+        raise ApiError(404, f"no book {book_id}")
+    return dict(state.books[book_id], id=book_id)
+
+
+def search_books(state: LibraryState, query: Dict) -> Dict:
+    """Books matching every word of ``q`` (title, author, tags, notes, quotes, description), best first"""
+    text = _param(query, 'q', default='').strip()
+    if not text:
+        raise ApiError(400, "q is required")
+    return dict(_page(query, state.search_ids(text), state), q=text)
+
+
+def library_stats(state: LibraryState, query: Dict) -> Dict:
+    """The library's totals, per-year counts and top genres, authors and longest books"""
+    summary = state.summary
+    return {
+        'total': summary.total,
+        'rated': summary.rated,
+        'average_rating': summary.average_rating,
+        'pages_total': summary.pages_total,
+        'average_pages': summary.average_pages,
+        'first_year': summary.first_year,
+        'last_year': summary.last_year,
+        'years': [{'year': year, 'books': count} for year, count in sorted(summary.years.items())],
+        'ratings': sorted(summary.ratings.items()),
+        'genres': [{'genre': genre, 'books': count} for genre, count in summary.genres.most_common(TOP)],
+        'authors': [{'author': author, 'books': count}
+                    for author, count in summary.authors.most_common(TOP)],
+        'longest': summary.longest,
+    }
+
+
+def library_analytics(state: LibraryState, query: Dict) -> Dict:
+    """Streaks, velocity and pace (see reading_analytics)"""
+    return compute_analytics(*book_columns(state.books))
+
+
+# Routes whose answer depends only on the library version and the query string
+ROUTES = {
+    '/books': list_books,
+    '/search': search_books,
+    '/stats': library_stats,
+    '/analytics': library_analytics,
+}
+BOOK_ROUTE = re.compile(r'^/books/(\d+)$')
+
+
+def _encode(data) -> bytes:
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return '*' in tags or etag in (tag[2:] if tag.startswith('W/') else tag for tag in tags)
+
+
+class BookAPIHandler(BaseHTTPRequestHandler):
+    """GET-only JSON API over the server's LibraryIndex"""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    # Headers and body are separate writes; with Nagle each keep-alive response waits ~40 ms for an ACK
+    disable_nagle_algorithm = True
+    server_version = 'BookTrackerAPI/1'
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        state = self.server.library.current()
+        try:
+            response = self._respond(state, url.path.rstrip('/') or '/', url.query)
+        except ApiError as e:
+            self._send(e.status, Response(_encode({'error': str(e)})))
+            return
+        if _matches(self.headers.get('If-None-Match'), response.etag):
+            self._send(304, response)
+        else:
+            self._send(200, response)
+
+    def do_HEAD(self):
+        self.do_GET()
+
+    def _respond(self, state: LibraryState, path: str, query_string: str) -> Response:
+        query = parse_qs(query_string)
+        if path in ROUTES:
+            key = (path, tuple(sorted((k, tuple(v)) for k, v in query.items())))
+            if path == '/analytics':
+                key += (date.today(),)  # current streaks and the pace move with the date
+            return state.cached(key, lambda: _encode(ROUTES[path](state, query)))
+        match = BOOK_ROUTE.match(path)
+        if match:
+            book_id = int(match.group(1))
+            return state.cached(('/books', book_id), lambda: _encode(get_book(state, book_id)))
+        if path == '/':
+            return Response(_encode({'books': len(state.books), 'version': state.fingerprint,
+                                     'endpoints': sorted(ROUTES) + ['/books/<id>']}))
+        raise ApiError(404, f"no such endpoint: {path}")
+
+    def _send(self, status: int, response: Response):
+        payload = response.body
+        use_gzip = len(payload) >= GZIP_MIN_BYTES and \
+            'gzip' in self.headers.get('Accept-Encoding', '')
+        if use_gzip:
+            payload = response.gzipped
+        self.send_response(status)
+        self.send_header('ETag', response.etag)
+        self.send_header('Cache-Control', 'no-cache')  # always revalidate; a match costs no body
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Access-Control-Allow-Origin', '*')  # the Vite dev server is another origin
+        if status == 304:
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        if use_gzip:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(payload)
+
+    def _method_not_allowed(self):
+        self.close_connection = True  # the request body is never read
+        self._send(405, Response(_encode({'error': 'read-only API: GET only'})))
+
+    do_POST = do_PUT = do_PATCH = do_DELETE = _method_not_allowed
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(data_file='enhanced_books.json', host='127.0.0.1', port=8000,
+                verbose=False) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), BookAPIHandler)
+    server.daemon_threads = True
+    server.library = LibraryIndex(data_file)
+    server.verbose = verbose
+    return server
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Read-only HTTP API over your library")
+    parser.add_argument('data_file', nargs='?', default='enhanced_books.json')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args()
+    try:
+        server = make_server(args.data_file, args.host, args.port, args.verbose)
+    except FileNotFoundError:
+        print(f"❌ {args.data_file} not found!")
+        sys.exit(1)
+    print(f"🌐 Serving {len(server.library.current().books):,} books from {args.data_file} "
+          f"at http://{args.host}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
@@ -0,0 +1,352 @@
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from book_store import book_encoder
+
+# Stored in the integer columns for "not set"
+MISSING = -1
+
+
+@dataclass
+class Book:
+    title: str
+    author: str
+    year_read: int
+    date_finished: Optional[str] = None
+    format: str = "physical"  # physical, audio, ebook
+    rating: Optional[float] = None  # 1-5 scale
+    pages: Optional[int] = None
+    genres: List[str] = None
+    isbn: Optional[str] = None
+    goodreads_id: Optional[str] = None
+    personal_tags: List[str] = None
+    summary: Optional[str] = None
+    favorite_quotes: List[str] = None
+    readwise_highlights_count: Optional[int] = None
+    reading_time_days: Optional[int] = None
+    reread: bool = False
+    recommended_by: Optional[str] = None
+    mood_when_reading: Optional[str] = None
+    location_read: Optional[str] = None
+
+
+# How each Book field is stored in a BookCollection (array typecodes for numbers)
+INT_COLUMNS = {'year_read': 'h', 'pages': 'i', 'readwise_highlights_count': 'i',
+               'reading_time_days': 'i', 'reread': 'b'}
+# NaN for "not set"; float32 holds half stars and any rating typed with up to 7 digits
+FLOAT_COLUMNS = {'rating': 'f'}
+# Few distinct values: one int32 code per book into a shared vocabulary
+CODED_COLUMNS = ['author', 'format', 'date_finished', 'recommended_by', 'mood_when_reading',
+                 'location_read']
+# Lists coded the same way (most books share their genre and tag lists); empty is MISSING
+CODED_LISTS = ['genres', 'personal_tags']
+TEXT_COLUMNS = ['title', 'isbn', 'goodreads_id', 'summary']
+# Lists kept per book; an empty list is stored as None
+LIST_COLUMNS = ['favorite_quotes']
+
+# Field order of export_to_json's records
+EXPORT_FIELDS = ['title', 'author', 'year_read', 'date_finished', 'format', 'rating', 'pages',
+                 'genres', 'isbn', 'personal_tags', 'summary', 'favorite_quotes',
+                 'readwise_highlights_count', 'reading_time_days', 'reread', 'recommended_by',
+                 'mood_when_reading', 'location_read']
+
+def _to_int(value):
+    if value is None or value != value:  # None or NaN from a pandas column
+        return MISSING
+    return int(value)
+
+
+def _to_float(value):
+    return float('nan') if value is None else float(value)
+
+
+def _from_float(value):
+    """A stored float32 back as the number it was set to (whole numbers as int), None for NaN"""
+    if value != value:
+        return None
+    # float32 keeps about 7 significant digits; more would print its rounding error
+    number = float(f"{value:.7g}")
+    return int(number) if number.is_integer() else number
+
+
+class BookRef:
+    """One book of a BookCollection; reading or assigning a field goes to its column"""
+
+    __slots__ = ('_books', '_index')
+
+    def __init__(self, books: 'BookCollection', index: int):
+        object.__setattr__(self, '_books', books)
+        object.__setattr__(self, '_index', index)
+
+    def __getattr__(self, name):
+        return self._books.get(self._index, name)
+
+    def __setattr__(self, name, value):
+        self._books.set(self._index, name, value)
+
+    def to_dict(self) -> Dict:
+        return {name: self._books.get(self._index, name) for name in self._books.fields}
+
+    def __repr__(self):
+        return f"BookRef({self.title!r} by {self.author!r})"
+
+
+class BookCollection:
+    """BookTrackingSystem's books, stored column by column instead of one object each
+
+    Numbers live in typed arrays; authors, formats, finish dates and whole
+    genre and tag lists as codes into a shared vocabulary, so a book costs
+    a fraction of a Book dataclass. Indexing returns a BookRef whose fields
+    read and write the columns; ``append`` copies a Book in, so edit books
+    through the collection, not the Book you appended.
+
+    ``column`` gives NumPy views of the numeric columns without copying, for
+    vectorized filters. ``json_rows`` encodes books straight from the
+    columns for write_books, each distinct author, date or genre list once;
+    ``records`` streams export dicts for code that wants them.
+    """
+
+    fields = [name for name in Book.__dataclass_fields__]
+
+    def __init__(self, books=()):
+        self._size = 0
+        self._numbers = {name: array(code) for name, code in {**INT_COLUMNS, **FLOAT_COLUMNS}.items()}
+        self._codes = {name: array('i') for name in CODED_COLUMNS + CODED_LISTS}
+        self._vocab = {name: [] for name in self._codes}
+        self._vocab_index = {name: {} for name in self._codes}
+        self._objects = {name: [] for name in TEXT_COLUMNS + LIST_COLUMNS}
+        self.extend(books)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self) -> Iterator[BookRef]:
+        return (BookRef(self, i) for i in range(self._size))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [BookRef(self, i) for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('book index out of range')
+        return BookRef(self, index)
+
+    # Storing and reading single values
+
+    def _key(self, name, value):
+        """The vocabulary entry for ``value``, or None when it's unset (or an empty list)"""
+        if name in CODED_LISTS:
+            return tuple(sys.intern(v) for v in value) if value else None
+        return value
+
+    def _encode(self, name, value):
+        value = self._key(name, value)
+        if value is None:
+            return MISSING
+        index = self._vocab_index[name]
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(self._vocab[name])
+            self._vocab[name].append(sys.intern(value) if isinstance(value, str) else value)
+        return code
+
+    def _store(self, name, value):
+        if name in INT_COLUMNS:
+            return _to_int(value)
+        if name in FLOAT_COLUMNS:
+            return _to_float(value)
+        return self._encode(name, value)
+
+    def append(self, book):
+        """Copy a Book (or anything with the same attributes) into the collection"""
+        for columns in (self._numbers, self._codes):
+            for name, column in columns.items():
+                value = self._store(name, getattr(book, name, None))
+                try:
+                    column.append(value)
+                except BufferError:
+                    # A NumPy view from column() still holds the buffer; it keeps the old copy
+                    column = columns[name] = array(column.typecode, column)
+                    column.append(value)
+        for name in TEXT_COLUMNS:
+            self._objects[name].append(getattr(book, name, None))
+        for name in LIST_COLUMNS:
+            self._objects[name].append(list(getattr(book, name, None) or []) or None)
+        self._size += 1
+
+    def extend(self, books):
+        for book in books:
+            self.append(book)
+
+    def get(self, index, name):
+        if name in INT_COLUMNS:
+            value = self._numbers[name][index]
+            if name == 'reread':
+                return bool(value)
+            return None if value == MISSING else value
+        if name in FLOAT_COLUMNS:
+            return _from_float(self._numbers[name][index])
+        if name in self._codes:
+            code = self._codes[name][index]
+            if code == MISSING:
+                return None
+            value = self._vocab[name][code]
+            # A copy, so editing it can't change every book sharing the list
+            return list(value) if name in CODED_LISTS else value
+        if name in self._objects:
+            return self._objects[name][index]
+        raise AttributeError(f"Book has no field {name!r}")
+
+    def set(self, index, name, value):
+        if name in self._numbers:
+            self._numbers[name][index] = self._store(name, value)
+        elif name in self._codes:
+            self._codes[name][index] = self._store(name, value)
+        elif name in LIST_COLUMNS:
+            self._objects[name][index] = list(value or []) or None
+        elif name in self._objects:
+            self._objects[name][index] = value
+        else:
+            raise AttributeError(f"Book has no field {name!r}")
+
+    # Whole columns
+
+    def column(self, name):
+        """A column without copying: a NumPy view for numbers and codes, else the list
+
+        Unset integers and codes read MISSING, unset ratings NaN. Views see
+        later edits to existing books but not books appended after them.
+        """
+        import numpy as np
+
+        if name in self._numbers:
+            column = self._numbers[name]
+        elif name in self._codes:
+            column = self._codes[name]
+        else:
+            return self._objects[name]
+        return np.frombuffer(column, dtype=np.dtype(column.typecode)) if self._size \
+            else np.empty(0, dtype=np.dtype(column.typecode))
+
+    def values(self, name) -> list:
+        """Every book's value of a field as plain Python values (decoding coded columns)"""
+        return self._decode(name, 0, self._size)
+
+    def mask(self, **equals):
+        """Boolean NumPy mask of the books whose fields equal the given values (None for unset)"""
+        import numpy as np
+
+        mask = np.ones(self._size, dtype=bool)
+        for name, value in equals.items():
+            if name in INT_COLUMNS:
+                mask &= self.column(name) == _to_int(value)
+            elif name in FLOAT_COLUMNS:
+                column = self.column(name)
+                mask &= np.isnan(column) if value is None else column == np.float32(value)
+            elif name in self._codes:
+                key = self._key(name, value)
+                code = MISSING if key is None else self._vocab_index[name].get(key, MISSING - 1)
+                mask &= self.column(name) == code
+            else:
+                mask &= np.fromiter((v == value for v in self._objects[name]), bool, self._size)
+        return mask
+
+    def where(self, mask) -> List[BookRef]:
+        """The books selected by a boolean mask, e.g. ``books.column('pages') > 500``"""
+        import numpy as np
+
+        return [BookRef(self, int(i)) for i in np.flatnonzero(mask)]
+
+    def filter(self, **equals) -> List[BookRef]:
+        return self.where(self.mask(**equals))
+
+    def records(self, fields: List[str] = EXPORT_FIELDS, chunk: int = 10000) -> Iterator[Dict]:
+        """Export dicts (empty lists as []) built straight from the columns, a chunk at a time
+
+        Books with the same genre or tag list share one list object, so
+        don't edit them in place; set the field through the collection.
+        """
+        for start in range(0, self._size, chunk):
+            stop = min(start + chunk, self._size)
+            columns = [self._decode(name, start, stop) for name in fields]
+            for row in zip(*columns):
+                yield dict(zip(fields, row))
+
+    def json_rows(self, style: str = 'indent', fields: List[str] = EXPORT_FIELDS,
+                  chunk: int = 10000) -> Iterator[str]:
+        """Each book as JSON text, exactly as ``book_encoder(style)`` encodes its record
+
+        No record dicts are built: every column is turned into JSON fragments
+        a chunk at a time (each vocabulary entry encoded once), and a book
+        is those fragments dropped into one format string. For
+        ``write_books(path, books.json_rows(style), style, encoded=True)``.
+        """
+        encoder = book_encoder(style)
+        nested = style == 'indent'
+        encode = encoder.encode
+
+        def encode_list(value):
+            # Lists sit one level inside the book, so their layout is indented once more
+            return encode(value).replace('\n', '\n  ') if nested else encode(value)
+
+        fragments = {}
+        for name in fields:
+            if name in CODED_COLUMNS:
+                fragments[name] = [encode(v) for v in self._vocab[name]] + ['null']
+            elif name in CODED_LISTS:
+                fragments[name] = [encode_list(list(v)) for v in self._vocab[name]] + ['[]']
+
+        keys = [encode(name).replace('%', '%%') for name in fields]
+        template = '{\n  ' + ',\n  '.join(f"{key}: %s" for key in keys) + '\n}' if nested \
+            else '{' + ','.join(f"{key}:%s" for key in keys) + '}'
+        if not fields:
+            template = '{}'
+
+        for start in range(0, self._size, chunk):
+            stop = min(start + chunk, self._size)
+            columns = []
+            for name in fields:
+                if name in fragments:
+                    lookup = fragments[name]  # MISSING (-1) picks the entry on the end
+                    columns.append([lookup[code] for code in self._codes[name][start:stop]])
+                elif name == 'reread':
+                    columns.append(['true' if v else 'false'
+                                    for v in self._numbers[name][start:stop]])
+                elif name in INT_COLUMNS:
+                    columns.append(['null' if v == MISSING else str(v)
+                                    for v in self._numbers[name][start:stop]])
+                elif name in FLOAT_COLUMNS:
+                    columns.append(['null' if v is None else str(v)
+                                    for v in self._decode(name, start, stop)])
+                elif name in LIST_COLUMNS:
+                    columns.append([encode_list(v) if v else '[]'
+                                    for v in self._objects[name][start:stop]])
+                else:
+                    columns.append([encode(v) for v in self._objects[name][start:stop]])
+            for row in zip(*columns):
+                yield template % row
+
+    def _decode(self, name, start, stop) -> list:
+        """Plain Python values of one column for books start..stop (empty lists as [])"""
+        if name == 'reread':
+            return [bool(v) for v in self._numbers[name][start:stop]]
+        if name in INT_COLUMNS:
+            return [None if v == MISSING else v for v in self._numbers[name][start:stop]]
+        if name in FLOAT_COLUMNS:
+            # Ratings take a handful of values, so each is converted once
+            seen = {}
+            return [seen[v] if v in seen else seen.setdefault(v, _from_float(v))
+                    for v in self._numbers[name][start:stop]]
+        if name in CODED_LISTS:
+            # Books with the same genres share one list, as they shared their Book's list before
+            lookup = [list(value) for value in self._vocab[name]]
+            return [lookup[code] if code != MISSING else [] for code in self._codes[name][start:stop]]
+        if name in self._codes:
+            lookup = self._vocab[name] + [None]  # MISSING (-1) picks the None on the end
+            return [lookup[code] for code in self._codes[name][start:stop]]
+        if name in LIST_COLUMNS:
+            return [v or [] for v in self._objects[name][start:stop]]
+        return self._objects[name][start:stop]
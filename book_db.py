@@ -0,0 +1,314 @@
+import json
+import sqlite3
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from book_store import iter_books, replace_books
+from book_summary import LONGEST_KEPT, ReadingSummary
+
+DB_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+# Scalar fields that get their own column; list fields live in child tables
+COLUMNS = ('original_text', 'title', 'author', 'year_read', 'format', 'pages', 'published_year',
+           'description', 'rating', 'notes', 'date_finished')
+LIST_TABLES = {'categories': ('genres', 'genre'),
+               'personal_tags': ('tags', 'tag'),
+               'favorite_quotes': ('quotes', 'quote')}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    original_text TEXT,
+    title TEXT,
+    author TEXT,
+    year_read INTEGER,
+    format TEXT,
+    pages INTEGER,
+    published_year TEXT,
+    description TEXT,
+    rating NUMERIC,
+    notes TEXT,
+    date_finished TEXT,
+    field_order TEXT NOT NULL,
+    extra TEXT
+);
+CREATE TABLE IF NOT EXISTS genres (
+    book_id INTEGER NOT NULL REFERENCES books(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    genre TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tags (
+    book_id INTEGER NOT NULL REFERENCES books(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    tag TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS quotes (
+    book_id INTEGER NOT NULL REFERENCES books(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    quote TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_books_year_read ON books(year_read);
+CREATE INDEX IF NOT EXISTS idx_books_author ON books(author COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_books_rating ON books(rating);
+CREATE INDEX IF NOT EXISTS idx_books_title ON books(title COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_genres_book ON genres(book_id);
+CREATE INDEX IF NOT EXISTS idx_genres_genre ON genres(genre);
+CREATE INDEX IF NOT EXISTS idx_tags_book ON tags(book_id);
+CREATE INDEX IF NOT EXISTS idx_tags_tag ON tags(tag);
+CREATE INDEX IF NOT EXISTS idx_quotes_book ON quotes(book_id);
+"""
+
+
+def is_database_path(path: str) -> bool:
+    return str(path).lower().endswith(DB_EXTENSIONS)
+
+
+class BookDatabase:
+    """SQLite store for the library, round-tripping the enhanced_books.json format
+
+    Books returned by the query helpers carry an extra ``id`` key for
+    ``update_book``; ``all_books``/``export_json`` return plain JSON records.
+    """
+
+    def __init__(self, path: str = 'books.db'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+
+    # --- import / export -------------------------------------------------
+
+    def import_books(self, books: Iterable[Dict]):
+        """Replace the database contents with ``books`` (enhanced_books.json records)"""
+        with self.conn:
+            for table in ('quotes', 'tags', 'genres', 'books'):
+                self.conn.execute(f"DELETE FROM {table}")
+            count = 0
+            for position, book in enumerate(books):
+                self._insert(position, book)
+                count = position + 1
+        return count
+
+    def import_json(self, json_file: str):
+        # Streamed a book at a time, so a big library never sits in memory
+        count = self.import_books(iter_books(json_file))
+        print(f"📥 Imported {count} books from {json_file} into {self.path}")
+        return count
+
+    def export_json(self, json_file: str):
+        books = self.all_books()
+        replace_books(json_file, books)
+        print(f"📤 Exported {len(books)} books from {self.path} to {json_file}")
+        return len(books)
+
+    def _insert(self, position, book):
+        extra = {k: v for k, v in book.items() if k not in COLUMNS and k not in LIST_TABLES}
+        cursor = self.conn.execute(
+            f"INSERT INTO books (position, {', '.join(COLUMNS)}, field_order, extra) "
+            f"VALUES (?, {', '.join('?' for _ in COLUMNS)}, ?, ?)",
+            (position, *[book.get(c) for c in COLUMNS],
+             json.dumps(list(book.keys())), json.dumps(extra, ensure_ascii=False) if extra else None))
+        self._write_lists(cursor.lastrowid, book)
+        return cursor.lastrowid
+
+    def _write_lists(self, book_id, fields):
+        for field, (table, column) in LIST_TABLES.items():
+            if field not in fields:
+                continue
+            self.conn.execute(f"DELETE FROM {table} WHERE book_id = ?", (book_id,))
+            self.conn.executemany(
+                f"INSERT INTO {table} (book_id, position, {column}) VALUES (?, ?, ?)",
+                [(book_id, i, value) for i, value in enumerate(fields[field] or [])])
+
+    # --- reading -----------------------------------------------------------
+
+    def _query(self, where: str = '', params=(), order: str = 'position', limit: Optional[int] = None,
+               with_id: bool = True) -> List[Dict]:
+        sql = f"SELECT * FROM books {where} ORDER BY {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        rows = self.conn.execute(sql, params).fetchall()
+        if not rows:
+            return []
+
+        # Fetch list fields for just these books in one query per table
+        ids = [row['id'] for row in rows]
+        lists = {field: {book_id: [] for book_id in ids} for field in LIST_TABLES}
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            marks = ', '.join('?' for _ in batch)
+            for field, (table, column) in LIST_TABLES.items():
+                for book_id, value in self.conn.execute(
+                        f"SELECT book_id, {column} FROM {table} WHERE book_id IN ({marks}) "
+                        f"ORDER BY book_id, position", batch):
+                    lists[field][book_id].append(value)
+
+        books = []
+        for row in rows:
+            values = dict(zip(COLUMNS, (row[c] for c in COLUMNS)))
+            values.update({field: lists[field][row['id']] for field in LIST_TABLES})
+            if row['extra']:
+                values.update(json.loads(row['extra']))
+            book = {key: values.get(key) for key in json.loads(row['field_order'])}
+            if with_id:
+                book['id'] = row['id']
+            books.append(book)
+        return books
+
+    def all_books(self) -> List[Dict]:
+        """Every book in library order, exactly as it would appear in enhanced_books.json"""
+        return self._query(with_id=False)
+
+    def books_by_titles(self, titles: Iterable[str]) -> List[Dict]:
+        titles = list(titles)
+        if not titles:
+            return []
+        return self._query(f"WHERE title IN ({', '.join('?' for _ in titles)})", titles)
+
+    def fields(self, *columns: str) -> List[Dict]:
+        """Just these scalar columns of every book, in library order (no list tables read)"""
+        unknown = [c for c in columns if c not in COLUMNS]
+        if unknown:
+            raise ValueError(f"not a column: {', '.join(unknown)}")
+        return [dict(row) for row in self.conn.execute(
+            f"SELECT {', '.join(columns)} FROM books ORDER BY position")]
+
+    def summary(self) -> ReadingSummary:
+        """The library's ReadingSummary from aggregate queries, without loading a book
+
+        Counts are in order of first appearance, like ReadingSummary.build.
+        """
+        summary = ReadingSummary()
+        summary.total = self.count()
+        summary.years = Counter({int(year): count for year, count in self.year_counts().items()
+                                 if year is not None})
+        summary.genres = Counter(dict(self.conn.execute(
+            "SELECT g.genre, COUNT(*) FROM genres g JOIN books b ON b.id = g.book_id "
+            "GROUP BY g.genre ORDER BY MIN(b.position * 65536 + g.position)")))
+        summary.authors = Counter(dict(self.conn.execute(
+            "SELECT author, COUNT(*) FROM books WHERE author IS NOT NULL AND author != '' "
+            "GROUP BY author ORDER BY MIN(position)")))
+        numeric = "typeof({0}) IN ('integer', 'real')"
+        summary.ratings = Counter(dict(self.conn.execute(
+            f"SELECT rating, COUNT(*) FROM books WHERE {numeric.format('rating')} "
+            "GROUP BY rating ORDER BY MIN(position)")))
+        summary.rating_sum = sum(rating * count for rating, count in summary.ratings.items())
+        summary.pages_total, summary.pages_books = self.conn.execute(
+            f"SELECT COALESCE(SUM(pages), 0), COUNT(*) FROM books "
+            f"WHERE {numeric.format('pages')} AND pages != 0").fetchone()
+        summary.longest = [list(row) for row in self.conn.execute(
+            f"SELECT pages, title FROM books WHERE {numeric.format('pages')} AND pages != 0 "
+            f"ORDER BY pages DESC, position LIMIT {LONGEST_KEPT}")]
+        summary.five_star = [list(row) for row in self.conn.execute(
+            "SELECT title, author, year_read FROM books WHERE rating = 5 ORDER BY position")]
+        return summary
+
+    def year_counts(self) -> Dict[int, int]:
+        return dict(self.conn.execute(
+            "SELECT year_read, COUNT(*) FROM books GROUP BY year_read ORDER BY year_read"))
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+
+    # --- writing -----------------------------------------------------------
+
+    def update_book(self, book_id: int, **fields):
+        """Update some fields of one book (list fields replace the whole list)"""
+        with self.conn:
+            self._update(book_id, fields)
+
+    def _update(self, book_id, fields):
+        row = self.conn.execute(
+            "SELECT field_order, extra FROM books WHERE id = ?", (book_id,)).fetchone()
+        if row is None:
+            raise KeyError(f"no book with id {book_id}")
+
+        order = json.loads(row['field_order'])
+        order.extend(k for k in fields if k not in order)
+        extra = json.loads(row['extra']) if row['extra'] else {}
+        extra.update({k: v for k, v in fields.items() if k not in COLUMNS and k not in LIST_TABLES})
+
+        columns = [c for c in COLUMNS if c in fields]
+        assignments = ', '.join(f"{c} = ?" for c in columns + ['field_order', 'extra'])
+        self.conn.execute(
+            f"UPDATE books SET {assignments} WHERE id = ?",
+            (*[fields[c] for c in columns], json.dumps(order),
+             json.dumps(extra, ensure_ascii=False) if extra else None, book_id))
+        self._write_lists(book_id, fields)
+
+    def add_book(self, book: Dict) -> int:
+        with self.conn:
+            position = self.conn.execute(
+                "SELECT COALESCE(MAX(position) + 1, 0) FROM books").fetchone()[0]
+            return self._insert(position, book)
+
+    def close(self):
+        self.conn.close()
+
+
+class DatabaseBookStore:
+    """JournaledBookStore-compatible wrapper so BookEnhancer can edit a SQLite library"""
+
+    def __init__(self, path: str):
+        self.db = BookDatabase(path)
+        self.books = []
+        self.pending = {}
+        self._ids = {}
+
+    def load(self, repair=False):
+        self.books = self.db._query()
+        self._ids = {id(book): book.pop('id') for book in self.books}
+        self.pending = {}
+        return self.books
+
+    def record(self, book, *fields):
+        self.pending.setdefault(id(book), (book, set()))[1].update(fields)
+
+    def add(self, book):
+        self._ids[id(book)] = None
+        self.books.append(book)
+        self.pending[id(book)] = (book, None)
+
+    def discard(self):
+        self.pending = {}
+
+    def flush(self, compact=True):
+        """Write only the edited rows, in one transaction (there's never anything to compact)"""
+        with self.db.conn:
+            for key, (book, fields) in self.pending.items():
+                if self._ids[key] is None:
+                    position = self.db.conn.execute(
+                        "SELECT COALESCE(MAX(position) + 1, 0) FROM books").fetchone()[0]
+                    self._ids[key] = self.db._insert(position, book)
+                else:
+                    self.db._update(self._ids[key], {field: book.get(field) for field in fields})
+        written = len(self.pending)
+        self.pending = {}
+        return written
+
+    def compact(self):
+        # Every flush is already a durable, indexed update - nothing to fold back
+        self.flush()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Move your library between JSON and SQLite")
+    sub = parser.add_subparsers(dest='command', required=True)
+    to_db = sub.add_parser('import', help="load enhanced_books.json into a database")
+    to_db.add_argument('json_file', nargs='?', default='enhanced_books.json')
+    to_db.add_argument('db_file', nargs='?', default='books.db')
+    to_json = sub.add_parser('export', help="write a database back out as JSON")
+    to_json.add_argument('db_file', nargs='?', default='books.db')
+    to_json.add_argument('json_file', nargs='?', default='enhanced_books.json')
+    args = parser.parse_args()
+
+    db = BookDatabase(args.db_file)
+    if args.command == 'import':
+        db.import_json(args.json_file)
+    else:
+        db.export_json(args.json_file)
+    db.close()
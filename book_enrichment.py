@@ -0,0 +1,162 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from lookup_cache import LookupCache, normalize_query, trim_volume_info
+
+GOOGLE_BOOKS_URL = "https://www.googleapis.com/books/v1/volumes"
+
+# Status codes worth retrying - rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def empty_book_info():
+    """Fields returned when a lookup finds nothing (or fails)"""
+    return {'pages': None, 'published_year': None, 'categories': [], 'description': None,
+            'isbn': None}
+
+
+def isbn_from_identifiers(identifiers) -> Optional[str]:
+    """ISBN-13 from a Google Books industryIdentifiers list, else ISBN-10"""
+    isbns = {i.get('type'): i.get('identifier') for i in identifiers or []}
+    return isbns.get('ISBN_13') or isbns.get('ISBN_10')
+
+
+def book_info_from_volume(volume_info):
+    """Convert a Google Books volumeInfo dict into our enrichment fields"""
+    if not volume_info:
+        return empty_book_info()
+
+    published = volume_info.get('publishedDate')
+    description = volume_info.get('description')
+    return {
+        'pages': volume_info.get('pageCount'),
+        'published_year': published.split('-')[0] if published else None,
+        'categories': volume_info.get('categories', []),
+        'description': description[:500] + '...' if description else None,
+        'isbn': isbn_from_identifiers(volume_info.get('industryIdentifiers')),
+    }
+
+
+class TokenBucket:
+    """Thread-safe token bucket shared by every enrichment worker"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def make_session(pool_size: int = 8):
+    """Create a requests session with a connection pool sized for the workers"""
+    # requests is only imported once something goes online; it adds ~0.1s to startup
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+class EnrichmentEngine:
+    """Run Google Books lookups in parallel behind a shared rate limiter"""
+
+    def __init__(self, workers: int = 8, rate: float = 5.0, retries: int = 3,
+                 backoff: float = 0.5, timeout: float = 5, base_url: str = GOOGLE_BOOKS_URL,
+                 cache: Optional[LookupCache] = None):
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.base_url = base_url
+        self.cache = cache
+        self.limiter = TokenBucket(rate)
+        self.session = make_session(workers)
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def fetch_volume_info(self, title: str, author: str) -> Optional[Dict]:
+        """Return the first matching volumeInfo, from the cache when possible"""
+        if self.cache is None:
+            return self._request_volume_info(title, author)
+
+        key = normalize_query(title, author)
+        hit, volume_info = self.cache.get(key)
+        if not hit:
+            volume_info = trim_volume_info(self._request_volume_info(title, author))
+            self.cache.put(key, volume_info)
+        return volume_info
+
+    def _request_volume_info(self, title: str, author: str) -> Optional[Dict]:
+        """Query the API, retrying transient errors with jittered backoff"""
+        import requests
+
+        params = {'q': f"{title} {author}", 'maxResults': 1}
+
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            self._count('requests')
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                response, error = None, e
+            if response is not None:
+                if response.status_code not in RETRY_STATUSES:
+                    # Anything but 200 here (bad request, quota denied) won't improve on
+                    # retry, so it's raised here, outside the network-error retries
+                    response.raise_for_status()
+                    data = response.json()
+                    if data.get('totalItems', 0) > 0 and data.get('items'):
+                        return data['items'][0]['volumeInfo']
+                    return None
+                error = f"HTTP {response.status_code}"
+
+            if attempt < self.retries:
+                self._count('retries')
+                # Full jitter keeps parallel workers from retrying in lockstep
+                time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+        raise RuntimeError(f"gave up after {self.retries + 1} attempts ({error})")
+
+    def lookup(self, title: str, author: str) -> Dict:
+        """Look up one book; failures are reported and return empty fields"""
+        try:
+            return book_info_from_volume(self.fetch_volume_info(title, author))
+        except Exception as e:
+            self._count('failures')
+            print(f"API error for '{title}': {e}")
+            return empty_book_info()
+
+    def enrich_all(self, books: List[Tuple[str, str]]) -> List[Dict]:
+        """Look up (title, author) pairs concurrently, returning results in input order
+
+        Google Books is searched by title, so an ISBN given as a third item is ignored.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return list(executor.map(lambda book: self.lookup(*book[:2]), books))
+
+    def close(self):
+        self.session.close()
@@ -0,0 +1,166 @@
+import re
+import unicodedata
+from collections import Counter, namedtuple
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Match = namedtuple('Match', ['book_index', 'source_index', 'confidence', 'method'])
+
+STOPWORDS = {'the', 'a', 'an', 'of', 'and', 'in', 'on', 'to', 'for', 'with', 'by'}
+# Blocking keys shared by more candidates than this are too common to narrow anything
+MAX_BLOCK = 500
+# Only the rarest few blocking keys of a title are used to collect candidates
+BLOCKS_PER_QUERY = 3
+
+_PARENS = re.compile(r'\([^)]*\)|\[[^\]]*\]')
+_WORD = re.compile(r'[a-z0-9]+')
+
+
+def _ascii_lower(text):
+    text = str(text or '')
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return text.lower()
+
+
+def title_words(title) -> List[str]:
+    """Normalized title words: no accents, punctuation, (series) notes or leading article"""
+    title = _ascii_lower(title)
+    if '(' in title or '[' in title:
+        title = _PARENS.sub(' ', title)
+    words = _WORD.findall(title)
+    if len(words) > 1 and words[0] in ('the', 'a', 'an'):
+        words = words[1:]
+    return words
+
+
+_SUBTITLE = re.compile(r':| - ')
+
+
+def main_title(title) -> str:
+    """The part of a title before its subtitle ("Sapiens: A Brief History" -> "Sapiens")"""
+    return _SUBTITLE.split(str(title or ''), maxsplit=1)[0]
+
+
+def author_words(author) -> List[str]:
+    return [w for w in _WORD.findall(_ascii_lower(author)) if len(w) > 1]
+
+
+def trigrams(text) -> frozenset:
+    text = f"  {text} "
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def dice(a, b) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+class _Entry:
+    __slots__ = ('full', 'main', 'full_grams', 'main_grams', 'author_grams', 'keys')
+
+    def __init__(self, title, author):
+        words = title_words(title)
+        self.full = ' '.join(words)
+        self.full_grams = trigrams(self.full)
+        short = main_title(title)
+        if short != title:
+            self.main = ' '.join(title_words(short)) or self.full
+            self.main_grams = trigrams(self.main)
+        else:
+            self.main, self.main_grams = self.full, self.full_grams
+        names = author_words(author)
+        self.author_grams = trigrams(' '.join(names)) if names and names != ['unknown'] else None
+        # Whole words are selective; word prefixes still pair up titles with a late typo
+        content = [w for w in words if w not in STOPWORDS] or words
+        self.keys = {w for w in content} | {w[:3] + '*' for w in content}
+
+
+class FuzzyMatcher:
+    """Index a set of (title, author) sources, then match books against it
+
+    An exact pass on normalized full and main titles runs first; anything left
+    is compared only with sources sharing a title-word prefix, scored by
+    trigram similarity of title (and author, when both are known).
+    """
+
+    def __init__(self, sources: Sequence[Tuple[str, str]], threshold: float = 0.8,
+                 author_weight: float = 0.25):
+        self.threshold = threshold
+        self.author_weight = author_weight
+        # The title score a match needs even with a perfect author score
+        self.min_title_score = max(0.0, (threshold - author_weight) / (1 - author_weight))
+        self.entries = [_Entry(title, author) for title, author in sources]
+        self.exact: Dict[str, List[int]] = {}
+        self.blocks: Dict[str, List[int]] = {}
+        for i, entry in enumerate(self.entries):
+            for key in {entry.full, entry.main}:
+                self.exact.setdefault(key, []).append(i)
+            for key in entry.keys:
+                self.blocks.setdefault(key, []).append(i)
+
+    def _score(self, query: _Entry, entry: _Entry) -> float:
+        title = dice(query.full_grams, entry.full_grams)
+        if query.main_grams is not query.full_grams or entry.main_grams is not entry.full_grams:
+            title = max(title, dice(query.main_grams, entry.main_grams))
+        if query.author_grams is None or entry.author_grams is None:
+            return title
+        author = dice(query.author_grams, entry.author_grams)
+        return (1 - self.author_weight) * title + self.author_weight * author
+
+    def match(self, title: str, author: str = None) -> Optional[Tuple[int, float, str]]:
+        """Best (source_index, confidence, method) for one book, or None below the threshold"""
+        query = _Entry(title, author)
+        if not query.full:
+            return None
+
+        exact = self.exact.get(query.full) or self.exact.get(query.main)
+        if exact:
+            best = max(exact, key=lambda i: self._score(query, self.entries[i]))
+            confidence = self._score(query, self.entries[best])
+            # Same title but a clearly different author is left to the fuzzy pass
+            if confidence >= self.threshold:
+                return best, round(confidence, 3), 'exact'
+
+        blocks = sorted((self.blocks[key] for key in query.keys if key in self.blocks), key=len)
+        blocks = [block for block in blocks[:BLOCKS_PER_QUERY] if len(block) <= MAX_BLOCK]
+        shared = Counter()
+        for block in blocks:
+            shared.update(block)
+        # With several usable keys a real match shares at least two (a word and its prefix)
+        needed = 2 if len(blocks) == BLOCKS_PER_QUERY else 1
+        candidates = [i for i, count in shared.items() if count >= needed]
+        # Dice can't reach the threshold when trigram counts differ too much
+        ratio = self.min_title_score / (2 - self.min_title_score)
+        sizes = (len(query.full_grams), len(query.main_grams))
+        best, best_score = None, self.threshold
+        for i in candidates:
+            entry = self.entries[i]
+            if (min(sizes[0], len(entry.full_grams)) < ratio * max(sizes[0], len(entry.full_grams))
+                    and min(sizes[1], len(entry.main_grams)) < ratio * max(sizes[1], len(entry.main_grams))):
+                continue
+            score = self._score(query, entry)
+            if score >= best_score:
+                best, best_score = i, score
+        if best is None:
+            return None
+        return best, round(best_score, 3), 'fuzzy'
+
+
+def match_books(books: Sequence[Tuple[str, str]], sources: Sequence[Tuple[str, str]],
+                threshold: float = 0.8) -> List[Match]:
+    """Match every (title, author) in ``books`` to its best source, one Match per matched book"""
+    matcher = FuzzyMatcher(sources, threshold)
+    matches = []
+    for book_index, (title, author) in enumerate(books):
+        found = matcher.match(title, author)
+        if found is not None:
+            matches.append(Match(book_index, *found))
+    return matches
+
+
+def similarity(title: str, author: str, other_title: str, other_author: str,
+               author_weight: float = 0.25) -> float:
+    """Confidence (0-1) that two (title, author) pairs are the same book, scored like FuzzyMatcher"""
+    matcher = FuzzyMatcher([(other_title, other_author)], threshold=0.0, author_weight=author_weight)
+    return round(matcher._score(_Entry(title, author), matcher.entries[0]), 3)
@@ -0,0 +1,115 @@
+import re
+from datetime import date
+from typing import Optional
+
+# Precompiled patterns for the "Title by Author (series) (audio) (MM.DD.YY)" format
+DATE_SUFFIX = re.compile(r'\s*\((\d{1,2})\.(\d{1,2})\.(\d{2,4})\)\s*$')
+SERIES_SUFFIX = re.compile(r'\s*\([^)]*\)\s*$')
+AUDIO_MARKER = '(audio)'
+BY_SEPARATOR = ' by '
+
+
+def _iso_date(month, day, year) -> Optional[str]:
+    """'YYYY-MM-DD' from the parts of a (MM.DD.YY) suffix, or None if it isn't a real date"""
+    if len(year) == 2:
+        year = '20' + year  # two-digit years are this century's
+    if len(year) != 4:
+        return None
+    try:
+        return date(int(year), int(month), int(day)).isoformat()
+    except ValueError:
+        return None
+
+
+def parse_finished_date(book_text) -> Optional[str]:
+    """The (MM.DD.YY) date at the end of a book string as 'YYYY-MM-DD', or None"""
+    found = DATE_SUFFIX.search(str(book_text).strip())
+    return _iso_date(*found.groups()) if found else None
+
+
+def parse_finished_dates(book_texts):
+    """Vectorized parse_finished_date: a Series of 'YYYY-MM-DD' strings, None where there's no date"""
+    import pandas as pd
+
+    texts = pd.Series(book_texts, dtype=object).map(str).str.strip()
+    parts = texts.str.extract(DATE_SUFFIX)
+    if parts.empty:
+        return pd.Series([], index=texts.index, dtype=object)
+    year = parts[2].where(parts[2].str.len() != 2, '20' + parts[2])
+    year = year.where(year.str.len() == 4)
+    iso = year + '-' + parts[0].str.zfill(2) + '-' + parts[1].str.zfill(2)
+    # Invalid dates (02.30.24) become NaT, like date() refusing them
+    valid = pd.to_datetime(iso, format='%Y-%m-%d', errors='coerce').notna()
+    return iso.astype(object).where(valid, None)
+
+
+def clean_book_title_author(book_text):
+    """
+    Parse your book format - adjust this based on how your data looks
+    Examples it handles:
+    - "Master of the Senate: Years of Lyndon B Johnson by Robert Caro (Book 3) (08.13.24)"
+    - "A Walk in the Woods by Bill Bryson (audio) (08.13.24)"
+    """
+    # Remove date at the end if present (keeping it as date_finished)
+    book_text = book_text.strip()
+    date_finished = parse_finished_date(book_text)
+
+    # Remove dates like (08.13.24) or (MM.DD.YY)
+    book_text = DATE_SUFFIX.sub('', book_text)
+
+    # Check if it's audio
+    is_audio = AUDIO_MARKER in book_text.lower()
+    book_text = book_text.replace('(audio)', '').replace('(Audio)', '')
+
+    # Split by "by"
+    if BY_SEPARATOR in book_text:
+        title, author = book_text.split(BY_SEPARATOR, 1)
+        title = title.strip()
+        author = author.strip()
+
+        # Clean up any remaining parentheses for series info
+        author = SERIES_SUFFIX.sub('', author).strip()
+    else:
+        title = book_text.strip()
+        author = "Unknown"
+
+    return {
+        'title': title,
+        'author': author,
+        'format': 'audio' if is_audio else 'unknown',
+        'date_finished': date_finished
+    }
+
+
+def parse_book_column(book_texts):
+    """Vectorized clean_book_title_author over a whole column of book strings
+
+    Returns a DataFrame with title, author, format and date_finished columns,
+    aligned with the input index and matching clean_book_title_author row for row.
+    """
+    import pandas as pd
+
+    texts = pd.Series(book_texts, dtype=object).map(str)
+    if texts.empty:
+        return pd.DataFrame({'title': [], 'author': [], 'format': [], 'date_finished': []},
+                            index=texts.index)
+
+    date_finished = parse_finished_dates(texts)
+    texts = texts.str.strip().str.replace(DATE_SUFFIX, '', regex=True)
+
+    is_audio = texts.str.lower().str.contains(AUDIO_MARKER, regex=False)
+    texts = texts.str.replace('(audio)', '', regex=False).str.replace('(Audio)', '', regex=False)
+
+    # partition always yields three columns, even when no row contains " by "
+    parts = texts.str.partition(BY_SEPARATOR)
+    has_by = parts[1] != ''
+
+    title = parts[0].str.strip()
+    author = parts[2].str.strip().str.replace(SERIES_SUFFIX, '', regex=True).str.strip()
+
+    return pd.DataFrame({
+        'title': title,
+        'author': author.where(has_by, 'Unknown'),
+        'format': is_audio.map({True: 'audio', False: 'unknown'}),
+        'date_finished': date_finished
+    }, index=texts.index)
@@ -0,0 +1,539 @@
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from book_enrichment import GOOGLE_BOOKS_URL, RETRY_STATUSES, TokenBucket, book_info_from_volume, \
+    empty_book_info, make_session
+from book_matching import similarity
+from lookup_cache import LookupCache, normalize_query
+
+OPENLIBRARY_URL = "https://openlibrary.org"
+
+# Fields a resolver fills in, each from the most confident provider that has it
+FIELDS = ('pages', 'published_year', 'categories', 'description', 'isbn')
+# A failover chain stops asking once these are known
+REQUIRED_FIELDS = ('pages', 'categories')
+MODES = ('concurrent', 'failover')
+# OpenLibrary subjects are plentiful and noisy; the first few are the useful ones
+MAX_SUBJECTS = 3
+# ISBNs per OpenLibrary bibkeys request (keeps the URL well under 2KB)
+ISBN_BATCH = 50
+
+_YEAR = re.compile(r'\d{4}')
+_NOT_ISBN = re.compile(r'[^0-9X]')
+
+
+def normalize_isbn(isbn) -> Optional[str]:
+    """An ISBN without hyphens or spaces, or None when nothing is left"""
+    return _NOT_ISBN.sub('', str(isbn or '').upper()) or None
+
+
+def _pick_isbn(isbns) -> Optional[str]:
+    isbns = isbns or []
+    return next((i for i in isbns if len(i) == 13), isbns[0] if isbns else None)
+
+
+def _year(text) -> Optional[str]:
+    found = _YEAR.search(str(text or ''))
+    return found.group() if found else None
+
+
+class Provider:
+    """A metadata source; ``search`` and ``by_isbn`` return a record or None
+
+    A record is a dict with the matched ``title`` and ``author`` plus any of
+    FIELDS. ``rate`` (requests per second) is enforced per provider, so
+    Google and OpenLibrary each get their own budget. ``by_isbns`` looks up
+    to ``batch_size`` ISBNs in one request where the API allows it.
+    """
+
+    name = 'provider'
+    batch_size = 1
+
+    def __init__(self, rate: Optional[float] = 5.0):
+        self.limiter = TokenBucket(rate) if rate else None
+
+    def search(self, title: str, author: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def by_isbn(self, isbn: str) -> Optional[Dict]:
+        """Lookup by ISBN; providers without one return None and are searched by title"""
+        return None
+
+    def by_isbns(self, isbns: Sequence[str]) -> Dict[str, Dict]:
+        """Records for the ISBNs that were found, keyed by ISBN"""
+        records = {isbn: self.by_isbn(isbn) for isbn in isbns}
+        return {isbn: record for isbn, record in records.items() if record is not None}
+
+    def close(self):
+        pass
+
+
+class HttpProvider(Provider):
+    """Provider over a JSON API, retrying rate limiting and server errors with jittered backoff"""
+
+    def __init__(self, base_url: str, rate: float = 5.0, timeout: float = 5, retries: int = 1,
+                 backoff: float = 0.5):
+        super().__init__(rate)
+        self.base_url = base_url
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = make_session()
+
+    def _get(self, url: str, params: Dict) -> Dict:
+        import requests
+
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except requests.RequestException as e:
+                response, error = None, e
+            if response is not None:
+                if response.status_code not in RETRY_STATUSES:
+                    # A 4xx won't change on retry, so it's raised outside the try
+                    response.raise_for_status()
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+            if attempt < self.retries:
+                time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+        raise RuntimeError(f"{self.name} gave up after {self.retries + 1} attempts ({error})")
+
+    def close(self):
+        self.session.close()
+
+
+class GoogleBooksProvider(HttpProvider):
+    name = 'google'
+
+    def __init__(self, base_url: str = GOOGLE_BOOKS_URL, **kwargs):
+        super().__init__(base_url, **kwargs)
+
+    def _first(self, query: str) -> Optional[Dict]:
+        data = self._get(self.base_url, {'q': query, 'maxResults': 1})
+        if not data.get('totalItems') or not data.get('items'):
+            return None
+        volume = data['items'][0]['volumeInfo']
+        return dict(book_info_from_volume(volume), title=volume.get('title'),
+                    author=', '.join(volume.get('authors', [])))
+
+    def search(self, title, author):
+        return self._first(f"{title} {author}")
+
+    def by_isbn(self, isbn):
+        return self._first(f"isbn:{isbn}")
+
+
+class OpenLibraryProvider(HttpProvider):
+    name = 'openlibrary'
+    batch_size = ISBN_BATCH
+
+    def __init__(self, base_url: str = OPENLIBRARY_URL, **kwargs):
+        super().__init__(base_url, **kwargs)
+
+    def search(self, title, author):
+        params = {'title': title, 'limit': 1,
+                  'fields': 'title,author_name,number_of_pages_median,first_publish_year,subject,isbn'}
+        if author and author != 'Unknown':
+            params['author'] = author
+        docs = self._get(f"{self.base_url}/search.json", params).get('docs')
+        if not docs:
+            return None
+        doc = docs[0]
+        return {
+            'title': doc.get('title'),
+            'author': ', '.join(doc.get('author_name', [])),
+            'pages': doc.get('number_of_pages_median'),
+            'published_year': str(doc['first_publish_year']) if doc.get('first_publish_year') else None,
+            'categories': doc.get('subject', [])[:MAX_SUBJECTS],
+            'description': None,
+            'isbn': _pick_isbn(doc.get('isbn')),
+        }
+
+    def by_isbn(self, isbn):
+        return self.by_isbns([isbn]).get(isbn)
+
+    def by_isbns(self, isbns):
+        """One bibkeys request for up to ISBN_BATCH ISBNs; unknown ISBNs are left out of the reply"""
+        data = self._get(f"{self.base_url}/api/books",
+                         {'bibkeys': ','.join(f"ISBN:{isbn}" for isbn in isbns),
+                          'format': 'json', 'jscmd': 'data'})
+        records = {}
+        for isbn in isbns:
+            book = data.get(f"ISBN:{isbn}")
+            if book:
+                records[isbn] = {
+                    'title': book.get('title'),
+                    'author': ', '.join(a.get('name', '') for a in book.get('authors', [])),
+                    'pages': book.get('number_of_pages'),
+                    'published_year': _year(book.get('publish_date')),
+                    'categories': [s.get('name') for s in book.get('subjects', [])][:MAX_SUBJECTS],
+                    'description': None,
+                    'isbn': isbn,
+                }
+        return records
+
+
+class StubProvider(Provider):
+    """Offline provider for tests and benchmarks
+
+    ``records`` maps an ISBN or ``normalize_query(title, author)`` to a record,
+    or is a ``(title, author, isbn) -> record`` callable. ``delay`` simulates
+    latency and ``error_rate`` failures; ``calls`` counts requests, with
+    ``batch_size`` ISBNs answered per request.
+    """
+
+    def __init__(self, name: str, records: Union[Dict, Callable], rate: Optional[float] = None,
+                 delay: float = 0.0, error_rate: float = 0.0, seed: int = 0, batch_size: int = 1):
+        super().__init__(rate)
+        self.name = name
+        self.batch_size = batch_size
+        self.records = records
+        self.delay = delay
+        self.error_rate = error_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _request(self):
+        if self.limiter is not None:
+            self.limiter.acquire()
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.error_rate
+        if self.delay:
+            time.sleep(self.delay)
+        if failed:
+            raise RuntimeError(f"{self.name} stub failure")
+
+    def _record(self, title, author, isbn):
+        if callable(self.records):
+            return self.records(title, author, isbn)
+        return self.records.get(isbn if isbn else normalize_query(title, author))
+
+    def search(self, title, author):
+        self._request()
+        return self._record(title, author, None)
+
+    def by_isbn(self, isbn):
+        self._request()
+        return self._record(None, None, isbn)
+
+    def by_isbns(self, isbns):
+        if self.batch_size == 1:
+            return super().by_isbns(isbns)
+        self._request()
+        records = {isbn: self._record(None, None, isbn) for isbn in isbns}
+        return {isbn: record for isbn, record in records.items() if record is not None}
+
+
+class ProviderMetrics:
+    """Lookups, hit rate and latency of one provider"""
+
+    def __init__(self):
+        self.requests = 0
+        self.lookups = 0
+        self.hits = 0
+        self.errors = 0
+        self.latencies: List[float] = []
+
+    def to_dict(self) -> Dict:
+        latencies = sorted(self.latencies)
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+        return {
+            'requests': self.requests,
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'errors': self.errors,
+            'hit_rate': self.hits / self.lookups if self.lookups else 0.0,
+            'mean_ms': 1000 * sum(latencies) / len(latencies) if latencies else 0.0,
+            'p95_ms': 1000 * p95,
+        }
+
+
+class MetadataResolver:
+    """Look books up across several providers and merge what they return
+
+    ``concurrent`` asks every provider at once and keeps, per field, the value
+    from the most confident record (provider order breaks ties); ``failover``
+    asks them in order and stops once pages and genres are known. A record's
+    confidence is 1.0 for an ISBN lookup, otherwise its title/author
+    similarity to the query; records under ``min_confidence`` are ignored.
+    Simultaneous lookups of the same ISBN or title share one resolution.
+
+    ``resolve_many`` handles a whole library ISBN first: known ISBNs are
+    looked up in batches (OpenLibrary takes ISBN_BATCH per request), and
+    only books without one, or whose ISBN nobody knows, are searched by
+    title and author.
+
+    ``lookup``/``enrich_all``/``close`` match EnrichmentEngine, so either can
+    be handed to simple_book_processor.build_books.
+    """
+
+    def __init__(self, providers: Sequence[Provider], mode: str = 'concurrent',
+                 min_confidence: float = 0.6, workers: int = 8,
+                 cache: Optional[LookupCache] = None):
+        if mode not in MODES:
+            raise ValueError(f"unknown mode {mode!r} (choose from {', '.join(MODES)})")
+        self.providers = list(providers)
+        self.mode = mode
+        self.min_confidence = min_confidence
+        self.workers = workers
+        self.cache = cache
+        self.metrics = {p.name: ProviderMetrics() for p in self.providers}
+        self.stats = {'lookups': 0, 'coalesced': 0, 'resolved': 0, 'failures': 0,
+                      'by_isbn': 0, 'searched': 0}
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers * len(self.providers))) \
+            if mode == 'concurrent' and len(self.providers) > 1 else None
+
+    def _failed(self, provider: Provider, what: str, e: Exception):
+        with self._lock:
+            self.metrics[provider.name].errors += 1
+        print(f"⚠️  {provider.name} lookup failed for {what}: {e}")
+
+    def _ask(self, provider: Provider, title, author,
+             isbn) -> Tuple[Optional[Tuple[float, Dict]], bool]:
+        """((confidence, record) or None on a miss or weak match, whether a request errored)
+
+        A failed ISBN lookup still falls back to the title search.
+        """
+        metrics = self.metrics[provider.name]
+        start = time.perf_counter()
+        requests = 0
+        record = None
+        failed = False
+        confidence = 1.0
+        if isbn:
+            requests += 1
+            try:
+                record = provider.by_isbn(isbn)
+            except Exception as e:
+                failed = True
+                self._failed(provider, f"ISBN {isbn}", e)
+        if record is None and title:
+            requests += 1
+            try:
+                record = provider.search(title, author)
+                if record is not None:
+                    confidence = similarity(title, author, record.get('title'), record.get('author'))
+            except Exception as e:
+                record = None
+                failed = True
+                self._failed(provider, f"'{title}'", e)
+        found = record is not None and confidence >= self.min_confidence
+        with self._lock:
+            metrics.requests += requests
+            metrics.lookups += 1
+            metrics.hits += found
+            metrics.latencies.append(time.perf_counter() - start)
+        return ((confidence, record) if found else None), failed
+
+    def _ask_batch(self, provider: Provider, isbns: List[str]) -> Tuple[Dict[str, Dict], bool]:
+        """({isbn: record} from one by_isbns request, whether it errored)"""
+        metrics = self.metrics[provider.name]
+        start = time.perf_counter()
+        failed = False
+        try:
+            records = provider.by_isbns(isbns)
+        except Exception as e:
+            records = {}
+            failed = True
+            self._failed(provider, f"{len(isbns)} ISBNs", e)
+        with self._lock:
+            metrics.requests += 1
+            metrics.lookups += len(isbns)
+            metrics.hits += len(records)
+            metrics.latencies.append(time.perf_counter() - start)
+        return records, failed
+
+    def _cached(self, key: str) -> Tuple[bool, Optional[Dict]]:
+        hit, result = self.cache.get(f"resolved:{key}") if self.cache else (False, None)
+        return hit, (self._merge([]) if hit and result is None else result)
+
+    def _cache(self, key: str, result: Dict):
+        """Cache a result; one no provider matched is stored as a miss, with the cache's negative TTL"""
+        self.cache.put(f"resolved:{key}", result if result['sources'] else None)
+
+    @staticmethod
+    def _merge(answers: List[Tuple[float, Dict, str]]) -> Dict:
+        merged = dict.fromkeys(FIELDS)
+        merged.update(categories=[], confidence=0.0, sources={})
+        # Stable sort: equally confident records keep provider order
+        for confidence, record, name in sorted(answers, key=lambda a: -a[0]):
+            merged['confidence'] = max(merged['confidence'], confidence)
+            for field in FIELDS:
+                if record.get(field) and not merged[field]:
+                    merged[field] = record[field]
+                    merged['sources'][field] = name
+        return merged
+
+    def _resolve(self, title, author, isbn) -> Tuple[Dict, bool]:
+        """The merged result, and whether any provider asked errored (so it may be incomplete)"""
+        if self.mode == 'concurrent' and self._pool is not None:
+            futures = [(p.name, self._pool.submit(self._ask, p, title, author, isbn))
+                       for p in self.providers]
+            replies = [(name, *f.result()) for name, f in futures]
+            answers = [(*answer, name) for name, answer, _ in replies if answer is not None]
+            return self._merge(answers), any(failed for _, _, failed in replies)
+
+        answers = []
+        any_failed = False
+        for provider in self.providers:
+            answer, failed = self._ask(provider, title, author, isbn)
+            any_failed = any_failed or failed
+            if answer is not None:
+                answers.append((*answer, provider.name))
+                merged = self._merge(answers)
+                if all(merged[field] for field in REQUIRED_FIELDS):
+                    return merged, any_failed
+        return self._merge(answers), any_failed
+
+    def resolve(self, title: str = None, author: str = None, isbn: str = None) -> Dict:
+        """Merged FIELDS for a book, plus ``confidence`` and the provider ``sources`` of each field"""
+        key = f"isbn:{isbn}" if isbn else normalize_query(title or '', author or '')
+        with self._lock:
+            self.stats['lookups'] += 1
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.stats['coalesced'] += 1
+        if not owner:
+            return dict(future.result())
+
+        try:
+            hit, result = self._cached(key)
+            if not hit:
+                result, failed = self._resolve(title, author, isbn)
+                # Like EnrichmentEngine, a result a failure may have left short isn't cached
+                if self.cache and not failed:
+                    self._cache(key, result)
+            future.set_result(result)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        with self._lock:
+            self.stats['resolved'] += 1
+        return dict(result)
+
+    def _resolve_isbns(self, isbns: List[str]) -> Dict[str, Dict]:
+        """Merged results for distinct ISBNs, asking batch providers first and the rest only for gaps"""
+        results = {}
+        if self.cache:
+            for isbn in isbns:
+                hit, result = self._cached(f"isbn:{isbn}")
+                if hit:
+                    results[isbn] = result
+        pending = [isbn for isbn in isbns if isbn not in results]
+        answers = {isbn: [] for isbn in pending}
+        failed = set()  # ISBNs in a batch that errored, whose results aren't cached
+
+        # Stable sort: providers that batch go first, otherwise in their usual order
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for provider in sorted(self.providers, key=lambda p: -p.batch_size):
+                missing = [isbn for isbn in pending
+                           if not all(self._merge(answers[isbn])[field] for field in REQUIRED_FIELDS)]
+                batches = [missing[i:i + provider.batch_size]
+                           for i in range(0, len(missing), provider.batch_size)]
+                replies = executor.map(lambda batch: self._ask_batch(provider, batch), batches)
+                for batch, (records, errored) in zip(batches, replies):
+                    if errored:
+                        failed.update(batch)
+                    for isbn, record in records.items():
+                        answers[isbn].append((1.0, record, provider.name))
+
+        for isbn in pending:
+            results[isbn] = self._merge(answers[isbn])
+            if self.cache and isbn not in failed:
+                self._cache(f"isbn:{isbn}", results[isbn])
+        with self._lock:
+            self.stats['resolved'] += len(pending)
+        return results
+
+    def resolve_many(self, books: Sequence[Tuple]) -> List[Dict]:
+        """Enrichment fields for (title, author) or (title, author, isbn) books, in input order
+
+        Every known ISBN is resolved in batches first; the text search runs
+        only for the books left over, so results for books with an ISBN
+        don't depend on search ranking.
+        """
+        books = [(book[0], book[1], normalize_isbn(book[2]) if len(book) > 2 else None)
+                 for book in books]
+        isbns = list(dict.fromkeys(isbn for _, _, isbn in books if isbn))
+        by_isbn = self._resolve_isbns(isbns) if isbns else {}
+
+        results: List[Optional[Dict]] = [None] * len(books)
+        for i, (_, _, isbn) in enumerate(books):
+            result = by_isbn.get(isbn) if isbn else None
+            if result and result['sources']:
+                results[i] = {field: result[field] for field in FIELDS}
+                results[i]['isbn'] = results[i]['isbn'] or isbn
+        rest = [i for i, result in enumerate(results) if result is None]
+        with self._lock:
+            self.stats['lookups'] += len(books) - len(rest)
+            self.stats['by_isbn'] += len(books) - len(rest)
+            self.stats['searched'] += len(rest)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            searched = executor.map(lambda i: self.lookup(books[i][0], books[i][1]), rest)
+            for i, result in zip(rest, searched):
+                results[i] = result
+        return results
+
+    def lookup(self, title: str, author: str, isbn: str = None) -> Dict:
+        """Enrichment fields for one book (empty ones when nothing matched or it failed)"""
+        try:
+            result = self.resolve(title, author, isbn)
+        except Exception as e:
+            with self._lock:
+                self.stats['failures'] += 1
+            print(f"API error for '{title}': {e}")
+            return empty_book_info()
+        return {field: result[field] for field in FIELDS}
+
+    def enrich_all(self, books: List[Tuple]) -> List[Dict]:
+        """Look up (title, author[, isbn]) books, returning results in input order"""
+        return self.resolve_many(books)
+
+    def report(self) -> str:
+        lines = [f"🔎 {self.stats['resolved']} books resolved ({self.mode}), "
+                 f"{self.stats['coalesced']} duplicate lookups coalesced"]
+        if self.stats['by_isbn']:
+            lines.append(f"   {self.stats['by_isbn']} found by ISBN, "
+                         f"{self.stats['searched']} searched by title")
+        for name, metrics in self.metrics.items():
+            m = metrics.to_dict()
+            lines.append(f"   {name:<12} {m['requests']:>6} requests, {m['lookups']:>6} lookups, "
+                         f"{m['hit_rate']:.0%} hits, "
+                         f"{m['errors']} errors, mean {m['mean_ms']:.0f}ms, p95 {m['p95_ms']:.0f}ms")
+        return '\n'.join(lines)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+        for provider in self.providers:
+            provider.close()
+
+
+PROVIDERS = {'google': GoogleBooksProvider, 'openlibrary': OpenLibraryProvider}
+
+
+def make_resolver(names: Sequence[str] = ('google', 'openlibrary'), mode: str = 'concurrent',
+                  rate: float = 5.0, workers: int = 8,
+                  cache: Optional[LookupCache] = None) -> MetadataResolver:
+    """A resolver over the named HTTP providers, each limited to ``rate`` requests/second"""
+    unknown = [name for name in names if name not in PROVIDERS]
+    if unknown:
+        raise ValueError(f"unknown provider: {', '.join(unknown)} (choose from {', '.join(PROVIDERS)})")
+    return MetadataResolver([PROVIDERS[name](rate=rate) for name in names], mode=mode,
+                            workers=workers, cache=cache)
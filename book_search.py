@@ -0,0 +1,167 @@
+import heapq
+import re
+from bisect import bisect_left, insort
+from typing import Dict, List
+
+# How much a match in each field counts towards a book's score
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'author': 2.5,
+    'personal_tags': 2.0,
+    'favorite_quotes': 1.0,
+    'notes': 1.0,
+    'description': 0.5,
+}
+# A query word that is only a prefix of the indexed word ("dun" -> "dune") counts for less
+PREFIX_FACTOR = 0.6
+
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text) -> List[str]:
+    if not text:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = ' '.join(str(t) for t in text if t)
+    return _TOKEN.findall(str(text).lower())
+
+
+class SearchIndex:
+    """Inverted index over the searchable book fields with prefix matching and ranking
+
+    Books are identified by their position in the list passed to ``build``.
+    Every query word must match (as a whole word or a word prefix) somewhere
+    in the book; results are ordered by field-weighted score.
+    """
+
+    def __init__(self, books=None):
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.terms: List[str] = []  # sorted vocabulary, for prefix lookups
+        self.doc_terms: Dict[int, Dict[str, float]] = {}
+        self._ranked_cache: Dict[str, List[int]] = {}
+        self._term_total = 0
+        if books is not None:
+            self.build(books)
+
+    def build(self, books):
+        self.postings = {}
+        self.doc_terms = {}
+        self._ranked_cache = {}
+        self._term_total = 0
+        for doc_id, book in enumerate(books):
+            self._index(doc_id, book)
+        self.terms = sorted(self.postings)
+
+    def _weights(self, book):
+        weights = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(book.get(field)):
+                weights[term] = weights.get(term, 0) + weight
+        return weights
+
+    def _index(self, doc_id, book):
+        weights = self._weights(book)
+        self.doc_terms[doc_id] = weights
+        self._term_total += len(weights)
+        for term, weight in weights.items():
+            self.postings.setdefault(term, {})[doc_id] = weight
+
+    def remove(self, doc_id):
+        terms = self.doc_terms.pop(doc_id, {})
+        self._term_total -= len(terms)
+        for term in terms:
+            self._ranked_cache.pop(term, None)
+            docs = self.postings[term]
+            del docs[doc_id]
+            if not docs:
+                del self.postings[term]
+                del self.terms[bisect_left(self.terms, term)]
+
+    def update(self, doc_id, book):
+        """Re-index one book after it was edited (or index a new one)"""
+        self.remove(doc_id)
+        weights = self._weights(book)
+        self.doc_terms[doc_id] = weights
+        self._term_total += len(weights)
+        for term, weight in weights.items():
+            if term not in self.postings:
+                self.postings[term] = {}
+                insort(self.terms, term)
+            self._ranked_cache.pop(term, None)
+            self.postings[term][doc_id] = weight
+
+    def _expand(self, word) -> List[str]:
+        """Every indexed term that starts with ``word``"""
+        matches = []
+        i = bisect_left(self.terms, word)
+        while i < len(self.terms) and self.terms[i].startswith(word):
+            matches.append(self.terms[i])
+            i += 1
+        return matches
+
+    def _ranked(self, term) -> List[int]:
+        """Doc ids for one term, best first (cached until the term's postings change)"""
+        ranked = self._ranked_cache.get(term)
+        if ranked is None:
+            docs = self.postings[term]
+            ranked = sorted(docs, key=lambda doc_id: (-docs[doc_id], doc_id))
+            self._ranked_cache[term] = ranked
+        return ranked
+
+    def search(self, query: str, limit: int = None) -> List[int]:
+        """Doc ids matching every word of ``query``, best first"""
+        words = tokenize(query)
+        if not words:
+            return []
+
+        expansions = [self._expand(word) for word in words]
+        if not all(expansions):
+            return []
+
+        # One word matching one term: the answer is that term's ranked posting list
+        if len(words) == 1 and len(expansions[0]) == 1:
+            ranked = self._ranked(expansions[0][0])
+            return ranked[:limit] if limit else list(ranked)
+
+        # Score the rarest word first, then only ever narrow that candidate set
+        sizes = [sum(len(self.postings[t]) for t in terms) for terms in expansions]
+        order = sorted(range(len(words)), key=sizes.__getitem__)
+        terms_per_doc = self._term_total / max(1, len(self.doc_terms))
+
+        scores = {}
+        for term in expansions[order[0]]:
+            factor = 1.0 if term == words[order[0]] else PREFIX_FACTOR
+            for doc_id, weight in self.postings[term].items():
+                scores[doc_id] = scores.get(doc_id, 0) + weight * factor
+
+        for i in order[1:]:
+            word, terms = words[i], expansions[i]
+            narrowed = {}
+            by_postings = sum(min(len(scores), len(self.postings[t])) for t in terms)
+            if by_postings <= len(scores) * terms_per_doc:
+                for term in terms:
+                    factor = 1.0 if term == word else PREFIX_FACTOR
+                    docs = self.postings[term]
+                    if len(docs) < len(scores):
+                        matches = ((d, w) for d, w in docs.items() if d in scores)
+                    else:
+                        matches = ((d, docs[d]) for d in scores if d in docs)
+                    for doc_id, weight in matches:
+                        narrowed[doc_id] = narrowed.get(doc_id, scores[doc_id]) + weight * factor
+            else:
+                # A short prefix with a huge family of terms: check each candidate's own terms
+                for doc_id, score in scores.items():
+                    extra = sum(weight * (1.0 if term == word else PREFIX_FACTOR)
+                                for term, weight in self.doc_terms[doc_id].items()
+                                if term.startswith(word))
+                    if extra:
+                        narrowed[doc_id] = score + extra
+            scores = narrowed
+            if not scores:
+                return []
+
+        # Rounded so float summation order can't reshuffle equal scores
+        rank = lambda doc_id: (-round(scores[doc_id], 6), doc_id)  # noqa: E731
+        if limit:
+            return heapq.nsmallest(limit, scores, key=rank)
+        return sorted(scores, key=rank)
@@ -0,0 +1,199 @@
+import json
+import os
+import shutil
+import sys
+from itertools import chain
+from typing import TYPE_CHECKING, List, Optional
+
+from book_store import data_fingerprint
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# Bump when the column layout changes so old snapshots are ignored
+SNAPSHOT_VERSION = 2
+
+# Typed columns the analyzer needs, including its derived ones
+NUMERIC_COLUMNS = ['year_read', 'rating', 'pages_numeric', 'has_rating', 'decade_read',
+                   'finished_day']
+# Repetitive text stored once per distinct value, as int32 codes into a vocabulary
+DICTIONARY_COLUMNS = ['author', 'format', 'published_year', 'primary_genre']
+# List fields: per-book offsets into one flat array of vocabulary codes
+LIST_COLUMNS = ['categories', 'personal_tags']
+
+
+def snapshot_dir(data_file):
+    return f"{data_file}.snapshot"
+
+
+def _write_vocab(path, values):
+    values = [str(v) for v in values]
+    # NUL separates the entries; a value containing one can't be stored this way
+    if any('\x00' in v for v in values):
+        raise ValueError(f"{os.path.basename(path)}: NUL character in a value")
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\x00'.join(values))
+    return len(values)
+
+
+def _read_vocab(path, size) -> List[str]:
+    if size == 0:
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read().split('\x00')
+
+
+def _numeric(name, values) -> 'np.ndarray':
+    """A numeric analysis column as the snapshot stores it"""
+    import numpy as np
+    import pandas as pd
+
+    if name in ('year_read', 'decade_read') and values.notna().all():
+        return values.to_numpy(dtype=np.int32)
+    if name == 'has_rating':
+        return values.to_numpy(dtype=bool)
+    return pd.to_numeric(values, errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _factorize(values):
+    """(int32 codes, distinct values as text) of a dictionary column; missing values get -1"""
+    import numpy as np
+    import pandas as pd
+
+    # Compare as text, the way the vocabulary stores it, so 1949 and '1949' are one entry
+    codes, uniques = pd.factorize(values.astype(object).map(str, na_action='ignore'))
+    return codes.astype(np.int32), list(uniques)
+
+
+def typed_columns(df: 'pd.DataFrame') -> 'pd.DataFrame':
+    """Convert ``df``'s analysis columns, in place, to the dtypes read_snapshot returns
+
+    The JSON load path calls this too, so the panels (and the cache keys
+    hashed from their columns) see the same data whichever path loaded it.
+    """
+    import pandas as pd
+
+    for name in NUMERIC_COLUMNS:
+        df[name] = _numeric(name, df[name])
+    for name in DICTIONARY_COLUMNS:
+        values = df[name] if name in df else pd.Series([None] * len(df), dtype=object)
+        codes, uniques = _factorize(values)
+        df[name] = pd.Categorical.from_codes(codes, categories=pd.Index(uniques, dtype=object))
+    # pages_numeric is what every plot uses; the raw pages column reads the same
+    df['pages'] = df['pages_numeric']
+    return df
+
+
+def write_snapshot(df: 'pd.DataFrame', data_file):
+    """Store ``df``'s analysis columns as .npy files (plus vocabularies) next to the library
+
+    Files are written to a temporary directory that replaces the old
+    snapshot only once complete; ``meta.json`` records the library's
+    fingerprint so a later edit makes the snapshot stale.
+    """
+    import numpy as np
+    import pandas as pd
+
+    target = snapshot_dir(data_file)
+    tmp = f"{target}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    columns = {}
+
+    for name in NUMERIC_COLUMNS:
+        np.save(os.path.join(tmp, f"{name}.npy"), _numeric(name, df[name]))
+        columns[name] = {'kind': 'numeric'}
+
+    for name in DICTIONARY_COLUMNS:
+        values = df[name] if name in df else pd.Series([None] * len(df), dtype=object)
+        codes, uniques = _factorize(values)
+        np.save(os.path.join(tmp, f"{name}.npy"), codes)
+        size = _write_vocab(os.path.join(tmp, f"{name}.vocab"), uniques)
+        columns[name] = {'kind': 'dictionary', 'vocab_size': size}
+
+    for name in LIST_COLUMNS:
+        values = df[name] if name in df else pd.Series([None] * len(df), dtype=object)
+        lists = [v if isinstance(v, list) else [] for v in values]
+        offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+        np.cumsum([len(v) for v in lists], out=offsets[1:])
+        codes, uniques = pd.factorize(pd.Series(list(chain.from_iterable(lists)), dtype=object))
+        np.save(os.path.join(tmp, f"{name}.offsets.npy"), offsets)
+        np.save(os.path.join(tmp, f"{name}.npy"), codes.astype(np.int32))
+        size = _write_vocab(os.path.join(tmp, f"{name}.vocab"), uniques)
+        columns[name] = {'kind': 'list', 'vocab_size': size}
+
+    with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump({'version': SNAPSHOT_VERSION, 'source': data_fingerprint(data_file),
+                   'rows': len(df), 'columns': columns}, f)
+
+    # A directory can't be renamed over a non-empty one, so move the old one aside first
+    old = f"{target}.old-{os.getpid()}"
+    if os.path.exists(target):
+        os.rename(target, old)
+    os.rename(tmp, target)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def _meta(data_file) -> Optional[dict]:
+    try:
+        with open(os.path.join(snapshot_dir(data_file), 'meta.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if meta.get('version') != SNAPSHOT_VERSION or meta.get('source') != data_fingerprint(data_file):
+        return None
+    return meta
+
+
+def read_snapshot(data_file) -> Optional['pd.DataFrame']:
+    """The analysis DataFrame from a fresh snapshot (memory-mapped), or None if stale or missing
+
+    Dictionary columns come back as pandas Categoricals; list columns are
+    left on disk (see ``read_list_column``).
+    """
+    meta = _meta(data_file)
+    if meta is None:
+        return None
+
+    import numpy as np
+    import pandas as pd
+
+    directory = snapshot_dir(data_file)
+    data = {}
+    for name, spec in meta['columns'].items():
+        if spec['kind'] == 'list':
+            continue
+        array = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+        if spec['kind'] == 'dictionary':
+            vocab = _read_vocab(os.path.join(directory, f"{name}.vocab"), spec['vocab_size'])
+            data[name] = pd.Categorical.from_codes(array, categories=pd.Index(vocab, dtype=object))
+        else:
+            data[name] = array
+    df = pd.DataFrame(data)
+    # pages_numeric is what every plot uses; the raw pages column reads the same
+    df['pages'] = df['pages_numeric']
+    return df
+
+
+def read_list_column(data_file, name):
+    """(offsets, codes, vocabulary) for a list column: book i has vocab[codes[offsets[i]:offsets[i+1]]]"""
+    meta = _meta(data_file)
+    if meta is None:
+        return None
+    import numpy as np
+
+    directory = snapshot_dir(data_file)
+    offsets = np.load(os.path.join(directory, f"{name}.offsets.npy"), mmap_mode='r')
+    codes = np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+    vocab = _read_vocab(os.path.join(directory, f"{name}.vocab"), meta['columns'][name]['vocab_size'])
+    return offsets, codes, vocab
+
+
+if __name__ == "__main__":
+    from reading_dashboard import ReadingAnalyzer
+
+    data_file = sys.argv[1] if len(sys.argv) > 1 else 'enhanced_books.json'
+    # Loading through the analyzer writes the snapshot when it's stale
+    ReadingAnalyzer(data_file)
+    print(f"✅ Snapshot up to date in {snapshot_dir(data_file)}")
@@ -0,0 +1,331 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime
+
+
+def atomic_write_json(path, data, indent=2):
+    """Write JSON to a temp file and rename it over ``path`` so readers never see a partial file
+
+    ``indent=None`` writes it on one line with the C encoder, several times
+    faster for the large files only programs read back.
+    """
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(data, indent=indent, ensure_ascii=False))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+
+
+# write_books output: 2-space indented array (the default), whitespace-free array, one book per line
+JSON_STYLES = ('indent', 'compact', 'ndjson')
+READ_CHUNK = 1 << 16
+
+
+def book_encoder(style='indent'):
+    """The JSON encoder write_books uses for one book in ``style``"""
+    if style not in JSON_STYLES:
+        raise ValueError(f"unknown JSON style {style!r} (choose from {', '.join(JSON_STYLES)})")
+    if style == 'indent':
+        return json.JSONEncoder(indent=2, ensure_ascii=False)
+    # Without indent the encoder runs in C
+    return json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+
+def write_books(path, books, style='indent', encoded=False):
+    """Atomically write an iterable of books to ``path`` one at a time; returns how many
+
+    ``indent`` gives the same bytes as ``json.dump(books, indent=2)``; ``compact``
+    is several times faster to write and read; ``ndjson`` is one book per line.
+    Only one book is encoded at a time, so memory doesn't grow with the library.
+    With ``encoded`` the books are already JSON text, as ``book_encoder(style)`` gives.
+    """
+    encode = book_encoder(style).encode
+    if style == 'indent':
+        first, between, last, empty = '[\n  ', ',\n  ', '\n]', '[]'
+    else:
+        first, between, last, empty = ('', '\n', '\n', '') if style == 'ndjson' else \
+            ('[', ',', ']', '[]')
+
+    count = 0
+    tmp_file = f"{path}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        for book in books:
+            text = book if encoded else encode(book)
+            if style == 'indent':
+                # Strings can't hold raw newlines in JSON, so every newline is layout
+                text = text.replace('\n', '\n  ')
+            f.write((between if count else first) + text)
+            count += 1
+        f.write(last if count else empty)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+    return count
+
+
+def iter_books(path):
+    """Yield the books of a JSON array or NDJSON file one at a time, without reading it all in"""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer, pos, eof = f.read(READ_CHUNK), 0, False
+        in_array = buffer.lstrip().startswith('[')
+        if in_array:
+            pos = buffer.index('[') + 1
+        chunk = READ_CHUNK
+
+        while True:
+            # Skip layout between books; NDJSON separates them with newlines, arrays with commas
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']' and in_array:
+                return
+            if pos < len(buffer):
+                try:
+                    book, end = decoder.raw_decode(buffer, pos)
+                    # A book ending exactly at the buffer's end might continue past it
+                    if end < len(buffer) or eof:
+                        yield book
+                        pos = end
+                        chunk = READ_CHUNK
+                        continue
+                except ValueError:
+                    if eof:
+                        raise
+            elif eof:
+                if in_array:
+                    raise ValueError(f"{path}: unexpected end of file inside the book list")
+                return
+
+            # Need more text; a book bigger than the buffer doubles the next read
+            more = f.read(chunk)
+            eof = not more
+            buffer, pos = buffer[pos:] + more, 0
+            chunk *= 2
+
+
+def prune_backups(json_file, keep):
+    """Delete all but the ``keep`` newest ``<json_file>.backup.*`` files"""
+    # Timestamps in the names sort chronologically
+    backups = sorted(glob.glob(f"{glob.escape(json_file)}.backup.*"))
+    for old in backups[:-keep] if keep else backups:
+        os.remove(old)
+
+
+def journal_path(json_file):
+    return f"{json_file}.journal"
+
+
+def data_fingerprint(data_file):
+    """Size and mtime of every file the library is read from (data, journal, SQLite WAL)
+
+    Files derived from the library (summary, snapshot) store this and are
+    trusted only while it still matches.
+    """
+    fingerprint = []
+    for path in (data_file, journal_path(data_file), f"{data_file}-wal"):
+        try:
+            stat = os.stat(path)
+            fingerprint.append([os.path.basename(path), stat.st_size, stat.st_mtime_ns])
+        except FileNotFoundError:
+            pass
+    return fingerprint
+
+
+def _parse_books(data):
+    """The book list in the bytes of a JSON array or NDJSON file"""
+    text = data.decode('utf-8')
+    if text.lstrip().startswith('['):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def read_books(path):
+    """The whole book list from a JSON array or NDJSON file"""
+    with open(path, 'rb') as f:
+        return _parse_books(f.read())
+
+
+def base_stamp(data):
+    """What a journal's first line records about the JSON file its edits apply to"""
+    return {'op': 'base', 'size': len(data), 'sha1': hashlib.sha1(data).hexdigest()}
+
+
+def replace_books(json_file, books, style='indent'):
+    """Atomically replace the whole library, dropping any journal that described the old one
+
+    A crash before the journal is gone leaves it stamped with the old
+    file, so loading skips it instead of replaying it onto the new one.
+    Returns how many books were written.
+    """
+    count = write_books(json_file, books, style)
+    if os.path.exists(journal_path(json_file)):
+        os.remove(journal_path(json_file))
+    return count
+
+
+def open_store(path='enhanced_books.json'):
+    """Pick the store for a library file: SQLite for .db/.sqlite paths, journaled JSON otherwise"""
+    from book_db import DatabaseBookStore, is_database_path
+    if is_database_path(path):
+        return DatabaseBookStore(path)
+    return JournaledBookStore(path)
+
+
+def load_books(path='enhanced_books.json', repair=False):
+    """Load the book list, including edits still sitting in the journal
+
+    By default this never writes: a torn last journal line is skipped rather
+    than cut off, as it may be an append still in progress. Only the one
+    process that writes the library should pass ``repair=True``.
+    """
+    return open_store(path).load(repair)
+
+
+class JournaledBookStore:
+    """enhanced_books.json plus an append-only journal of edits
+
+    Edits are buffered with ``record``/``add`` and appended to
+    ``<json_file>.journal`` by ``flush`` - O(changes) I/O instead of rewriting
+    the whole library. ``compact`` folds the journal back into the JSON file
+    with an atomic rename, keeping the previous file as a timestamped backup
+    (only the newest ``backup_retention`` are kept).
+
+    A journal starts with the size and SHA-1 of the JSON file it was
+    started against. One left behind by a crash during ``compact`` (or
+    ``replace_books``) no longer matches the new file, so it is skipped
+    rather than replayed on top of edits the file already has.
+    """
+
+    def __init__(self, json_file='enhanced_books.json', backup_retention=5, compact_every=500):
+        self.json_file = json_file
+        self.journal_file = journal_path(json_file)
+        self.backup_retention = backup_retention
+        self.compact_every = compact_every
+        self.books = []
+        self.pending = []
+        self.journal_entries = 0
+        self._positions = {}
+        self._stamp = None  # base_stamp of the JSON file the books were loaded from
+
+    def load(self, repair=False):
+        """Read the JSON file and replay the journal on top of it
+
+        With ``repair`` (the writer only) a torn last line is cut off and a
+        journal stamped with another JSON file is moved aside to ``.stale``.
+        """
+        with open(self.json_file, 'rb') as f:
+            data = f.read()
+        self.books = _parse_books(data)
+        # Kept for the writer, whose next new journal must be stamped with what it loaded
+        self._stamp = base_stamp(data) if repair else None
+
+        self.journal_entries = 0
+        stale = False
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, 'rb+' if repair else 'rb') as f:
+                good_bytes = 0
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A crash mid-append can only damage the last line - cut it off
+                        # so later appends don't land behind it
+                        if repair:
+                            f.truncate(good_bytes)
+                        break
+                    if entry.get('op') == 'base':
+                        # Journals from before stamping have no header and are trusted
+                        stale = good_bytes == 0 and (entry['size'] != len(data) or
+                                                     entry != (self._stamp or base_stamp(data)))
+                        if stale:
+                            break
+                    else:
+                        self._apply(entry)
+                        self.journal_entries += 1
+                    good_bytes += len(line)
+        if stale and repair:
+            print(f"⚠️  {self.journal_file} was left from an older {self.json_file}; "
+                  f"moved it to {self.journal_file}.stale")
+            os.replace(self.journal_file, f"{self.journal_file}.stale")
+
+        self._positions = {id(book): i for i, book in enumerate(self.books)}
+        self.pending = []
+        return self.books
+
+    def _apply(self, entry):
+        if entry['op'] == 'add':
+            self.books.append(entry['book'])
+        elif entry['op'] == 'set' and 0 <= entry['index'] < len(self.books):
+            self.books[entry['index']].update(entry['fields'])
+
+    def record(self, book, *fields):
+        """Note that ``fields`` of ``book`` (a dict from ``books``) were edited in place"""
+        self.pending.append({
+            'op': 'set',
+            'index': self._positions[id(book)],
+            'fields': {field: book.get(field) for field in fields}
+        })
+
+    def add(self, book):
+        """Append a new book to the library"""
+        self._positions[id(book)] = len(self.books)
+        self.books.append(book)
+        self.pending.append({'op': 'add', 'book': book})
+
+    def discard(self):
+        """Forget buffered edits (they stay applied to the in-memory dicts)"""
+        self.pending = []
+
+    def flush(self, compact=True):
+        """Append buffered edits to the journal; returns how many were written
+
+        With ``compact`` (the default) a long journal is folded back into the JSON file.
+        """
+        if not self.pending:
+            return 0
+
+        with open(self.journal_file, 'a', encoding='utf-8') as f:
+            if not f.tell():
+                # A new journal: stamp it with the file its edits apply to
+                if self._stamp is None:
+                    with open(self.json_file, 'rb') as base:
+                        self._stamp = base_stamp(base.read())
+                f.write(json.dumps(self._stamp) + '\n')
+            for entry in self.pending:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+        written = len(self.pending)
+        self.journal_entries += written
+        self.pending = []
+
+        if compact and self.journal_entries >= self.compact_every:
+            self.compact()
+        return written
+
+    def compact(self):
+        """Rewrite the JSON file with every edit applied and empty the journal"""
+        # Buffered edits are already applied to ``books``, so they're saved too
+        self.pending = []
+
+        if os.path.exists(self.json_file) and self.backup_retention:
+            backup_file = f"{self.json_file}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            try:
+                # A hard link keeps the old version without copying it
+                os.link(self.json_file, backup_file)
+            except (OSError, AttributeError):
+                shutil.copy(self.json_file, backup_file)
+            prune_backups(self.json_file, self.backup_retention)
+
+        write_books(self.json_file, self.books)
+        # Only drop the journal once the compacted file is safely in place. Until
+        # then it is stamped with the old file, so a crash here doesn't replay it
+        if os.path.exists(self.journal_file):
+            os.remove(self.journal_file)
+        self.journal_entries = 0
+        self._stamp = None
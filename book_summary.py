@@ -0,0 +1,238 @@
+import json
+from collections import Counter
+from typing import Dict, List, Optional
+
+from book_store import atomic_write_json, data_fingerprint, load_books
+
+# Bump when the summary layout changes so old files are rebuilt
+SUMMARY_VERSION = 1
+# Longest books kept so removing the longest one rarely needs a rescan
+LONGEST_KEPT = 10
+
+
+def summary_path(data_file):
+    return f"{data_file}.summary.json"
+
+
+def _number(value) -> Optional[float]:
+    """Numeric value of a pages/rating field, or None when missing or not a number"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if number != number:  # NaN from a DataFrame round trip
+        return None
+    return int(number) if number.is_integer() else number
+
+
+# Every field _apply reads; enough to rebuild a book's old contribution
+SUMMARY_FIELDS = ('title', 'author', 'year_read', 'categories', 'genres', 'rating', 'pages')
+
+
+def _get(book, field):
+    return book.get(field) if isinstance(book, dict) else getattr(book, field, None)
+
+
+class ReadingSummary:
+    """Library-wide counts and totals, built in one pass and kept current edit by edit
+
+    Every aggregate the stats screens print is a sum over books, so an edit
+    is applied by subtracting the book's old contribution and adding the new
+    one. Books are dicts in the enhanced_books.json format (``Book`` and
+    ``BookRef`` objects from book_collection work too; their ``genres`` count
+    as categories).
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.years = Counter()
+        self.genres = Counter()
+        self.authors = Counter()
+        self.ratings = Counter()
+        self.rating_sum = 0
+        self.pages_total = 0
+        self.pages_books = 0
+        self.longest: List[List] = []  # [pages, title], longest first
+        self.five_star: List[List] = []  # [title, author, year_read], library order
+        self.stale = False  # the longest list ran dry and needs a rebuild
+
+    @classmethod
+    def build(cls, books) -> 'ReadingSummary':
+        summary = cls()
+        for book in books:
+            summary.add(book)
+        return summary
+
+    @staticmethod
+    def _count(counter, key, sign):
+        counter[key] += sign
+        # Drop keys that fall to zero so len() counts what's actually there
+        if counter[key] <= 0:
+            del counter[key]
+
+    def _apply(self, book, sign):
+        self.total += sign
+        year = _get(book, 'year_read')
+        if year is not None:
+            self._count(self.years, int(year), sign)
+        for genre in _get(book, 'categories') or _get(book, 'genres') or []:
+            self._count(self.genres, genre, sign)
+        author = _get(book, 'author')
+        if author:
+            self._count(self.authors, author, sign)
+
+        rating = _number(_get(book, 'rating'))
+        if rating is not None:
+            self._count(self.ratings, rating, sign)
+            self.rating_sum += sign * rating
+        pages = _number(_get(book, 'pages'))
+        if pages:
+            self.pages_total += sign * pages
+            self.pages_books += sign
+
+        title = _get(book, 'title')
+        if rating == 5:
+            entry = [title, author, year]
+            if sign > 0:
+                self.five_star.append(entry)
+            elif entry in self.five_star:
+                self.five_star.remove(entry)
+        if pages and sign > 0:
+            if len(self.longest) < LONGEST_KEPT or pages > self.longest[-1][0]:
+                self.longest.append([pages, title])
+                self.longest.sort(key=lambda entry: -entry[0])
+                del self.longest[LONGEST_KEPT:]
+        elif pages and [pages, title] in self.longest:
+            self.longest.remove([pages, title])
+            self.stale = not self.longest and self.pages_books > 0
+
+    def add(self, book):
+        self._apply(book, 1)
+
+    def remove(self, book):
+        self._apply(book, -1)
+
+    def update(self, book, before: Dict):
+        """Account for an in-place edit; ``before`` holds the edited fields' old values"""
+        old = dict(book) if isinstance(book, dict) else {f: _get(book, f) for f in SUMMARY_FIELDS}
+        old.update(before)
+        self.remove(old)
+        self.add(book)
+
+    def merge(self, other: 'ReadingSummary') -> 'ReadingSummary':
+        """Add another summary's books (another reader's library, say) to this one; returns self"""
+        self.total += other.total
+        for name in ('years', 'genres', 'authors', 'ratings'):
+            getattr(self, name).update(getattr(other, name))
+        self.rating_sum += other.rating_sum
+        self.pages_total += other.pages_total
+        self.pages_books += other.pages_books
+        self.longest = sorted(self.longest + other.longest, key=lambda entry: -entry[0])[:LONGEST_KEPT]
+        self.five_star.extend(other.five_star)
+        self.stale = self.stale or other.stale
+        return self
+
+    # Derived values the stats screens print
+
+    @property
+    def rated(self) -> int:
+        return sum(self.ratings.values())
+
+    @property
+    def average_rating(self) -> float:
+        return self.rating_sum / self.rated if self.rated else 0.0
+
+    @property
+    def average_pages(self) -> float:
+        return self.pages_total / self.pages_books if self.pages_books else 0.0
+
+    @property
+    def first_year(self):
+        return min(self.years) if self.years else None
+
+    @property
+    def last_year(self):
+        return max(self.years) if self.years else None
+
+    @property
+    def years_span(self) -> int:
+        return self.last_year - self.first_year + 1 if self.years else 0
+
+    def to_dict(self) -> Dict:
+        return {
+            'total': self.total,
+            # JSON keys are strings; pairs keep years and ratings as numbers
+            'years': sorted(self.years.items()),
+            'genres': self.genres.most_common(),
+            'authors': self.authors.most_common(),
+            'ratings': sorted(self.ratings.items()),
+            'rating_sum': self.rating_sum,
+            'pages_total': self.pages_total,
+            'pages_books': self.pages_books,
+            'longest': self.longest,
+            'five_star': self.five_star,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ReadingSummary':
+        summary = cls()
+        summary.total = data['total']
+        for name in ('years', 'genres', 'authors', 'ratings'):
+            setattr(summary, name, Counter(dict((k, v) for k, v in data[name])))
+        summary.rating_sum = data['rating_sum']
+        summary.pages_total = data['pages_total']
+        summary.pages_books = data['pages_books']
+        summary.longest = data['longest']
+        summary.five_star = data['five_star']
+        return summary
+
+
+def save_summary(summary: ReadingSummary, data_file):
+    """Write the summary next to the library, stamped with the library's current fingerprint"""
+    atomic_write_json(summary_path(data_file), {
+        'version': SUMMARY_VERSION,
+        'source': data_fingerprint(data_file),
+        'summary': summary.to_dict(),
+    }, indent=None)
+
+
+def stored_summary(data_file='enhanced_books.json') -> Optional[ReadingSummary]:
+    """The stored summary if the library hasn't changed since, else None"""
+    try:
+        with open(summary_path(data_file), 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        if stored.get('version') == SUMMARY_VERSION and \
+                stored.get('source') == data_fingerprint(data_file):
+            return ReadingSummary.from_dict(stored['summary'])
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+    return None
+
+
+def load_summary(data_file='enhanced_books.json', books=None) -> ReadingSummary:
+    """The stored summary if the library hasn't changed since, otherwise a rebuilt (and saved) one
+
+    Pass ``books`` when they're already loaded so a rebuild doesn't read them again.
+    """
+    summary = stored_summary(data_file)
+    if summary is not None:
+        return summary
+
+    from book_db import BookDatabase, is_database_path  # book_db imports this module
+
+    if books is None and is_database_path(data_file):
+        # SQLite counts it all in aggregate queries, no book is loaded
+        db = BookDatabase(data_file)
+        try:
+            summary = db.summary()
+        finally:
+            db.close()
+    else:
+        summary = ReadingSummary.build(books if books is not None else load_books(data_file))
+    try:
+        save_summary(summary, data_file)
+    except OSError as e:
+        print(f"⚠️  Couldn't save reading summary: {e}")
+    return summary
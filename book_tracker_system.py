@@ -1,117 +1,124 @@
-import pandas as pd
-import json
-import requests
 from datetime import datetime
 import re
-from dataclasses import dataclass
-from typing import List, Optional, Dict
+from typing import Optional, Dict
 import csv
+from book_collection import MISSING, Book, BookCollection
+from book_matching import match_books
+from book_parsing import parse_book_column
+from book_store import write_books
+from book_summary import ReadingSummary
+from dashboard_bundle import DEFAULT_BUNDLE_DIR, write_bundle
+from book_providers import MetadataResolver, make_resolver
+from reading_analytics import analytics_path, compute_analytics, save_analytics
+from reading_timeline import finished_days
+from lookup_cache import LookupCache
+from readwise_sync import DEFAULT_STATE_FILE, READWISE_URL, ReadwiseSync, merge_quotes
 
-@dataclass
-class Book:
-    title: str
-    author: str
-    year_read: int
-    date_finished: Optional[str] = None
-    format: str = "physical"  # physical, audio, ebook
-    rating: Optional[int] = None  # 1-5 scale
-    pages: Optional[int] = None
-    genres: List[str] = None
-    isbn: Optional[str] = None
-    goodreads_id: Optional[str] = None
-    personal_tags: List[str] = None
-    summary: Optional[str] = None
-    favorite_quotes: List[str] = None
-    readwise_highlights_count: Optional[int] = None
-    reading_time_days: Optional[int] = None
-    reread: bool = False
-    recommended_by: Optional[str] = None
-    mood_when_reading: Optional[str] = None
-    location_read: Optional[str] = None
-    
 class BookTrackingSystem:
     def __init__(self):
-        self.books = []
+        self.books = BookCollection()  # column-backed; iterating yields editable BookRefs
         self.readwise_api_key = None
+        self.lookup_cache: Optional[LookupCache] = None  # set to reuse cached API responses
+        self.resolver: Optional[MetadataResolver] = None  # set to use other providers (or stubs)
+        self.summary = ReadingSummary()  # running totals for generate_reading_stats
         
     def import_from_sheets(self, csv_file_path: str):
         """Import existing Google Sheets data"""
-        df = pd.read_csv(csv_file_path)
+        import pandas as pd
+
+        df = pd.read_csv(csv_file_path).dropna(subset=['Book'])
         
-        for _, row in df.iterrows():
-            # Parse your current format
-            title_author = row['Book']  # Assuming format like "Title by Author"
-            
-            # Basic parsing - you'd refine this based on your exact format
-            if ' by ' in title_author:
-                title, author = title_author.split(' by ', 1)
-            else:
-                title, author = title_author, "Unknown"
-            
+        # Parse your current format ("Title by Author (audio) (MM.DD.YY)") a column at a time
+        parsed = parse_book_column(df['Book'])
+        
+        for title, author, fmt, finished, year_read in zip(
+                parsed['title'], parsed['author'], parsed['format'], parsed['date_finished'],
+                df['Year'].tolist()):
             book = Book(
-                title=title.strip(),
-                author=author.strip(),
-                year_read=row['Year'],
+                title=title,
+                author=author,
+                year_read=year_read,
+                date_finished=finished,
+                format='audio' if fmt == 'audio' else 'physical',
                 # Add more parsing as needed
             )
             self.books.append(book)
+            self.summary.add(book)
+    
+    def metadata_resolver(self) -> MetadataResolver:
+        """The resolver enhance_with_api_data uses: Google Books and OpenLibrary, asked concurrently"""
+        if self.resolver is None:
+            self.resolver = make_resolver(cache=self.lookup_cache)
+        return self.resolver
     
     def enhance_with_api_data(self, book: Book):
-        """Enhance book data using Google Books API or OpenLibrary"""
+        """Enhance book data using Google Books API and OpenLibrary"""
         try:
-            # Google Books API (free, no key needed for basic queries)
-            search_query = f"{book.title} {book.author}".replace(' ', '+')
-            url = f"https://www.googleapis.com/books/v1/volumes?q={search_query}&maxResults=1"
+            info = self.metadata_resolver().resolve(book.title, book.author, book.isbn)
             
-            response = requests.get(url)
-            if response.status_code == 200:
-                data = response.json()
-                if data['totalItems'] > 0:
-                    volume_info = data['items'][0]['volumeInfo']
-                    
-                    book.pages = volume_info.get('pageCount')
-                    book.genres = volume_info.get('categories', [])
-                    book.isbn = self._extract_isbn(volume_info.get('industryIdentifiers', []))
+            if info['sources']:
+                self._apply_api_data(book, info)
                     
         except Exception as e:
             print(f"Error enhancing {book.title}: {e}")
     
-    def _extract_isbn(self, identifiers):
-        """Extract ISBN from Google Books API response"""
-        for identifier in identifiers:
-            if identifier['type'] in ['ISBN_13', 'ISBN_10']:
-                return identifier['identifier']
-        return None
+    def enhance_all(self, books=None):
+        """Enhance many books at once (default: all of them)
+        
+        Books with a known ISBN are looked up in batches by ISBN; only the
+        rest are searched by title and author.
+        """
+        books = list(self.books) if books is None else list(books)
+        resolver = self.metadata_resolver()
+        infos = resolver.resolve_many([(book.title, book.author, book.isbn) for book in books])
+        for book, info in zip(books, infos):
+            if info['pages'] or info['categories'] or info['isbn']:
+                self._apply_api_data(book, info)
+        print(resolver.report())
+    
+    def _apply_api_data(self, book, info):
+        before = {'pages': book.pages, 'genres': book.genres}
+        book.pages = info['pages'] or book.pages
+        book.genres = info['categories'] or book.genres
+        book.isbn = info['isbn'] or book.isbn
+        self.summary.update(book, before)
     
-    def connect_readwise(self, api_token: str):
-        """Connect to Readwise API to import highlights"""
+    def connect_readwise(self, api_token: str, state_file: str = DEFAULT_STATE_FILE,
+                         base_url: str = READWISE_URL):
+        """Sync Readwise books and highlights (only what changed since last time)"""
         self.readwise_api_key = api_token
         
-        headers = {"Authorization": f"Token {api_token}"}
-        url = "https://readwise.io/api/v2/books/"
-        
+        syncer = ReadwiseSync(api_token, state_file=state_file, base_url=base_url)
         try:
-            response = requests.get(url, headers=headers)
-            if response.status_code == 200:
-                readwise_books = response.json()['results']
-                self._match_readwise_books(readwise_books)
+            syncer.sync()
         except Exception as e:
             print(f"Error connecting to Readwise: {e}")
+        finally:
+            syncer.close()
+        
+        # Whatever has been synced so far (including earlier runs) is matched
+        self._match_readwise_books(list(syncer.state['books'].values()))
     
-    def _match_readwise_books(self, readwise_books):
-        """Match Readwise books with your tracked books"""
-        for book in self.books:
-            for rw_book in readwise_books:
-                # Simple matching - you'd want more sophisticated matching
-                if (book.title.lower() in rw_book['title'].lower() or 
-                    rw_book['title'].lower() in book.title.lower()):
-                    
-                    book.readwise_highlights_count = rw_book['num_highlights']
-                    # Could fetch actual highlights here
+    def _match_readwise_books(self, readwise_books, threshold: float = 0.8):
+        """Match Readwise books with your tracked books (exact title pass, then fuzzy)"""
+        matches = match_books(list(zip(self.books.values('title'), self.books.values('author'))),
+                              [(rw['title'], rw.get('author')) for rw in readwise_books],
+                              threshold)
+        
+        for match in matches:
+            rw_book = readwise_books[match.source_index]
+            book = self.books[match.book_index]
+            book.readwise_highlights_count = rw_book['num_highlights']
+            if rw_book.get('highlights'):
+                book.favorite_quotes = merge_quotes(book.favorite_quotes,
+                                                    rw_book['highlights'].values())
+        
+        print(f"Matched {len(matches)} of {len(self.books)} books to Readwise")
+        return matches
     
     def add_personal_rating_prompt(self):
         """Interactive rating session"""
-        unrated_books = [book for book in self.books if book.rating is None]
+        unrated_books = self.books.filter(rating=None)
         
         print(f"Found {len(unrated_books)} unrated books.")
         
@@ -124,7 +131,9 @@ class BookTrackingSystem:
                 elif rating == 's':
                     continue
                 else:
-                    book.rating = int(rating)
+                    before = {'rating': book.rating}
+                    book.rating = float(rating)
+                    self.summary.update(book, before)
                     
                 # Optional: add tags
                 tags = input("Add tags (comma separated, optional): ")
@@ -134,56 +143,47 @@ class BookTrackingSystem:
             except ValueError:
                 print("Invalid rating, skipping...")
     
-    def export_to_json(self, filename: str = 'books_database.json'):
-        """Export enhanced data to JSON for web app"""
-        books_data = []
-        for book in self.books:
-            book_dict = {
-                'title': book.title,
-                'author': book.author,
-                'year_read': book.year_read,
-                'date_finished': book.date_finished,
-                'format': book.format,
-                'rating': book.rating,
-                'pages': book.pages,
-                'genres': book.genres or [],
-                'isbn': book.isbn,
-                'personal_tags': book.personal_tags or [],
-                'summary': book.summary,
-                'favorite_quotes': book.favorite_quotes or [],
-                'readwise_highlights_count': book.readwise_highlights_count,
-                'reading_time_days': book.reading_time_days,
-                'reread': book.reread,
-                'recommended_by': book.recommended_by,
-                'mood_when_reading': book.mood_when_reading,
-                'location_read': book.location_read
-            }
-            books_data.append(book_dict)
-        
-        with open(filename, 'w') as f:
-            json.dump(books_data, f, indent=2)
-        
-        print(f"Exported {len(books_data)} books to {filename}")
+    def export_to_json(self, filename: str = 'books_database.json', style: str = 'indent'):
+        """Export enhanced data to JSON for web app
+        
+        Books are encoded straight from the collection's columns, without a
+        dict per book; ``style`` is 'indent', 'compact' or 'ndjson' (see
+        book_store.write_books). Streaks,
+        velocity and pace go next to it in ``<filename>.analytics.json``.
+        """
+        import numpy as np
+
+        count = write_books(filename, self.books.json_rows(style), style, encoded=True)
+        
+        years, pages = (np.where(column == MISSING, np.nan, column)
+                        for column in (self.books.column('year_read'), self.books.column('pages')))
+        save_analytics(compute_analytics(years, pages, finished_days(self.books.values('date_finished'))),
+                       filename)
+        
+        print(f"Exported {count} books to {filename} (analytics in {analytics_path(filename)})")
+    
+    def export_bundle(self, out_dir: str = DEFAULT_BUNDLE_DIR):
+        """Export the web app's data bundle: a small summary plus a file of books per year
+        
+        Only files whose content changed are rewritten (see dashboard_bundle).
+        """
+        stats = write_bundle(list(self.books.records()), out_dir)
+        print(f"Bundled {len(self.books)} books into {out_dir} "
+              f"({stats['written']} files written, {stats['kept']} unchanged)")
     
     def generate_reading_stats(self):
         """Generate interesting statistics"""
-        total_books = len(self.books)
-        total_pages = sum(book.pages for book in self.books if book.pages)
-        avg_rating = sum(book.rating for book in self.books if book.rating) / len([book for book in self.books if book.rating])
+        summary = self.summary
         
         print(f"\n=== READING STATS ===")
-        print(f"Total books: {total_books}")
-        print(f"Total pages: {total_pages:,}")
-        print(f"Average rating: {avg_rating:.2f}")
+        print(f"Total books: {summary.total}")
+        print(f"Total pages: {summary.pages_total:,}")
+        print(f"Average rating: {summary.average_rating:.2f}")
         
         # Books per year
-        year_counts = {}
-        for book in self.books:
-            year_counts[book.year_read] = year_counts.get(book.year_read, 0) + 1
-        
         print("\nBooks per year:")
-        for year in sorted(year_counts.keys()):
-            print(f"  {year}: {year_counts[year]} books")
+        for year in sorted(summary.years):
+            print(f"  {year}: {summary.years[year]} books")
 
 # Usage example
 if __name__ == "__main__":
@@ -192,7 +192,8 @@ if __name__ == "__main__":
     # Step 1: Import your Google Sheets data
     # tracker.import_from_sheets('your_books.csv')
     
-    # Step 2: Enhance with API data
+    # Step 2: Enhance with API data (responses are cached between runs)
+    # tracker.lookup_cache = LookupCache()
     # for book in tracker.books:
     #     tracker.enhance_with_api_data(book)
     
@@ -204,5 +205,6 @@ if __name__ == "__main__":
     
     # Step 5: Export for web app
     # tracker.export_to_json()
+    # tracker.export_bundle()  # or just the summary and per-year files the dashboard loads
     
     print("Book tracking system ready!")
@@ -0,0 +1,180 @@
+import hashlib
+import heapq
+import json
+import os
+import re
+import sys
+from collections import Counter, defaultdict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from book_store import atomic_write_json, load_books
+from book_summary import ReadingSummary
+from reading_analytics import book_columns, compute_analytics
+
+# Bump when the bundle layout changes (the frontend checks it)
+BUNDLE_VERSION = 1
+# Served by Vite from public/, so the app fetches it instead of bundling the library
+DEFAULT_BUNDLE_DIR = os.path.join('reading-dashboard', 'public', 'data')
+# The one file without a hash in its name; everything else can be cached forever
+MANIFEST = 'bundle.json'
+# Fields of the frontend's Book type (original_text is only the CSV line it came from)
+BUNDLE_FIELDS = ('title', 'author', 'year_read', 'format', 'pages', 'published_year', 'categories',
+                 'description', 'rating', 'personal_tags', 'notes', 'favorite_quotes',
+                 'date_finished')
+# What a book card shows (the summary's recent books)
+CARD_FIELDS = ('title', 'author', 'year_read', 'pages', 'categories', 'rating', 'date_finished')
+# BookTrackingSystem exports name these differently
+ALIASES = {'categories': 'genres', 'description': 'summary'}
+RECENT_BOOKS = 10
+FAVORITE_GENRES = 10
+HASH_LENGTH = 12
+BUNDLE_FILE = re.compile(r'^(summary|books-\w+)\.[0-9a-f]+\.json$')
+
+
+def minify_book(book: Dict, fields=BUNDLE_FIELDS) -> Dict:
+    """A book with just the fields the dashboard shows, leaving out empty ones (the app defaults them)"""
+    record = {}
+    for field in fields:
+        value = book.get(field)
+        if value in (None, '', []) and field in ALIASES:
+            value = book.get(ALIASES[field])
+        if value not in (None, '', []):
+            record[field] = value
+    return record
+
+
+def _encode(data) -> bytes:
+    return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _hashed(prefix: str, payload: bytes) -> str:
+    return f"{prefix}.{hashlib.sha1(payload).hexdigest()[:HASH_LENGTH]}.json"
+
+
+def _index(records: List[Dict], field: str) -> Dict[str, List[int]]:
+    """Positions in ``records`` of the books with each value of a list field"""
+    index = defaultdict(list)
+    for i, record in enumerate(records):
+        for value in record.get(field, ()):
+            index[value].append(i)
+    return dict(sorted(index.items()))
+
+
+def _recency(book):
+    """Sort key putting the latest books first: by year read, then finish date, then title"""
+    finished = ''.join(c for c in str(book.get('date_finished') or '') if c.isdigit())
+    return (-(book.get('year_read') or 0), -int(finished[:8] or 0),
+            (book.get('title') or '').casefold())
+
+
+def build_bundle(books: List[Dict], today: Optional[date] = None) -> Tuple[Dict, Dict[str, bytes]]:
+    """The manifest and the files ({name: bytes}) of a library's dashboard bundle
+
+    A summary file holds everything the dashboard page draws - the stats,
+    books and pages per year, genre and tag counts, the most recent books
+    and the streaks - so its size depends on the years and genres, not the
+    number of books. The books themselves are in one shard per year (with
+    that year's genre and tag indexes), fetched when a page needs them.
+    File names carry a hash of their content, so a year that didn't change
+    keeps its name and stays in the browser's cache.
+    """
+    today = today or date.today()
+    summary = ReadingSummary.build(books)
+    by_year = defaultdict(list)
+    tags = Counter()
+    pages = []
+    for book in books:
+        by_year[book.get('year_read')].append(book)
+        tags.update(book.get('personal_tags') or [])
+        pages.append(book.get('pages') or 0)
+
+    files, years = {}, []
+    for year in sorted(by_year, key=lambda year: (year is None, year)):
+        records = [minify_book(book) for book in by_year[year]]
+        payload = _encode({'year': year, 'books': records, 'genres': _index(records, 'categories'),
+                           'tags': _index(records, 'personal_tags')})
+        name = _hashed(f"books-{'unknown' if year is None else year}", payload)
+        files[name] = payload
+        years.append({'year': year, 'books': len(records),
+                      'pages': sum(record.get('pages') or 0 for record in records), 'file': name})
+
+    analytics = compute_analytics(*book_columns(books), today=today)
+    recent = heapq.nsmallest(RECENT_BOOKS, books, key=_recency)
+    payload = _encode({
+        'version': BUNDLE_VERSION,
+        # The frontend's ReadingStats
+        'stats': {
+            'totalBooks': summary.total,
+            'totalPages': summary.pages_total,
+            'averageRating': summary.average_rating,
+            'yearsReading': summary.years_span,
+            'booksThisYear': summary.years.get(today.year, 0),
+            'favoriteGenres': [{'genre': genre, 'count': count}
+                               for genre, count in summary.genres.most_common(FAVORITE_GENRES)],
+            'readingVelocity': [{'year': y['year'], 'books': y['books'], 'pages': y['pages']}
+                                for y in analytics['years']],
+        },
+        'yearRange': {'min': summary.first_year, 'max': summary.last_year},
+        'pageRange': {'min': min(pages, default=0), 'max': max(pages, default=0)},
+        'rated': summary.rated,
+        'ratings': sorted(summary.ratings.items()),
+        'authors': len(summary.authors),
+        'years': years,
+        'genres': [{'genre': genre, 'count': count} for genre, count in sorted(summary.genres.items())],
+        'tags': [{'tag': tag, 'count': count} for tag, count in sorted(tags.items())],
+        'recent': [minify_book(book, CARD_FIELDS) for book in recent],
+        'analytics': {key: analytics[key] for key in
+                      ('computed_on', 'streaks', 'velocity', 'windows', 'projection')},
+    })
+    name = _hashed('summary', payload)
+    files[name] = payload
+    manifest = {'version': BUNDLE_VERSION, 'summary': name, 'books': summary.total,
+                'files': sorted(files)}
+    return manifest, files
+
+
+def write_bundle(books: List[Dict], out_dir: str = DEFAULT_BUNDLE_DIR,
+                 today: Optional[date] = None) -> Dict:
+    """Write a library's bundle to ``out_dir``, only the files whose content changed
+
+    The manifest goes last, so the app never finds it pointing at a file
+    that isn't there yet; files it no longer names are removed after.
+    Returns counts of files written, kept and removed, and the summary's size.
+    """
+    manifest, files = build_bundle(books, today)
+    os.makedirs(out_dir, exist_ok=True)
+    stats = {'written': 0, 'kept': 0, 'removed': 0, 'summary_bytes': len(files[manifest['summary']])}
+    for name, payload in files.items():
+        path = os.path.join(out_dir, name)
+        if os.path.exists(path):
+            stats['kept'] += 1
+            continue
+        with open(f"{path}.tmp", 'wb') as f:
+            f.write(payload)
+        os.replace(f"{path}.tmp", path)
+        stats['written'] += 1
+    atomic_write_json(os.path.join(out_dir, MANIFEST), manifest)
+    for filename in os.listdir(out_dir):
+        if BUNDLE_FILE.match(filename) and filename not in files:
+            os.remove(os.path.join(out_dir, filename))
+            stats['removed'] += 1
+    return stats
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the React dashboard's data bundle")
+    parser.add_argument('data_file', nargs='?', default='enhanced_books.json')
+    parser.add_argument('--out', default=DEFAULT_BUNDLE_DIR, help=f"(default: {DEFAULT_BUNDLE_DIR})")
+    args = parser.parse_args()
+    try:
+        books = load_books(args.data_file)
+    except FileNotFoundError:
+        print(f"❌ {args.data_file} not found!")
+        sys.exit(1)
+    stats = write_bundle(books, args.out)
+    print(f"📦 Bundled {len(books):,} books into {args.out}: {stats['written']} files written, "
+          f"{stats['kept']} unchanged, {stats['removed']} removed "
+          f"(summary {stats['summary_bytes'] / 1e3:.1f}KB)")
@@ -0,0 +1,242 @@
+import hashlib
+import io
+import os
+import shutil
+from collections import namedtuple
+from datetime import date
+from typing import TYPE_CHECKING, Dict, List
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+DEFAULT_CACHE_DIR = '.dashboard_cache'
+DASHBOARD_TITLE = '📚 YOUR READING JOURNEY (2011-2025)'
+# Bump when a plot_* method changes so cached panels are redrawn
+RENDER_VERSION = 3
+
+# ``columns`` is the slice of the analyzer DataFrame a panel reads; the panel is
+# only redrawn when those values change
+Panel = namedtuple('Panel', ['method', 'columns', 'size', 'axes'])
+
+PANELS = {
+    'title': Panel(None, [], (20, 1), 0),
+    'books_per_year': Panel('plot_books_per_year', ['year_read'], (20, 4), 1),
+    'genres': Panel('plot_genre_distribution', ['primary_genre'], (10, 4), 1),
+    'pages': Panel('plot_page_analysis', ['pages_numeric'], (10, 4), 1),
+    'heatmap': Panel('plot_reading_heatmap', ['year_read', 'finished_day'], (20, 4), 1),
+    'ratings': Panel('plot_rating_analysis', ['has_rating', 'rating', 'year_read'], (20, 4), 2),
+    'authors': Panel('plot_top_authors', ['author'], (10, 4), 1),
+    'patterns': Panel('plot_reading_patterns', ['published_year'], (10, 4), 1),
+    'summary': Panel('plot_summary_stats', ['year_read', 'pages', 'rating', 'author', 'finished_day'],
+                     (20, 4), 1),
+}
+# Panels showing "current" figures (streaks, this year's pace) are redrawn each day
+DATED_PANELS = {'summary'}
+
+# Rows of the composed dashboard, top to bottom (same order as the old 6x2 grid)
+LAYOUT = [['title'], ['books_per_year'], ['genres', 'pages'], ['heatmap'],
+          ['ratings'], ['authors', 'patterns'], ['summary']]
+
+
+def _hashable(values: 'pd.Series') -> 'pd.Series':
+    """``values`` in one dtype per kind (float64 numbers, plain objects for text), so equal
+    data hashes equal however it was loaded"""
+    import pandas as pd
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.astype(object)
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.astype('float64')
+    return values
+
+
+def panel_key(name: str, df: 'pd.DataFrame', dpi: int) -> str:
+    """Hash of everything a panel's image depends on"""
+    import pandas as pd
+
+    digest = hashlib.sha1(f"{name}:{dpi}:{RENDER_VERSION}".encode('utf-8'))
+    if name in DATED_PANELS:
+        digest.update(date.today().isoformat().encode('utf-8'))
+    for column in PANELS[name].columns:
+        values = _hashable(df[column]) if column in df else pd.Series([], dtype=object)
+        digest.update(column.encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(values, index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+_styled = False
+
+
+def apply_style():
+    """The dashboard's plot style; set once per process, just before the first figure"""
+    global _styled
+    if _styled:
+        return
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.style.use('seaborn-v0_8')
+    sns.set_palette("husl")
+    _styled = True
+
+
+def _init_worker():
+    import matplotlib
+    matplotlib.use('Agg')
+    apply_style()
+
+
+def draw_panel(fig, name: str, data: 'pd.DataFrame', title: str = DASHBOARD_TITLE, spec=None,
+               summary=None):
+    """Draw one panel onto ``fig``, filling it or just the grid cell ``spec``
+
+    ``summary`` is the precomputed ReadingSummary for ``data``, if there is one.
+    """
+    from reading_dashboard import ReadingAnalyzer
+
+    panel = PANELS[name]
+    if panel.method is None:
+        ax = fig.add_subplot(spec) if spec is not None else fig.add_subplot()
+        ax.axis('off')
+        ax.text(0.5, 0.5, title, ha='center', va='center', transform=ax.transAxes,
+                fontsize=24, fontweight='bold')
+        return
+    if spec is None:
+        axes = fig.subplots(1, panel.axes, gridspec_kw={'wspace': 0.2}) if panel.axes > 1 \
+            else [fig.add_subplot()]
+    else:
+        cells = spec.subgridspec(1, panel.axes, wspace=0.2)
+        axes = [fig.add_subplot(cells[0, i]) for i in range(panel.axes)]
+    # The plot_* methods only read ``self.df``, so a bare analyzer holding the slice will do
+    analyzer = ReadingAnalyzer.__new__(ReadingAnalyzer)
+    analyzer.df = data
+    analyzer.summary = summary
+    getattr(analyzer, panel.method)(*axes)
+
+
+def render_panel(name: str, data: 'pd.DataFrame', dpi: int, summary=None) -> bytes:
+    """Draw one panel on its own Agg figure and return it as PNG bytes"""
+    from matplotlib.figure import Figure
+
+    apply_style()
+    fig = Figure(figsize=PANELS[name].size)
+    draw_panel(fig, name, data, summary=summary)
+    if PANELS[name].method is not None:
+        fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi)
+    return buffer.getvalue()
+
+
+class PanelRenderer:
+    """Render dashboard panels in a process pool, caching each PNG by its data hash"""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, workers: int = None):
+        self.cache_dir = cache_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.stats = {'rendered': 0, 'cached': 0}
+        self.keys: Dict[str, str] = {}  # panel -> data hash from the last render
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, name, key, ext='.png'):
+        return os.path.join(self.cache_dir, f"{name}-{key}{ext}")
+
+    def _store(self, name, key, data, ext='.png'):
+        path = self._path(name, key, ext)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        # Older renders of this panel can't be asked for again
+        for filename in os.listdir(self.cache_dir):
+            if (filename.startswith(f"{name}-") and filename.endswith(ext)
+                    and filename != os.path.basename(path)):
+                os.remove(os.path.join(self.cache_dir, filename))
+        return path
+
+    def render(self, df: 'pd.DataFrame', names: List[str] = None, dpi: int = 300,
+               summary=None) -> Dict[str, bytes]:
+        """PNG bytes for each panel, drawing only those whose data changed
+
+        ``summary`` (the library's ReadingSummary) saves the summary panel a recount.
+        """
+        names = names or list(PANELS)
+        images, missing = {}, {}
+        self.keys = {}
+        for name in names:
+            key = self.keys[name] = panel_key(name, df, dpi)
+            try:
+                with open(self._path(name, key), 'rb') as f:
+                    images[name] = f.read()
+                self.stats['cached'] += 1
+            except FileNotFoundError:
+                missing[name] = key
+
+        slices = {name: df[[c for c in PANELS[name].columns if c in df]] for name in missing}
+        if len(missing) > 1 and self.workers > 1:
+            # multiprocessing costs ~20ms to import; only a render that draws several panels pays it
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(missing)),
+                                     initializer=_init_worker) as executor:
+                futures = {name: executor.submit(render_panel, name, slices[name], dpi,
+                                                 summary if name == 'summary' else None)
+                           for name in missing}
+                rendered = {name: future.result() for name, future in futures.items()}
+        else:
+            rendered = {name: render_panel(name, slices[name], dpi,
+                                           summary if name == 'summary' else None)
+                        for name in missing}
+
+        for name, image in rendered.items():
+            self._store(name, missing[name], image)
+            images[name] = image
+        self.stats['rendered'] += len(rendered)
+        return images
+
+    def save(self, images: Dict[str, bytes], paths: List[str], dpi: int = 300):
+        """Compose the panels from the last ``render`` and write them to each path
+
+        The composed file is cached too, so an unchanged dashboard is a file copy.
+        """
+        key = hashlib.sha1(':'.join(self.keys[n] for n in sorted(images)).encode()).hexdigest()[:16]
+        dashboard = None
+        for path in paths:
+            ext = os.path.splitext(path)[1].lower()
+            cached = self._path('dashboard', key, ext)
+            if not os.path.exists(cached):
+                if dashboard is None:
+                    dashboard = compose(images)
+                buffer = io.BytesIO()
+                if ext == '.pdf':
+                    dashboard.save(buffer, format='PDF', resolution=dpi)
+                else:
+                    dashboard.save(buffer, format=ext.lstrip('.').upper().replace('JPG', 'JPEG'),
+                                   dpi=(dpi, dpi))
+                cached = self._store('dashboard', key, buffer.getvalue(), ext)
+            shutil.copyfile(cached, path)
+
+
+def compose(images: Dict[str, bytes], layout: List[List[str]] = None):
+    """Stack panel images into one dashboard (a PIL image), row by row"""
+    from PIL import Image
+
+    rows = []
+    for row in layout or LAYOUT:
+        panels = [Image.open(io.BytesIO(images[name])).convert('RGB')
+                  for name in row if name in images]
+        if panels:
+            rows.append(panels)
+
+    width = max(sum(p.width for p in row) for row in rows)
+    height = sum(max(p.height for p in row) for row in rows)
+    canvas = Image.new('RGB', (width, height), 'white')
+    y = 0
+    for row in rows:
+        x = (width - sum(p.width for p in row)) // 2
+        for panel in row:
+            canvas.paste(panel, (x, y))
+            x += panel.width
+        y += max(p.height for p in row)
+    return canvas
@@ -1,156 +1,183 @@
-import json
-import os
-import shutil
-from datetime import datetime
+from book_search import SearchIndex
+from book_store import open_store
+from book_summary import ReadingSummary, load_summary, save_summary
+from rating_session import ORDERS, RatingSession
 
 class BookEnhancer:
     def __init__(self, json_file='enhanced_books.json'):
         self.json_file = json_file
+        self.store = open_store(json_file)  # .db/.sqlite paths use the SQLite store
         self.books = []
+        self.summary = ReadingSummary()  # counts behind show_stats, kept current on every edit
+        self.index = None  # search index, built on first search
+        self.session = None  # rating session, started by the first add_ratings_batch
         self.load_books()
         
     def load_books(self):
         """Load books from JSON file"""
         try:
-            with open(self.json_file, 'r', encoding='utf-8') as f:
-                self.books = json.load(f)
+            self.books = self.store.load(repair=True)
+            self.summary = load_summary(self.json_file, self.books)
+            self.index = None
+            self.session = None
             print(f"📚 Loaded {len(self.books)} books from {self.json_file}")
         except FileNotFoundError:
             print(f"❌ File {self.json_file} not found!")
             return
     
     def save_books(self):
-        """Save books back to JSON file with backup"""
-        # Create backup first
-        backup_file = f"{self.json_file}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-        if os.path.exists(self.json_file):
-            shutil.copy(self.json_file, backup_file)
-            print(f"💾 Backup created: {backup_file}")
-        
-        # Save updated data
-        with open(self.json_file, 'w', encoding='utf-8') as f:
-            json.dump(self.books, f, indent=2, ensure_ascii=False)
+        """Write just this session's edits (journal append or indexed row updates)"""
+        saved = self.store.flush()
+        self._save_summary()
+        print(f"✅ {saved} changes saved")
+    
+    def save_and_compact(self):
+        """Save edits and fold the journal back into the JSON file, keeping a backup"""
+        self.store.compact()
+        self._save_summary()
         print(f"✅ Books saved to {self.json_file}")
     
-    def add_ratings_batch(self, count=10):
-        """Add ratings to unrated books in batches"""
-        unrated = [book for book in self.books if book.get('rating') is None]
+    def _save_summary(self):
+        """Store the summary stamped with the files just written, so readers can trust it"""
+        if self.summary.stale:
+            self.summary = ReadingSummary.build(self.books)
+        save_summary(self.summary, self.json_file)
+    
+    def add_ratings_batch(self, count=10, order=None):
+        """Rate the next unrated books, most recently read first (or by ``order``: author, pages)
+        
+        Ratings are written to the journal as you go and the queue is kept
+        between batches - and between runs, so quitting and coming back
+        carries on where you stopped.
+        """
+        if self.session is None or (order and order != self.session.order):
+            self.session = RatingSession(self, order)
+            if self.session.resumed:
+                print(f"↩️  Resuming your rating session ({self.session.rated} rated so far, "
+                      f"by {self.session.order})")
+        session = self.session
+        unrated = self.summary.total - self.summary.rated
         
         if not unrated:
             print("🎉 All books already have ratings!")
-            return
+            session.finish()
+            return 0
         
-        print(f"\n⭐ Found {len(unrated)} unrated books")
-        print(f"Let's rate {min(count, len(unrated))} books:")
+        print(f"\n⭐ Found {unrated} unrated books")
+        print(f"Let's rate {min(count, unrated)} books (by {session.order}):")
         print("\nRating scale: 1-5 stars")
         print("Commands: 's' = skip, 'q' = quit, 'info' = more book info")
         print("-" * 50)
         
         rated_count = 0
-        for i, book in enumerate(unrated[:count]):
-            print(f"\n📖 Book {i+1}/{min(count, len(unrated))}")
-            print(f"Title: {book['title']}")
-            print(f"Author: {book['author']}")
-            print(f"Year Read: {book['year_read']}")
-            if book.get('pages'):
-                print(f"Pages: {book['pages']}")
-            if book.get('categories'):
-                print(f"Genre: {', '.join(book['categories'])}")
-            
-            while True:
-                rating = input(f"\nRate '{book['title']}' (1-5 stars, 's'=skip, 'q'=quit, 'info'=more): ").strip().lower()
-                
-                if rating == 'q':
-                    print(f"✅ Rated {rated_count} books this session")
-                    return rated_count
-                elif rating == 's':
+        try:
+            for i in range(min(count, unrated)):
+                book = session.next_book()
+                if book is None:
+                    print("\n🎉 No more unrated books to show (skipped ones are left for later)")
+                    session.finish()
                     break
-                elif rating == 'info':
-                    if book.get('description'):
-                        print(f"\nDescription: {book['description'][:200]}...")
-                    else:
-                        print("No description available")
-                    continue
                 
-                try:
-                    rating_num = int(rating)
-                    if 1 <= rating_num <= 5:
-                        book['rating'] = rating_num
-                        rated_count += 1
-                        print(f"⭐ Rated {rating_num}/5")
-                        
-                        # Ask for optional tags
-                        tags = input("Add tags (optional, comma-separated): ").strip()
-                        if tags:
-                            book['personal_tags'] = [tag.strip() for tag in tags.split(',')]
-                        
-                        # Ask for notes
-                        notes = input("Add notes (optional): ").strip()
-                        if notes:
-                            book['notes'] = notes
-                        
+                print(f"\n📖 Book {i+1}/{min(count, unrated)}")
+                print(f"Title: {book['title']}")
+                print(f"Author: {book['author']}")
+                print(f"Year Read: {book['year_read']}")
+                if book.get('pages'):
+                    print(f"Pages: {book['pages']}")
+                if book.get('categories'):
+                    print(f"Genre: {', '.join(book['categories'])}")
+                
+                while True:
+                    rating = input(f"\nRate '{book['title']}' (1-5 stars, 's'=skip, 'q'=quit, 'info'=more): ").strip().lower()
+                    
+                    if rating == 'q':
+                        print(f"✅ Rated {rated_count} books this session")
+                        return rated_count
+                    elif rating == 's':
+                        session.skip()
                         break
-                    else:
-                        print("Please enter a number between 1-5")
-                except ValueError:
-                    print("Invalid input. Try again.")
+                    elif rating == 'info':
+                        if book.get('description'):
+                            print(f"\nDescription: {book['description'][:200]}...")
+                        else:
+                            print("No description available")
+                        continue
+                    
+                    try:
+                        rating_num = int(rating)
+                        if 1 <= rating_num <= 5:
+                            print(f"⭐ Rated {rating_num}/5")
+                            extras = {}
+                            
+                            # Ask for optional tags
+                            tags = input("Add tags (optional, comma-separated): ").strip()
+                            if tags:
+                                extras['personal_tags'] = [tag.strip() for tag in tags.split(',')]
+                            
+                            # Ask for notes
+                            notes = input("Add notes (optional): ").strip()
+                            if notes:
+                                extras['notes'] = notes
+                            
+                            session.rate(book, rating_num, **extras)
+                            rated_count += 1
+                            break
+                        else:
+                            print("Please enter a number between 1-5")
+                    except ValueError:
+                        print("Invalid input. Try again.")
+        finally:
+            # Also on Ctrl-C: whatever was rated is kept for next time
+            session.save()
         
         print(f"\n✅ Rated {rated_count} books this session")
         return rated_count
     
     def search_books(self, query):
-        """Search books by title or author"""
-        query = query.lower()
-        matches = []
+        """Search books by title, author, tags, notes, quotes or description (best matches first)"""
+        if self.index is None:
+            self.index = SearchIndex(self.books)
+            self._doc_ids = {id(book): i for i, book in enumerate(self.books)}
         
-        for book in self.books:
-            if (query in book['title'].lower() or 
-                query in book['author'].lower()):
-                matches.append(book)
-        
-        return matches
+        return [self.books[i] for i in self.index.search(query)]
+    
+    def _edit(self, book, **fields):
+        """Change some fields of a book, keeping the save buffer, search index and summary current"""
+        before = {field: book.get(field) for field in fields}
+        book.update(fields)
+        self.store.record(book, *fields)
+        self.summary.update(book, before)
+        if self.index is not None:
+            self.index.update(self._doc_ids[id(book)], book)
     
     def show_stats(self):
         """Show statistics about your books"""
-        total = len(self.books)
-        rated = len([b for b in self.books if b.get('rating')])
+        summary = self.summary
+        total = summary.total
+        rated = summary.rated
         unrated = total - rated
         
-        if rated > 0:
-            avg_rating = sum(b['rating'] for b in self.books if b.get('rating')) / rated
-            rating_dist = {}
-            for i in range(1, 6):
-                rating_dist[i] = len([b for b in self.books if b.get('rating') == i])
-        
         print(f"\n📊 YOUR READING STATS")
         print(f"Total Books: {total}")
         print(f"Rated Books: {rated}")
         print(f"Unrated Books: {unrated}")
         
         if rated > 0:
-            print(f"Average Rating: {avg_rating:.1f}/5")
+            print(f"Average Rating: {summary.average_rating:.1f}/5")
             print("\nRating Distribution:")
-            for rating, count in rating_dist.items():
+            for rating in range(1, 6):
                 stars = "⭐" * rating
-                print(f"  {stars} ({rating}): {count} books")
-        
-        # Books by year
-        years = {}
-        for book in self.books:
-            year = book['year_read']
-            years[year] = years.get(year, 0) + 1
+                print(f"  {stars} ({rating}): {summary.ratings.get(rating, 0)} books")
         
         print(f"\nMost Productive Years:")
-        for year in sorted(years.keys(), key=lambda x: years[x], reverse=True)[:5]:
-            print(f"  {year}: {years[year]} books")
+        for year, count in summary.years.most_common(5):
+            print(f"  {year}: {count} books")
         
         # Top rated books (if any)
-        if rated > 0:
-            top_books = [b for b in self.books if b.get('rating') == 5]
-            if top_books:
-                print(f"\n🏆 Your 5-Star Books ({len(top_books)}):")
-                for book in top_books[:10]:  # Show first 10
-                    print(f"  • {book['title']} by {book['author']} ({book['year_read']})")
+        if summary.five_star:
+            print(f"\n🏆 Your 5-Star Books ({len(summary.five_star)}):")
+            for title, author, year in summary.five_star[:10]:  # Show first 10
+                print(f"  • {title} by {author} ({year})")
     
     def quick_rate_book(self, title_query):
         """Quickly rate a specific book"""
@@ -181,7 +208,7 @@ class BookEnhancer:
         
         rating = input("New rating (1-5, or Enter to skip): ").strip()
         if rating and rating.isdigit() and 1 <= int(rating) <= 5:
-            book['rating'] = int(rating)
+            self._edit(book, rating=int(rating))
             print(f"✅ Updated rating to {rating}⭐")
             
             # Update tags/notes too?
@@ -189,14 +216,14 @@ class BookEnhancer:
             if update_more == 'y':
                 tags = input(f"Tags (current: {book.get('personal_tags', [])}): ").strip()
                 if tags:
-                    book['personal_tags'] = [tag.strip() for tag in tags.split(',')]
+                    self._edit(book, personal_tags=[tag.strip() for tag in tags.split(',')])
                 
                 notes = input(f"Notes (current: {book.get('notes', '')}): ").strip()
                 if notes:
-                    book['notes'] = notes
+                    self._edit(book, notes=notes)
 
-def main():
-    enhancer = BookEnhancer()
+def main(data_file='enhanced_books.json'):
+    enhancer = BookEnhancer(data_file)
     
     if not enhancer.books:
         return
@@ -205,7 +232,7 @@ def main():
         print("\n" + "="*50)
         print("📚 BOOK ENHANCER MENU")
         print("="*50)
-        print("1. Add ratings (batch of 10)")
+        print("1. Add ratings (batch of 10, saved as you go)")
         print("2. Rate specific book")
         print("3. Show statistics")
         print("4. Search books")
@@ -215,11 +242,12 @@ def main():
         choice = input("\nEnter choice (1-6): ").strip()
         
         if choice == '1':
-            count = enhancer.add_ratings_batch()
-            if count > 0:
-                save = input("\nSave progress? (y/n): ").strip().lower()
-                if save == 'y':
-                    enhancer.save_books()
+            order = None
+            if enhancer.session is None:
+                order = input(f"Order ({', '.join(ORDERS)}; Enter = recency or your last session): ").strip().lower()
+                if order not in ORDERS:
+                    order = None
+            enhancer.add_ratings_batch(order=order)
         
         elif choice == '2':
             query = input("Enter book title or author to search: ").strip()
@@ -241,12 +269,12 @@ def main():
                 print(f"  • {book['title']} by {book['author']} ({book['year_read']}){rating_str}")
         
         elif choice == '5':
-            enhancer.save_books()
+            enhancer.save_and_compact()
             print("👋 Goodbye!")
             break
         
         elif choice == '6':
-            confirm = input("Quit without saving? (y/n): ").strip().lower()
+            confirm = input("Quit without saving? Ratings from option 1 are already saved. (y/n): ").strip().lower()
             if confirm == 'y':
                 print("👋 Goodbye!")
                 break
@@ -255,4 +283,5 @@ def main():
             print("Invalid choice")
 
 if __name__ == "__main__":
-    main()
+    import sys
+    main(*sys.argv[1:2])
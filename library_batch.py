@@ -0,0 +1,282 @@
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from book_db import is_database_path
+from book_store import atomic_write_json, load_books
+from book_summary import ReadingSummary, load_summary, stored_summary
+from reading_analytics import load_analytics, stored_analytics
+
+# The library file a reader's own directory holds
+LIBRARY_FILE = 'enhanced_books.json'
+# Files next to a library that are derived from it rather than libraries themselves
+DERIVED_SUFFIXES = ('.summary.json', '.analytics.json', '.cohort.json')
+# Authors, genres and favourites listed in the cohort summary
+COHORT_TOP = 20
+# Chunks handed to each worker; more than one evens out libraries of very different sizes
+CHUNKS_PER_WORKER = 4
+
+
+def cohort_path(source):
+    return f"{source.rstrip(os.sep)}.cohort.json"
+
+
+def _library_name(path):
+    """A reader's name for a library: its directory for enhanced_books.json, else the file's stem"""
+    if os.path.basename(path) == LIBRARY_FILE:
+        return os.path.basename(os.path.dirname(os.path.abspath(path)))
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def _is_library(filename):
+    if filename.startswith('.') or filename.endswith(DERIVED_SUFFIXES):
+        return False
+    return filename.endswith('.json') or is_database_path(filename)
+
+
+def discover_libraries(source) -> List[Tuple[str, str]]:
+    """(name, path) of every library in a directory or listed in a manifest
+
+    A directory holds one subdirectory per reader (with its own
+    enhanced_books.json) and/or library files (.json, .db) named after
+    their reader. A manifest is a JSON object of name -> path, a JSON list
+    of paths, or a text file with one path per line; relative paths are
+    relative to the manifest.
+    """
+    if os.path.isdir(source):
+        libraries = []
+        for entry in sorted(os.listdir(source)):
+            path = os.path.join(source, entry)
+            if os.path.isdir(path):
+                if os.path.exists(os.path.join(path, LIBRARY_FILE)):
+                    libraries.append((entry, os.path.join(path, LIBRARY_FILE)))
+            elif _is_library(entry):
+                libraries.append((_library_name(path), path))
+        return libraries
+
+    with open(source, 'r', encoding='utf-8') as f:
+        text = f.read()
+    try:
+        entries = json.loads(text)
+    except ValueError:
+        entries = [line.strip() for line in text.splitlines()
+                   if line.strip() and not line.lstrip().startswith('#')]
+    if isinstance(entries, dict):
+        pairs = list(entries.items())
+    elif isinstance(entries, list) and all(isinstance(path, str) for path in entries):
+        pairs = [(_library_name(path), path) for path in entries]
+    else:
+        raise ValueError(f"{source} isn't a manifest (a name -> path object or a list of paths)")
+    base = os.path.dirname(os.path.abspath(source))
+    return [(name, os.path.join(base, path)) for name, path in pairs]
+
+
+class CohortSummary:
+    """Counts across many readers' libraries, merged from their ReadingSummary
+
+    Every figure is a sum (or a per-reader list), so each worker folds its
+    share of libraries into one of these and the partial cohorts are added
+    together - the reduce step never sees a book.
+    """
+
+    def __init__(self):
+        self.readers = 0
+        self.books = ReadingSummary()  # every reader's books counted together
+        self.author_readers = Counter()  # how many readers read each author
+        self.genre_readers = Counter()
+        self.reader_books: List[int] = []  # books per reader
+
+    def add(self, summary: ReadingSummary):
+        """Count one reader's library"""
+        self.readers += 1
+        self.books.merge(summary)
+        self.author_readers.update(summary.authors.keys())
+        self.genre_readers.update(summary.genres.keys())
+        self.reader_books.append(summary.total)
+
+    def merge(self, other: 'CohortSummary') -> 'CohortSummary':
+        """Add another (partial) cohort to this one; returns self"""
+        self.readers += other.readers
+        self.books.merge(other.books)
+        self.author_readers.update(other.author_readers)
+        self.genre_readers.update(other.genre_readers)
+        self.reader_books.extend(other.reader_books)
+        return self
+
+    def to_dict(self, top: int = COHORT_TOP) -> Dict:
+        books = self.books
+        per_reader = sorted(self.reader_books)
+        genre_tags = sum(books.genres.values())
+        favourites = Counter((title, author) for title, author, _ in books.five_star)
+        return {
+            'readers': self.readers,
+            'books': books.total,
+            'books_per_reader': {
+                'mean': books.total / self.readers if self.readers else 0.0,
+                'median': per_reader[len(per_reader) // 2] if per_reader else 0,
+                'max': per_reader[-1] if per_reader else 0,
+            },
+            'pages_total': books.pages_total,
+            'average_pages': books.average_pages,
+            'rated': books.rated,
+            'average_rating': books.average_rating,
+            'ratings': sorted(books.ratings.items()),
+            'years': sorted(books.years.items()),
+            'top_authors': [{'author': author, 'books': count, 'readers': self.author_readers[author]}
+                            for author, count in books.authors.most_common(top)],
+            'widely_read_authors': [{'author': author, 'readers': readers,
+                                     'books': books.authors[author]}
+                                    for author, readers in self.author_readers.most_common(top)],
+            'genre_mix': [{'genre': genre, 'books': count,
+                           'share': count / genre_tags, 'readers': self.genre_readers[genre]}
+                          for genre, count in books.genres.most_common(top)],
+            'favourites': [{'title': title, 'author': author, 'readers': readers}
+                           for (title, author), readers in favourites.most_common(top)],
+            'longest': books.longest,
+        }
+
+
+def _check_library(books, path):
+    """Raise ValueError unless ``books`` is a list of book records (so a stray notes.json isn't a reader)"""
+    if not isinstance(books, list) or not all(isinstance(book, dict) and 'title' in book
+                                              for book in books):
+        raise ValueError(f"{path} isn't a library (a list of books with titles)")
+
+
+def library_stats(name, path) -> Tuple[Dict, ReadingSummary]:
+    """One reader's row of the batch report, and the summary it was taken from
+
+    The summary and analytics stored next to the library are reused while
+    it's unchanged, so a rerun only reads the libraries that were edited -
+    and those once, for whichever of the two needs rebuilding.
+    """
+    summary, analytics = stored_summary(path), stored_analytics(path)
+    if summary is None or analytics is None:
+        books = load_books(path)
+        _check_library(books, path)
+        summary = summary if summary is not None else load_summary(path, books)
+        analytics = analytics if analytics is not None else load_analytics(path, books=books)
+    streak = analytics['streaks']['years']
+    top_author = summary.authors.most_common(1)
+    top_genre = summary.genres.most_common(1)
+    row = {
+        'name': name,
+        'path': path,
+        'books': summary.total,
+        'first_year': summary.first_year,
+        'last_year': summary.last_year,
+        'books_per_year': summary.total / summary.years_span if summary.years_span else 0.0,
+        'pages_total': summary.pages_total,
+        'rated': summary.rated,
+        'average_rating': summary.average_rating,
+        'top_author': top_author[0][0] if top_author else None,
+        'top_genre': top_genre[0][0] if top_genre else None,
+        'longest_streak': streak['longest']['length'],
+        'current_streak': streak['current']['length'],
+        'recent_per_year': analytics['velocity']['recent_per_year'],
+    }
+    return row, summary
+
+
+def _map_libraries(libraries: List[Tuple[str, str]]) -> Tuple[List[Dict], CohortSummary]:
+    """Rows for a chunk of libraries and their partial cohort (the map step, run in a worker)"""
+    rows, cohort = [], CohortSummary()
+    for name, path in libraries:
+        try:
+            row, summary = library_stats(name, path)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            rows.append({'name': name, 'path': path, 'error': f"{type(e).__name__}: {e}"})
+            continue
+        rows.append(row)
+        cohort.add(summary)
+    return rows, cohort
+
+
+def _chunks(items, count):
+    size = -(-len(items) // count) if items else 1
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def batch_stats(libraries: List[Tuple[str, str]],
+                workers: Optional[int] = None) -> Tuple[List[Dict], CohortSummary]:
+    """Per-library rows (in ``libraries`` order) and the cohort they add up to
+
+    Chunks of libraries are mapped in a process pool and the partial cohorts
+    reduced here; each library is read by exactly one worker.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(libraries, workers * CHUNKS_PER_WORKER)
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            partials = list(executor.map(_map_libraries, chunks))
+    else:
+        partials = [_map_libraries(chunk) for chunk in chunks]
+
+    rows, cohort = [], CohortSummary()
+    for chunk_rows, partial in partials:
+        rows.extend(chunk_rows)
+        cohort.merge(partial)
+    return rows, cohort
+
+
+def run_batch(source, output=None, workers: Optional[int] = None) -> Dict:
+    """Stats for every library in a directory or manifest, written with their cohort summary to one file"""
+    libraries = discover_libraries(source)
+    rows, cohort = batch_stats(libraries, workers)
+    report = {'source': source, 'libraries': rows, 'cohort': cohort.to_dict()}
+    atomic_write_json(output or cohort_path(source), report)
+    return report
+
+
+def print_report(report: Dict, top: int = 10):
+    cohort = report['cohort']
+    failed = [row for row in report['libraries'] if 'error' in row]
+    print("📚" + "="*60)
+    print("           READING COHORT STATISTICS")
+    print("="*63)
+    print(f"\n👥 {cohort['readers']} readers, {cohort['books']:,} books "
+          f"({cohort['books_per_reader']['mean']:.0f} per reader, "
+          f"median {cohort['books_per_reader']['median']:,})")
+    print(f"   Pages Read: {cohort['pages_total']:,}")
+    if cohort['rated']:
+        print(f"   Average Rating: {cohort['average_rating']:.2f}/5 ({cohort['rated']:,} rated)")
+
+    print(f"\n✍️  TOP AUTHORS")
+    for entry in cohort['top_authors'][:top]:
+        print(f"   {entry['author']:<25} {entry['books']:5,} books, {entry['readers']} readers")
+    print(f"\n🎭 GENRE MIX")
+    for entry in cohort['genre_mix'][:top]:
+        print(f"   {entry['genre']:<25} {entry['share']:5.1%}  ({entry['readers']} readers)")
+    if cohort['favourites']:
+        print(f"\n🏆 MOST 5-STARRED")
+        for entry in cohort['favourites'][:top]:
+            print(f"   • {entry['title']} by {entry['author']} ({entry['readers']} readers)")
+
+    print(f"\n📖 READERS")
+    for row in report['libraries']:
+        if 'error' not in row:
+            print(f"   {row['name']:<20} {row['books']:6,} books  {row['books_per_year']:5.1f}/year  "
+                  f"streak {row['longest_streak']} years")
+    for row in failed:
+        print(f"   ⚠️  {row['name']}: {row['error']}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stats for many readers' libraries and their cohort")
+    parser.add_argument('source', help="a directory of libraries, or a manifest listing them")
+    parser.add_argument('--output', help="where to write the report (default: <source>.cohort.json)")
+    parser.add_argument('--workers', type=int, help="processes to use (default: one per CPU)")
+    args = parser.parse_args()
+    try:
+        report = run_batch(args.source, args.output, args.workers)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print_report(report)
+    print(f"\n✅ Report for {len(report['libraries'])} libraries saved to "
+          f"{args.output or cohort_path(args.source)}")
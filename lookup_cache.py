@@ -0,0 +1,115 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Optional, Tuple
+
+DEFAULT_CACHE_FILE = '.lookup_cache.sqlite'
+
+# Only these volumeInfo fields are used by the enrichment code, so only they are cached
+CACHED_FIELDS = ('title', 'authors', 'pageCount', 'publishedDate', 'categories',
+                 'description', 'industryIdentifiers')
+
+_WORD = re.compile(r'\w+')
+
+
+def normalize_query(title: str, author: str) -> str:
+    """Cache key for a lookup: lowercase words only, so punctuation and spacing don't matter"""
+    return ' '.join(_WORD.findall(f"{title} {author}".lower()))
+
+
+def trim_volume_info(volume_info):
+    """Keep just the volumeInfo fields we read, to keep cache entries small"""
+    if volume_info is None:
+        return None
+    return {k: volume_info[k] for k in CACHED_FIELDS if k in volume_info}
+
+
+class LookupCache:
+    """Persistent SQLite cache of Google Books responses with TTLs and LRU eviction
+
+    ``get`` returns ``(hit, value)``; a hit with value ``None`` is a cached
+    "no results" answer, which expires after ``negative_ttl_days``.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_FILE, ttl_days: float = 30,
+                 negative_ttl_days: float = 7, max_entries: int = 50000):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.negative_ttl = negative_ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS lookups (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                created REAL NOT NULL,
+                accessed REAL NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_lookups_accessed ON lookups(accessed)")
+        self.conn.commit()
+        self.size = self.conn.execute("SELECT COUNT(*) FROM lookups").fetchone()[0]
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (hit, value) for a key, treating expired entries as misses"""
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT value, created FROM lookups WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                value, created = row
+                ttl = self.ttl if value is not None else self.negative_ttl
+                if now - created <= ttl:
+                    self.conn.execute("UPDATE lookups SET accessed = ? WHERE key = ?", (now, key))
+                    self.conn.commit()
+                    self.hits += 1
+                    return True, json.loads(value) if value is not None else None
+            self.misses += 1
+            return False, None
+
+    def put(self, key: str, value: Optional[Any]):
+        """Store a value (``None`` caches a "no results" answer), evicting the least recently used"""
+        now = time.time()
+        encoded = json.dumps(value, ensure_ascii=False) if value is not None else None
+        with self.lock:
+            exists = self.conn.execute(
+                "SELECT 1 FROM lookups WHERE key = ?", (key,)).fetchone() is not None
+            self.conn.execute(
+                "INSERT OR REPLACE INTO lookups (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, encoded, now, now))
+            if not exists:
+                self.size += 1
+            if self.size > self.max_entries:
+                excess = self.size - self.max_entries
+                self.conn.execute(
+                    "DELETE FROM lookups WHERE key IN "
+                    "(SELECT key FROM lookups ORDER BY accessed LIMIT ?)", (excess,))
+                self.size -= excess
+            self.conn.commit()
+
+    def clear_expired(self):
+        """Drop every expired entry"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "DELETE FROM lookups WHERE (value IS NOT NULL AND created < ?) "
+                "OR (value IS NULL AND created < ?)",
+                (now - self.ttl, now - self.negative_ttl))
+            self.conn.commit()
+            self.size = self.conn.execute("SELECT COUNT(*) FROM lookups").fetchone()[0]
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0
+        return f"cache hits: {self.hits}, misses: {self.misses} ({rate:.0f}% hit rate)"
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
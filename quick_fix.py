@@ -1,12 +1,10 @@
-import json
+from book_db import BookDatabase, is_database_path
+from book_store import JournaledBookStore
 
 # Quick fix: manually add the ratings you just entered
 # This will update your JSON file with the 8 books you rated
 
-def quick_add_ratings():
-    with open('enhanced_books.json', 'r', encoding='utf-8') as f:
-        books = json.load(f)
-    
+def quick_add_ratings(data_file='enhanced_books.json'):
     # The ratings you just entered based on your terminal output:
     ratings_to_add = {
         "Anthem": {"rating": 3, "personal_tags": ["fiction"]},
@@ -19,6 +17,14 @@ def quick_add_ratings():
         "Sperm Wars": {"rating": 3, "personal_tags": ["evolutionary biology", "non-fiction"]}
     }
     
+    # A SQLite library only needs to fetch and update the rated rows
+    if is_database_path(data_file):
+        db = BookDatabase(data_file)
+        books = db.books_by_titles(ratings_to_add)
+    else:
+        store = JournaledBookStore(data_file)
+        books = store.load(repair=True)
+    
     # Apply the ratings
     updated_count = 0
     for book in books:
@@ -28,14 +34,19 @@ def quick_add_ratings():
             book['personal_tags'] = rating_data.get('personal_tags', [])
             if 'notes' in rating_data:
                 book['notes'] = rating_data['notes']
+            if is_database_path(data_file):
+                db.update_book(book['id'], **{k: book[k] for k in rating_data})
             updated_count += 1
             print(f"✅ Updated: {book['title']} - {rating_data['rating']}⭐")
     
-    # Save back to file
-    with open('enhanced_books.json', 'w', encoding='utf-8') as f:
-        json.dump(books, f, indent=2, ensure_ascii=False)
+    # Save back to file (atomic rename, so a crash can't truncate it)
+    if is_database_path(data_file):
+        db.close()
+    else:
+        store.compact()
     
-    print(f"\n🎉 Successfully saved {updated_count} ratings to enhanced_books.json")
+    print(f"\n🎉 Successfully saved {updated_count} ratings to {data_file}")
 
 if __name__ == "__main__":
-    quick_add_ratings()
+    import sys
+    quick_add_ratings(*sys.argv[1:2])
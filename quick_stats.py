@@ -1,26 +1,23 @@
-import json
-import pandas as pd
-from collections import Counter
-from datetime import datetime
+from book_summary import load_summary
+from reading_analytics import load_analytics
 
-def analyze_reading_data():
+def analyze_reading_data(data_file='enhanced_books.json'):
     """Generate quick reading statistics in terminal"""
     
-    # Load data
-    with open('enhanced_books.json', 'r', encoding='utf-8') as f:
-        books = json.load(f)
-    
-    df = pd.DataFrame(books)
+    # Precomputed counts stored next to the library (rebuilt only if the library changed)
+    summary = load_summary(data_file)
+    # Streaks, velocity and pace, stored next to it too (recomputed daily or on changes)
+    analytics = load_analytics(data_file)
     
     print("📚" + "="*60)
     print("           YOUR READING JOURNEY STATISTICS")
     print("="*63)
     
     # Basic Stats
-    total_books = len(df)
-    years_span = df['year_read'].max() - df['year_read'].min() + 1
-    start_year = df['year_read'].min()
-    end_year = df['year_read'].max()
+    total_books = summary.total
+    years_span = summary.years_span
+    start_year = summary.first_year
+    end_year = summary.last_year
     
     print(f"\n📖 READING OVERVIEW")
     print(f"   Total Books: {total_books:,}")
@@ -28,126 +25,130 @@ def analyze_reading_data():
     print(f"   Average per Year: {total_books/years_span:.1f} books")
     
     # Yearly breakdown
-    yearly_counts = df['year_read'].value_counts().sort_index()
-    best_year = yearly_counts.idxmax()
-    best_count = yearly_counts.max()
-    worst_year = yearly_counts.idxmin()
-    worst_count = yearly_counts.min()
+    yearly_counts = dict(sorted(summary.years.items()))
+    best_year = max(yearly_counts, key=yearly_counts.get)
+    best_count = yearly_counts[best_year]
+    worst_year = min(yearly_counts, key=yearly_counts.get)
+    worst_count = yearly_counts[worst_year]
+    counts = list(yearly_counts.values())
     
     print(f"\n📅 YEARLY PATTERNS")
     print(f"   Best Year: {best_year} ({best_count} books)")
     print(f"   Quietest Year: {worst_year} ({worst_count} books)")
-    print(f"   Last 3 Years: {yearly_counts.tail(3).sum()} books")
+    print(f"   Last 3 Years: {sum(counts[-3:])} books")
     
     # Recent years detail
     print(f"\n   Recent Years Breakdown:")
-    for year in sorted(yearly_counts.index)[-5:]:
+    for year in list(yearly_counts)[-5:]:
         count = yearly_counts[year]
         bar = "█" * (count // 3) + "▌" * (count % 3)
         print(f"   {year}: {count:2d} books {bar}")
     
     # Page Analysis
-    pages_data = df[df['pages'].notna() & (df['pages'] != 0)]
-    if len(pages_data) > 0:
-        total_pages = pages_data['pages'].sum()
-        avg_pages = pages_data['pages'].mean()
-        longest_book = df.loc[df['pages'].idxmax()] if df['pages'].max() > 0 else None
+    total_pages = summary.pages_total
+    if summary.pages_books > 0:
+        longest_pages, longest_title = summary.longest[0]
         
         print(f"\n📄 PAGE STATISTICS")
         print(f"   Total Pages Read: {total_pages:,}")
-        print(f"   Average Book Length: {avg_pages:.0f} pages")
-        if longest_book is not None:
-            print(f"   Longest Book: {longest_book['title']} ({longest_book['pages']} pages)")
+        print(f"   Average Book Length: {summary.average_pages:.0f} pages")
+        print(f"   Longest Book: {longest_title} ({longest_pages} pages)")
         
         # Estimate reading time (assuming 250 words/page, 250 words/minute)
         est_hours = (total_pages * 250) / (250 * 60)
         print(f"   Estimated Reading Time: {est_hours:,.0f} hours ({est_hours/24:,.0f} days)")
     
     # Genre Analysis
-    all_genres = []
-    for categories in df['categories']:
-        if categories:
-            all_genres.extend(categories)
-    
-    if all_genres:
-        genre_counts = Counter(all_genres)
+    if summary.genres:
         print(f"\n🎭 TOP GENRES")
-        for genre, count in genre_counts.most_common(8):
+        for genre, count in summary.genres.most_common(8):
             percentage = (count / total_books) * 100
             print(f"   {genre:<20} {count:3d} books ({percentage:4.1f}%)")
     
     # Author Analysis
-    author_counts = df['author'].value_counts()
+    author_counts = summary.authors.most_common(10)
     print(f"\n👥 AUTHOR INSIGHTS")
-    print(f"   Unique Authors: {df['author'].nunique()}")
-    print(f"   Most Read Author: {author_counts.index[0]} ({author_counts.iloc[0]} books)")
+    print(f"   Unique Authors: {len(summary.authors)}")
+    print(f"   Most Read Author: {author_counts[0][0]} ({author_counts[0][1]} books)")
     
     print(f"\n   Top Authors:")
-    for author, count in author_counts.head(10).items():
+    for author, count in author_counts:
         if count > 1:  # Only show authors with multiple books
             print(f"   {author:<25} {count} books")
     
     # Rating Analysis
-    rated_books = df[df['rating'].notna()]
-    if len(rated_books) > 0:
-        avg_rating = rated_books['rating'].mean()
-        rating_counts = rated_books['rating'].value_counts().sort_index()
-        
+    rated = summary.rated
+    if rated > 0:
         print(f"\n⭐ RATING ANALYSIS")
-        print(f"   Rated Books: {len(rated_books)} / {total_books} ({len(rated_books)/total_books*100:.1f}%)")
-        print(f"   Average Rating: {avg_rating:.2f}/5")
+        print(f"   Rated Books: {rated} / {total_books} ({rated/total_books*100:.1f}%)")
+        print(f"   Average Rating: {summary.average_rating:.2f}/5")
         
         print(f"\n   Rating Distribution:")
         for rating in range(1, 6):
-            count = rating_counts.get(rating, 0)
+            count = summary.ratings.get(rating, 0)
             stars = "⭐" * rating
             bar = "█" * (count // 2) + "▌" * (count % 2)
             print(f"   {stars:<6} {count:2d} books {bar}")
         
         # Find highly rated books
-        five_stars = rated_books[rated_books['rating'] == 5]
+        five_stars = summary.five_star
         if len(five_stars) > 0:
             print(f"\n🏆 YOUR 5-STAR BOOKS ({len(five_stars)}):")
-            for _, book in five_stars.head(10).iterrows():
-                print(f"   • {book['title']} by {book['author']} ({book['year_read']})")
+            for title, author, year in five_stars[:10]:
+                print(f"   • {title} by {author} ({year})")
     else:
         print(f"\n⭐ RATING ANALYSIS")
         print(f"   No ratings yet - start rating your books to see insights!")
     
-    # Reading Velocity Analysis
+    # Reading Velocity Analysis (complete years only)
     print(f"\n🚀 READING VELOCITY")
-    recent_years = yearly_counts.tail(3)
-    older_years = yearly_counts.head(3)
-    
-    if len(recent_years) > 0 and len(older_years) > 0:
-        recent_avg = recent_years.mean()
-        older_avg = older_years.mean()
-        change = ((recent_avg - older_avg) / older_avg) * 100
-        
-        print(f"   Early Years Avg: {older_avg:.1f} books/year")
-        print(f"   Recent Years Avg: {recent_avg:.1f} books/year")
-        trend = "📈 increasing" if change > 0 else "📉 decreasing"
-        print(f"   Trend: {trend} ({change:+.1f}%)")
+    velocity = analytics['velocity']
+    
+    if velocity['previous_per_year'] is not None:
+        print(f"   Previous 3 Years Avg: {velocity['previous_per_year']:.1f} books/year")
+    if velocity['recent_per_year'] is not None:
+        print(f"   Last 3 Years Avg: {velocity['recent_per_year']:.1f} books/year")
+    if velocity['change'] is not None:
+        trend = "📈 increasing" if velocity['change'] > 0 else \
+            "📉 decreasing" if velocity['change'] < 0 else "➡️  steady"
+        print(f"   Trend: {trend} ({velocity['change']:+.1%})")
+    if velocity['trend_per_year'] is not None:
+        print(f"   Long-run Trend: {velocity['trend_per_year']:+.2f} books/year each year")
+    
+    windows = analytics['windows']
+    for window, label in (('30_days', '30 days'), ('365_days', '365 days')):
+        if window in windows:
+            print(f"   Last {label}: {windows[window]['latest_books']} books, "
+                  f"{windows[window]['latest_pages']:,} pages "
+                  f"(best ever: {windows[window]['best_books']} up to {windows[window]['best_end']})")
+    
+    projection = analytics['projection']
+    if projection['basis']:
+        print(f"   {projection['year']} Projection: {projection['projected_books']} books, "
+              f"{projection['projected_pages']:,} pages (pace of the {projection['basis']})")
+        if projection['milestone_date']:
+            print(f"   Book #{projection['next_milestone']:,} expected around {projection['milestone_date']}")
     
     # Fun Facts
     print(f"\n🎉 FUN FACTS")
     
-    # Find reading streaks
-    consecutive_years = 0
-    for year in range(start_year, end_year + 1):
-        if year in yearly_counts.index:
-            consecutive_years += 1
-        else:
-            break
-    
-    print(f"   Reading Streak: {consecutive_years} consecutive years")
+    # Reading streaks
+    years_streak = analytics['streaks']['years']
+    longest, current = years_streak['longest'], years_streak['current']
+    print(f"   Longest Reading Streak: {longest['length']} consecutive years "
+          f"({longest['start']}-{longest['end']})")
+    print(f"   Current Streak: {current['length']} years")
+    days_streak = analytics['streaks']['days']['longest']
+    if days_streak['length'] > 1:
+        print(f"   Most Days in a Row Finishing a Book: {days_streak['length']} "
+              f"({days_streak['start']} to {days_streak['end']})")
     
     # Books per decade of life (assuming you're tracking from college age)
     if years_span >= 10:
         print(f"   Books per Decade: ~{(total_books/years_span)*10:.0f} books")
     
     # Estimate unique words encountered (rough calculation)
-    if len(pages_data) > 0:
+    if summary.pages_books > 0:
         est_words = total_pages * 250  # ~250 words per page
         print(f"   Estimated Words Read: {est_words:,}")
     
@@ -156,8 +157,9 @@ def analyze_reading_data():
     print("="*63)
 
 if __name__ == "__main__":
+    import sys
     try:
-        analyze_reading_data()
+        analyze_reading_data(*sys.argv[1:2])
     except FileNotFoundError:
         print("❌ enhanced_books.json not found!")
         print("Run the book processing script first.")
@@ -0,0 +1,140 @@
+import heapq
+import json
+import os
+from typing import Dict, List, Optional
+
+from book_store import atomic_write_json
+
+# Orders the unrated queue can be worked through in
+ORDERS = ('recency', 'author', 'pages')
+
+
+def session_path(data_file):
+    return f"{data_file}.rating_session"
+
+
+def _int(value) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def priority(book: Dict, order: str):
+    """Sort key of an unrated book: most recently read, by author, or shortest first"""
+    if order == 'recency':
+        finished = ''.join(c for c in str(book.get('date_finished') or '') if c.isdigit())
+        return (-_int(book.get('year_read')), -_int(finished[:8]))
+    if order == 'author':
+        return ((book.get('author') or '').casefold(), (book.get('title') or '').casefold())
+    pages = _int(book.get('pages'))
+    return (pages <= 0, pages)
+
+
+class RatingQueue:
+    """Positions of the unrated books in a heap, built once
+
+    Books rated (or skipped) after they were queued are dropped when they
+    reach the top, so nothing is rescanned between ratings.
+    """
+
+    def __init__(self, books: List[Dict], order: str = 'recency', skipped=()):
+        if order not in ORDERS:
+            raise ValueError(f"unknown order {order!r} (choose from {', '.join(ORDERS)})")
+        self.books = books
+        self.order = order
+        self.skipped = {i for i in skipped if 0 <= i < len(books)}
+        self._heap = [(priority(book, order), i) for i, book in enumerate(books)
+                      if book.get('rating') is None and i not in self.skipped]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        """Books still queued (an upper bound until rated ones are popped)"""
+        return len(self._heap)
+
+    def pop(self) -> Optional[int]:
+        """Position of the next unrated book, or None when there are none left"""
+        while self._heap:
+            _, position = heapq.heappop(self._heap)
+            if self.books[position].get('rating') is None and position not in self.skipped:
+                return position
+        return None
+
+    def push(self, position: int):
+        """Queue a book again (e.g. one added to the library or whose rating was cleared)"""
+        self.skipped.discard(position)
+        heapq.heappush(self._heap, (priority(self.books[position], self.order), position))
+
+    def skip(self, position: int):
+        self.skipped.add(position)
+
+
+class RatingSession:
+    """A resumable run through a BookEnhancer's unrated books
+
+    Ratings go through the enhancer's ``_edit`` (store buffer, summary and
+    search index) and are appended to the store's journal every
+    ``flush_every`` books and on ``save``, without compacting, so rating
+    hundreds of books never rewrites the library. The order, skipped books
+    and progress live in ``<data_file>.rating_session``; a later session
+    picks up where this one stopped.
+    """
+
+    def __init__(self, enhancer, order: Optional[str] = None, flush_every: int = 10,
+                 resume: bool = True):
+        self.enhancer = enhancer
+        self.state_file = session_path(enhancer.json_file)
+        self.flush_every = flush_every
+        state = self._load_state() if resume else None
+        self.resumed = state is not None
+        self.rated = state['rated'] if state else 0
+        self.queue = RatingQueue(enhancer.books, order or (state['order'] if state else 'recency'),
+                                 state['skipped'] if state else ())
+        self._unsaved = 0
+        self._current = None
+        self._finished = False
+
+    @property
+    def order(self):
+        return self.queue.order
+
+    def _load_state(self) -> Optional[Dict]:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return state if state.get('order') in ORDERS else None
+
+    def next_book(self) -> Optional[Dict]:
+        """The highest-priority unrated book, or None when every book is rated or skipped"""
+        self._current = self.queue.pop()
+        return None if self._current is None else self.enhancer.books[self._current]
+
+    def rate(self, book: Dict, rating: int, **fields):
+        """Rate a book (plus optional fields such as personal_tags or notes) as one journal entry"""
+        self.enhancer._edit(book, rating=rating, **fields)
+        self.rated += 1
+        self._unsaved += 1
+        if self._unsaved >= self.flush_every:
+            self.save()
+
+    def skip(self):
+        """Leave the book from ``next_book`` unrated and out of the queue, in resumed sessions too"""
+        if self._current is not None:
+            self.queue.skip(self._current)
+
+    def save(self) -> int:
+        """Append buffered ratings to the journal and record progress; returns edits written"""
+        written = self.enhancer.store.flush(compact=False)
+        if not self._finished:
+            atomic_write_json(self.state_file, {'order': self.order, 'rated': self.rated,
+                                                'skipped': sorted(self.queue.skipped)})
+        self._unsaved = 0
+        return written
+
+    def finish(self):
+        """Forget the saved progress so the next session starts from the top"""
+        self._finished = True
+        if os.path.exists(self.state_file):
+            os.remove(self.state_file)
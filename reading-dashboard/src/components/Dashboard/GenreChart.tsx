@@ -1,8 +1,7 @@
 import { PieChart, Pie, Cell, ResponsiveContainer, Tooltip } from 'recharts';
-import type { Book } from '../../types';
-
 interface GenreChartProps {
-  books: Book[];
+  genres: { genre: string; count: number }[];
+  totalBooks: number;
 }
 
 const COLORS = [
@@ -18,24 +17,13 @@ const COLORS = [
   '#A0522D'  // sienna
 ];
 
-export const GenreChart = ({ books }: GenreChartProps) => {
-  // Count books by genre
-  const genreCount = books.reduce((acc, book) => {
-    book.categories.forEach(category => {
-      if (!acc[category]) {
-        acc[category] = 0;
-      }
-      acc[category]++;
-    });
-    return acc;
-  }, {} as Record<string, number>);
-
-  // Convert to array and sort by count
-  const chartData = Object.entries(genreCount)
-    .map(([genre, count]) => ({
+export const GenreChart = ({ genres, totalBooks }: GenreChartProps) => {
+  // Top genres, largest first
+  const chartData = genres
+    .map(({ genre, count }) => ({
       genre,
       count,
-      percentage: Math.round((count / books.length) * 100)
+      percentage: Math.round((count / totalBooks) * 100)
     }))
     .sort((a, b) => b.count - a.count)
     .slice(0, 10); // Top 10 genres
@@ -1,18 +1,16 @@
 import { LineChart, Line, XAxis, YAxis, CartesianGrid, Tooltip, ResponsiveContainer } from 'recharts';
-import type { Book } from '../../types';
+import type { BundleYear } from '../../utils/bundle';
 
 interface ReadingTimelineProps {
-  books: Book[];
+  years: BundleYear[];
 }
 
-export const ReadingTimeline = ({ books }: ReadingTimelineProps) => {
-  // Group books by year and count them
-  const yearData = books.reduce((acc, book) => {
-    const year = book.year_read;
-    if (!acc[year]) {
-      acc[year] = 0;
+export const ReadingTimeline = ({ years }: ReadingTimelineProps) => {
+  // Books per year (books without a year left out)
+  const yearData = years.reduce((acc, { year, books }) => {
+    if (year !== null) {
+      acc[year] = books;
     }
-    acc[year]++;
     return acc;
   }, {} as Record<number, number>);
 
@@ -1,25 +1,20 @@
-import type { Book } from '../../types';
+import type { BundleSummary } from '../../utils/bundle';
 
 interface StatsOverviewProps {
-  books: Book[];
+  summary: BundleSummary;
 }
 
-export const StatsOverview = ({ books }: StatsOverviewProps) => {
-  const totalBooks = books.length;
-  const totalPages = books.reduce((sum, book) => sum + (book.pages || 0), 0);
+export const StatsOverview = ({ summary }: StatsOverviewProps) => {
+  const { totalBooks, totalPages, yearsReading } = summary.stats;
   
-  const ratedBooks = books.filter(book => book.rating !== null);
-  const averageRating = ratedBooks.length > 0 
-    ? Math.round(ratedBooks.reduce((sum, book) => sum + book.rating!, 0) / ratedBooks.length * 10) / 10
+  const averageRating = summary.rated > 0
+    ? Math.round(summary.stats.averageRating * 10) / 10
     : null;
   
-  const years = books.map(book => book.year_read);
-  const startYear = Math.min(...years);
-  const endYear = Math.max(...years);
-  const yearsReading = endYear - startYear + 1;
+  const startYear = summary.yearRange.min;
+  const endYear = summary.yearRange.max;
   
-  const currentYear = new Date().getFullYear();
-  const currentYearBooks = books.filter(book => book.year_read === currentYear).length;
+  const currentYearBooks = summary.stats.booksThisYear;
   
   const readingDays = Math.round(totalPages / 250); // Assuming ~250 pages per day
 
@@ -42,7 +37,7 @@ export const StatsOverview = ({ books }: StatsOverviewProps) => {
     {
       label: 'Average Rating',
       value: averageRating ? `${averageRating}/5` : 'N/A',
-      subtitle: `${ratedBooks.length} books rated`
+      subtitle: `${summary.rated} books rated`
     }
   ];
 
@@ -1,23 +1,59 @@
 import { useState, useEffect, useMemo } from 'react';
 import type { Book } from '../types/index';
-import booksData from '../data/enhanced_books.json';
+import { loadBooks, loadSummary } from '../utils/bundle';
+import type { BundleSummary } from '../utils/bundle';
 
-export const useBooks = () => {
+/**
+ * The library's summary plus the books of ``years`` (default: every year)
+ *
+ * The summary (stats, counts per year, genres, tags, recent books) comes
+ * first; only the year files a page asks for are fetched after it, and each
+ * is fetched once however many pages use it. Pass [] for the summary alone.
+ */
+export const useBooks = (years?: number[]) => {
+  const [summary, setSummary] = useState<BundleSummary | null>(null);
   const [books, setBooks] = useState<Book[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const yearsKey = years?.join(',');
 
   useEffect(() => {
-    try {
-      // Since we're importing directly, we can set it immediately
-      setBooks(booksData as Book[]);
-      setLoading(false);
-    } catch (err) {
-      setError('Failed to load books data');
-      setLoading(false);
-    }
+    let cancelled = false;
+    loadSummary()
+      .then(data => {
+        if (!cancelled) setSummary(data);
+      })
+      .catch(() => {
+        if (cancelled) return;
+        setError('Failed to load books data (run dashboard_bundle.py)');
+        setLoading(false);
+      });
+    return () => {
+      cancelled = true;
+    };
   }, []);
 
+  useEffect(() => {
+    if (!summary) return;
+    let cancelled = false;
+    setLoading(true);
+    const wanted = yearsKey?.split(',').filter(Boolean).map(Number);
+    loadBooks(summary, wanted)
+      .then(data => {
+        if (cancelled) return;
+        setBooks(data);
+        setLoading(false);
+      })
+      .catch(() => {
+        if (cancelled) return;
+        setError('Failed to load books data');
+        setLoading(false);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [summary, yearsKey]);
+
   const booksByYear = useMemo(() => {
     return books.reduce((acc, book) => {
       const year = book.year_read;
@@ -30,20 +66,12 @@ export const useBooks = () => {
   }, [books]);
 
   const allGenres = useMemo(() => {
-    const genres = new Set<string>();
-    books.forEach(book => {
-      book.categories.forEach(category => genres.add(category));
-    });
-    return Array.from(genres).sort();
-  }, [books]);
+    return (summary?.genres ?? []).map(({ genre }) => genre);
+  }, [summary]);
 
   const allTags = useMemo(() => {
-    const tags = new Set<string>();
-    books.forEach(book => {
-      book.personal_tags.forEach(tag => tags.add(tag));
-    });
-    return Array.from(tags).sort();
-  }, [books]);
+    return (summary?.tags ?? []).map(({ tag }) => tag);
+  }, [summary]);
 
   const allAuthors = useMemo(() => {
     const authors = new Set<string>();
@@ -52,24 +80,18 @@ export const useBooks = () => {
   }, [books]);
 
   const yearRange = useMemo(() => {
-    if (books.length === 0) return { min: 2011, max: 2025 };
-    const years = books.map(book => book.year_read);
-    return {
-      min: Math.min(...years),
-      max: Math.max(...years)
-    };
-  }, [books]);
+    const range = summary?.yearRange;
+    if (!range || range.min === null || range.max === null) return { min: 2011, max: 2025 };
+    return { min: range.min, max: range.max };
+  }, [summary]);
 
   const pageRange = useMemo(() => {
-    if (books.length === 0) return { min: 0, max: 1000 };
-    const pages = books.map(book => book.pages || 0);
-    return {
-      min: Math.min(...pages),
-      max: Math.max(...pages)
-    };
-  }, [books]);
+    if (!summary || summary.stats.totalBooks === 0) return { min: 0, max: 1000 };
+    return summary.pageRange;
+  }, [summary]);
 
   return {
+    summary,
     books,
     loading,
     error,
@@ -80,4 +102,4 @@ export const useBooks = () => {
     yearRange,
     pageRange
   };
-};
\ No newline at end of file
+};
@@ -1,14 +1,13 @@
 import { useBooks } from '../hooks/useBooks';
-import { calculateReadingStats } from '../utils/bookUtils';
 import { Loading } from '../components/UI';
 
 const Analytics = () => {
-  const { books, loading, error } = useBooks();
+  const { summary, loading, error } = useBooks([]);
 
   if (loading) return <Loading message="Analyzing your reading patterns..." />;
-  if (error) return <div>Error: {error}</div>;
+  if (error || !summary) return <div>Error: {error}</div>;
 
-  const stats = calculateReadingStats(books);
+  const { stats } = summary;
 
   return (
     <div className="space-y-8">
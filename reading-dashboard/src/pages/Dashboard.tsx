@@ -2,16 +2,18 @@ import { useBooks } from '../hooks/useBooks';
 import { Loading, Button } from '../components/UI';
 import { StatsOverview, ReadingTimeline, GenreChart, RecentBooks } from '../components/Dashboard';
 import { exportReadingData } from '../utils/exportUtils';
+import { expandBook, loadBooks } from '../utils/bundle';
 import { Download } from 'lucide-react';
 
 const Dashboard = () => {
-  const { books, loading, error } = useBooks();
+  // Everything drawn here is in the bundle's summary; the books are only fetched to export them
+  const { summary, loading, error } = useBooks([]);
 
   if (loading) return <Loading message="Loading your reading dashboard..." />;
-  if (error) return <div>Error: {error}</div>;
+  if (error || !summary) return <div>Error: {error}</div>;
 
-  const handleExport = (format: 'csv' | 'json' | 'stats') => {
-    exportReadingData(books, format);
+  const handleExport = async (format: 'csv' | 'json' | 'stats') => {
+    exportReadingData(await loadBooks(summary), format);
   };
 
   return (
@@ -21,7 +23,7 @@ const Dashboard = () => {
           Your Reading Journey
         </h1>
         <p className="text-xl text-gray-600 dark:text-gray-400 mb-4">
-          {books.length} books and counting...
+          {summary.stats.totalBooks} books and counting...
         </p>
 
         {/* Export Buttons */}
@@ -57,16 +59,16 @@ const Dashboard = () => {
       </div>
       
       {/* Stats Overview */}
-      <StatsOverview books={books} />
+      <StatsOverview summary={summary} />
       
       {/* Charts Section */}
       <div className="grid grid-cols-1 lg:grid-cols-2 gap-8">
-        <ReadingTimeline books={books} />
-        <GenreChart books={books} />
+        <ReadingTimeline years={summary.years} />
+        <GenreChart genres={summary.stats.favoriteGenres} totalBooks={summary.stats.totalBooks} />
       </div>
       
       {/* Recent Books */}
-      <RecentBooks books={books} />
+      <RecentBooks books={summary.recent.map(expandBook)} />
     </div>
   );
 };
@@ -4,13 +4,13 @@ import { Loading } from '../components/UI';
 import { Target, TrendingUp, Calendar, BookOpen } from 'lucide-react';
 
 const Goals = () => {
-  const { books, loading, error } = useBooks();
+  const currentYear = new Date().getFullYear();
+  const { books, loading, error } = useBooks([currentYear]);
   const [yearlyGoal, setYearlyGoal] = useState(50); // Default goal
 
   if (loading) return <Loading message="Loading your reading goals..." />;
   if (error) return <div>Error: {error}</div>;
 
-  const currentYear = new Date().getFullYear();
   const booksThisYear = books.filter(book => book.year_read === currentYear).length;
   const progressPercentage = Math.min((booksThisYear / yearlyGoal) * 100, 100);
 
@@ -0,0 +1,78 @@
+import { describe, it, expect, vi, beforeEach } from 'vitest';
+import { BUNDLE_VERSION, expandBook, loadBooks, loadSummary } from './bundle';
+
+const files: Record<string, unknown> = {
+  'bundle.json': { version: BUNDLE_VERSION, summary: 'summary.aaa.json', books: 2, files: [] },
+  'summary.aaa.json': {
+    version: BUNDLE_VERSION,
+    stats: {},
+    years: [
+      { year: 2023, books: 1, pages: 328, file: 'books-2023.bbb.json' },
+      { year: 2024, books: 1, pages: 0, file: 'books-2024.ccc.json' },
+    ],
+  },
+  'books-2023.bbb.json': {
+    year: 2023,
+    books: [{ title: '1984', author: 'George Orwell', year_read: 2023, pages: 328, rating: 5 }],
+  },
+  'books-2024.ccc.json': {
+    year: 2024,
+    books: [{ title: 'Atomic Habits', author: 'James Clear', year_read: 2024 }],
+  },
+  'books-broken.ddd.json': { year: 2025, rows: [] },
+};
+
+const fetchMock = vi.fn(async (url: string) => {
+  const name = url.split('/').pop()!;
+  return name in files
+    ? { ok: true, json: async () => files[name] }
+    : { ok: false, status: 404, statusText: 'Not Found' };
+});
+
+beforeEach(() => {
+  fetchMock.mockClear();
+  vi.stubGlobal('fetch', fetchMock);
+});
+
+const fetched = () => fetchMock.mock.calls.map(([url]) => url.split('/').pop());
+
+describe('expandBook', () => {
+  it('fills in the fields the bundle leaves out', () => {
+    const book = expandBook({ title: 'Dune', author: 'Frank Herbert', year_read: 2022 });
+    expect(book.categories).toEqual([]);
+    expect(book.personal_tags).toEqual([]);
+    expect(book.favorite_quotes).toEqual([]);
+    expect(book.rating).toBeNull();
+    expect(book.pages).toBe(0);
+  });
+});
+
+describe('loadBooks', () => {
+  it('fetches only the years asked for, once each', async () => {
+    const summary = await loadSummary();
+    expect(fetched()).toEqual(['bundle.json', 'summary.aaa.json']);
+
+    const books = await loadBooks(summary, [2024]);
+    expect(books.map(book => book.title)).toEqual(['Atomic Habits']);
+    expect(fetched()).toContain('books-2024.ccc.json');
+    expect(fetched()).not.toContain('books-2023.bbb.json');
+
+    const all = await loadBooks(summary);
+    expect(all.map(book => book.title)).toEqual(['1984', 'Atomic Habits']);
+    expect(fetched().filter(name => name === 'books-2024.ccc.json')).toHaveLength(1);
+  });
+
+  it('rejects a year file without books', async () => {
+    const summary = await loadSummary();
+    const broken = { year: 2025, books: 1, pages: 0, file: 'books-broken.ddd.json' };
+    await expect(loadBooks({ ...summary, years: [broken] })).rejects.toThrow(
+      "books-broken.ddd.json isn't part of a data bundle"
+    );
+  });
+
+  it('rejects a bundle of another version', async () => {
+    files['bundle.json'] = { ...(files['bundle.json'] as object), version: BUNDLE_VERSION + 1 };
+    await expect(loadSummary()).rejects.toThrow('re-run dashboard_bundle.py');
+    files['bundle.json'] = { ...(files['bundle.json'] as object), version: BUNDLE_VERSION };
+  });
+});
@@ -0,0 +1,139 @@
+import type { Book, ReadingStats } from '../types/index';
+
+// Must match BUNDLE_VERSION in dashboard_bundle.py
+export const BUNDLE_VERSION = 1;
+
+// Written by `python dashboard_bundle.py` into public/data/, served as-is by Vite
+const DATA_URL = `${import.meta.env.BASE_URL}data/`;
+
+export interface BundleYear {
+  year: number | null;
+  books: number;
+  pages: number;
+  file: string;
+}
+
+export interface BundleSummary {
+  version: number;
+  stats: ReadingStats;
+  yearRange: { min: number | null; max: number | null };
+  pageRange: { min: number; max: number };
+  rated: number;
+  ratings: [number, number][];
+  authors: number;
+  years: BundleYear[];
+  genres: { genre: string; count: number }[];
+  tags: { tag: string; count: number }[];
+  recent: Partial<Book>[];
+}
+
+interface BundleManifest {
+  version: number;
+  summary: string;
+  books: number;
+  files: string[];
+}
+
+interface YearShard {
+  year: number | null;
+  books: Partial<Book>[];
+}
+
+const isObject = (data: unknown): data is Record<string, unknown> =>
+  typeof data === 'object' && data !== null && !Array.isArray(data);
+
+const isManifest = (data: unknown): data is BundleManifest =>
+  isObject(data) && typeof data.version === 'number' && typeof data.summary === 'string';
+
+const isSummary = (data: unknown): data is BundleSummary =>
+  isObject(data) && isObject(data.stats) && Array.isArray(data.years);
+
+const isShard = (data: unknown): data is YearShard =>
+  isObject(data) && Array.isArray(data.books) && data.books.every(isObject);
+
+// Every file but the manifest has its content hash in its name, so one fetch per session is enough
+const files = new Map<string, Promise<unknown>>();
+
+const fetchJson = async (name: string, init?: RequestInit): Promise<unknown> => {
+  const response = await fetch(`${DATA_URL}${name}`, init);
+  if (!response.ok) {
+    throw new Error(`${name}: ${response.status} ${response.statusText}`);
+  }
+  return response.json();
+};
+
+/**
+ * A file's parsed JSON, checked and converted by ``read`` (each name always has the same reader)
+ */
+const fetchFile = <T>(name: string, read: (data: unknown) => T): Promise<T> => {
+  let file = files.get(name) as Promise<T> | undefined;
+  if (!file) {
+    file = fetchJson(name).then(read);
+    file.catch(() => files.delete(name)); // let a later call retry
+    files.set(name, file);
+  }
+  return file;
+};
+
+const malformed = (name: string) =>
+  new Error(`${name} isn't part of a data bundle; re-run dashboard_bundle.py`);
+
+/**
+ * The bundle omits empty fields to keep the files small; fill them back in
+ */
+export const expandBook = (record: Partial<Book>): Book => ({
+  original_text: '',
+  title: '',
+  author: '',
+  year_read: 0,
+  format: 'unknown',
+  pages: 0,
+  published_year: '',
+  categories: [],
+  description: '',
+  rating: null as unknown as number, // unrated, as in the exported JSON
+  personal_tags: [],
+  notes: '',
+  favorite_quotes: [],
+  date_finished: null,
+  ...record,
+});
+
+/**
+ * The summary the dashboard draws from, via bundle.json (always revalidated)
+ */
+export const loadSummary = async (): Promise<BundleSummary> => {
+  const manifest = await fetchJson('bundle.json', { cache: 'no-cache' });
+  if (!isManifest(manifest)) {
+    throw malformed('bundle.json');
+  }
+  if (manifest.version !== BUNDLE_VERSION) {
+    throw new Error(
+      `Data bundle version ${manifest.version}, expected ${BUNDLE_VERSION}; re-run dashboard_bundle.py`
+    );
+  }
+  return fetchFile(manifest.summary, data => {
+    if (!isSummary(data)) throw malformed(manifest.summary);
+    return data;
+  });
+};
+
+/**
+ * The books of one year's shard (fetched once, then shared by every page)
+ */
+export const loadYear = (year: BundleYear): Promise<Book[]> =>
+  fetchFile(year.file, data => {
+    if (!isShard(data)) throw malformed(year.file);
+    return data.books.map(expandBook);
+  });
+
+/**
+ * The books of the given years, or of every year
+ */
+export const loadBooks = async (summary: BundleSummary, years?: number[]): Promise<Book[]> => {
+  const wanted = years
+    ? summary.years.filter(entry => entry.year !== null && years.includes(entry.year))
+    : summary.years;
+  const shards = await Promise.all(wanted.map(loadYear));
+  return shards.flat();
+};
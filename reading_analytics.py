@@ -0,0 +1,291 @@
+import json
+import math
+import sys
+from datetime import date, timedelta
+from typing import TYPE_CHECKING, Dict, Optional
+
+from book_store import atomic_write_json, data_fingerprint, load_books
+from reading_timeline import finished_days
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Bump when the analytics layout changes so stored files are recomputed
+ANALYTICS_VERSION = 1
+# Years compared for reading velocity, and the windows rolled over the years and days
+VELOCITY_YEARS = 3
+YEAR_WINDOW = 3
+DAY_WINDOWS = (30, 365)
+MILESTONE = 100
+
+EPOCH = date(1970, 1, 1)
+
+
+def analytics_path(data_file):
+    return f"{data_file}.analytics.json"
+
+
+def _day(day) -> Optional[str]:
+    try:
+        return None if day is None else (EPOCH + timedelta(days=int(day))).isoformat()
+    except OverflowError:  # a milestone at a snail's pace lands past year 9999
+        return None
+
+
+def _runs(present: 'np.ndarray'):
+    """(starts, lengths) of the runs of True in a boolean array"""
+    import numpy as np
+
+    edges = np.diff(np.concatenate([[0], present.astype(np.int8), [0]]))
+    starts = np.flatnonzero(edges == 1)
+    return starts, np.flatnonzero(edges == -1) - starts
+
+
+def streaks(values: 'np.ndarray', alive_from: int) -> Dict:
+    """Longest and current run of consecutive integers (years or days) among ``values``
+
+    Presence is one bincount over the span, so this is O(n + span) with no
+    sorting. The current streak is the last run, if it reaches ``alive_from``
+    (e.g. last year, or yesterday); the most recent of equally long runs wins.
+    """
+    import numpy as np
+
+    empty = {'length': 0, 'start': None, 'end': None}
+    if not len(values):
+        return {'longest': empty, 'current': dict(empty)}
+    first = int(values.min())
+    present = np.bincount(values - first, minlength=int(values.max()) - first + 1) > 0
+    starts, lengths = _runs(present)
+
+    def run(i):
+        start = first + int(starts[i])
+        return {'length': int(lengths[i]), 'start': start, 'end': start + int(lengths[i]) - 1}
+
+    longest = run(len(lengths) - 1 - int(np.argmax(lengths[::-1])))
+    current = run(len(lengths) - 1)
+    return {'longest': longest, 'current': current if current['end'] >= alive_from else dict(empty)}
+
+
+def _window_sums(counts: 'np.ndarray', window: int) -> 'np.ndarray':
+    """Sums of ``counts`` over every ``window`` in a row (ending at each index), via one cumsum"""
+    import numpy as np
+
+    totals = np.concatenate([[0], np.cumsum(counts)])
+    ends = np.arange(1, len(counts) + 1)
+    return totals[ends] - totals[np.maximum(ends - window, 0)]
+
+
+def compute_analytics(year_read, pages, finished_day, today: Optional[date] = None) -> Dict:
+    """Streaks, rolling windows, velocity and pace projections for a library, as plain JSON values
+
+    ``year_read``/``pages``/``finished_day`` are per-book columns (NaN where
+    unknown; finished_day as from reading_timeline.finished_days). Year
+    figures use every book; day streaks, day windows and the pace use the
+    dated ones. Everything is a bincount or cumsum over the span, O(n).
+    """
+    import numpy as np
+
+    today = today or date.today()
+    today_day = (today - EPOCH).days
+    years = np.asarray(year_read, dtype=np.float64)
+    pages = np.nan_to_num(np.asarray(pages, dtype=np.float64), nan=0.0)
+    days = np.asarray(finished_day, dtype=np.float64)
+    known = ~np.isnan(years)
+    dated = ~np.isnan(days)
+    years, year_pages = years[known].astype(np.int64), pages[known]
+    days, day_pages = days[dated].astype(np.int64), pages[dated]
+
+    result = {'books': int(known.sum()), 'dated_books': int(dated.sum()),
+              'computed_on': today.isoformat()}
+
+    # Years: streaks, per-year totals and rolling windows (gap years count as 0)
+    result['streaks'] = {'years': streaks(years, today.year - 1)}
+    per_year = []
+    if len(years):
+        first = int(years.min())
+        # Through last year even if no books since, so those years are complete (and 0)
+        span = max(int(years.max()), today.year - 1) - first + 1
+        books = np.bincount(years - first, minlength=span)
+        year_totals = np.bincount(years - first, weights=year_pages, minlength=span)
+        rolling_books = _window_sums(books, YEAR_WINDOW)
+        rolling_pages = _window_sums(year_totals, YEAR_WINDOW)
+        per_year = [{'year': first + i, 'books': int(books[i]), 'pages': int(year_totals[i]),
+                     f'books_{YEAR_WINDOW}y': int(rolling_books[i]),
+                     f'pages_{YEAR_WINDOW}y': int(rolling_pages[i])}
+                    for i in range(len(books))]
+    result['years'] = per_year
+
+    # Velocity over complete years: the last VELOCITY_YEARS against the ones before
+    complete = [y for y in per_year if y['year'] < today.year]
+    recent = complete[-VELOCITY_YEARS:]
+    previous = complete[-2 * VELOCITY_YEARS:-VELOCITY_YEARS]
+    velocity = {'recent_per_year': None, 'previous_per_year': None, 'change': None,
+                'trend_per_year': None}
+    if recent:
+        velocity['recent_per_year'] = sum(y['books'] for y in recent) / len(recent)
+    if previous:
+        velocity['previous_per_year'] = sum(y['books'] for y in previous) / len(previous)
+        if velocity['previous_per_year']:
+            velocity['change'] = velocity['recent_per_year'] / velocity['previous_per_year'] - 1
+    if len(complete) >= 2:
+        slope = np.polyfit([y['year'] for y in complete], [y['books'] for y in complete], 1)[0]
+        velocity['trend_per_year'] = float(slope)
+    result['velocity'] = velocity
+
+    # Days: streaks and the best (and latest) rolling windows of dated books
+    day_streaks = streaks(days, today_day - 1)
+    for run in day_streaks.values():
+        run['start'], run['end'] = _day(run['start']), _day(run['end'])
+    result['streaks']['days'] = day_streaks
+    windows = {}
+    if len(days):
+        first = int(days.min())
+        span = max(int(days.max()), today_day) - first + 1
+        books = np.bincount(days - first, minlength=span)
+        day_totals = np.bincount(days - first, weights=day_pages, minlength=span)
+        for window in DAY_WINDOWS:
+            rolling_books = _window_sums(books, window)
+            best = int(np.argmax(rolling_books))
+            windows[f'{window}_days'] = {
+                'best_books': int(rolling_books[best]), 'best_end': _day(first + best),
+                'latest_books': int(rolling_books[-1]),
+                'latest_pages': int(_window_sums(day_totals, window)[-1]),
+            }
+    result['windows'] = windows
+
+    # Pace: the last 365 days of dated books, else the recent yearly rate
+    if windows and windows['365_days']['latest_books']:
+        books_per_day = windows['365_days']['latest_books'] / 365
+        pages_per_day = windows['365_days']['latest_pages'] / 365
+        basis = 'last 365 days'
+    elif recent:
+        books_per_day = velocity['recent_per_year'] / 365
+        pages_per_day = sum(y['pages'] for y in recent) / len(recent) / 365
+        basis = f'last {len(recent)} complete years'
+    else:
+        books_per_day = pages_per_day = 0.0
+        basis = None
+    this_year = next((y for y in per_year if y['year'] == today.year), {'books': 0, 'pages': 0})
+    days_left = (date(today.year, 12, 31) - today).days
+    milestone = (result['books'] // MILESTONE + 1) * MILESTONE
+    result['projection'] = {
+        'basis': basis,
+        'books_per_day': books_per_day,
+        'year': today.year,
+        'books_so_far': this_year['books'],
+        'projected_books': round(this_year['books'] + books_per_day * days_left),
+        'projected_pages': round(this_year['pages'] + pages_per_day * days_left),
+        'next_milestone': milestone,
+        'milestone_date': _day(today_day + math.ceil((milestone - result['books']) / books_per_day))
+        if books_per_day else None,
+    }
+    return result
+
+
+def book_columns(books):
+    """(year_read, pages, finished_day) of a list of book dicts"""
+    import numpy as np
+
+    from book_parsing import parse_finished_dates
+
+    def number(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return np.nan
+
+    dates = [book.get('date_finished') for book in books]
+    # Older imports only have the date in the CSV text
+    missing = [i for i, value in enumerate(dates) if not value]
+    if missing:
+        parsed = parse_finished_dates([books[i].get('original_text') or '' for i in missing])
+        for i, value in zip(missing, parsed):
+            dates[i] = value
+    return ([number(book.get('year_read')) for book in books],
+            [number(book.get('pages')) for book in books], finished_days(dates))
+
+
+def library_columns(data_file='enhanced_books.json', books=None):
+    """(year_read, pages, finished_day) for a library: from its snapshot when fresh, else its books
+
+    Pass ``books`` when they're already loaded so they aren't read again.
+    """
+    from book_db import BookDatabase, is_database_path
+    from book_snapshot import read_snapshot
+
+    if books is None and is_database_path(data_file):
+        # Only the columns analytics reads, not whole books with their lists
+        db = BookDatabase(data_file)
+        try:
+            books = db.fields('year_read', 'pages', 'date_finished', 'original_text')
+        finally:
+            db.close()
+    df = read_snapshot(data_file) if books is None else None
+    if df is not None:
+        return df['year_read'], df['pages_numeric'], df['finished_day']
+    return book_columns(books if books is not None else load_books(data_file))
+
+
+def library_analytics(data_file='enhanced_books.json', today: Optional[date] = None,
+                      books=None) -> Dict:
+    return compute_analytics(*library_columns(data_file, books), today=today)
+
+
+def save_analytics(analytics: Dict, data_file, path=None):
+    """Store analytics stamped with the library files they were computed from"""
+    atomic_write_json(path or analytics_path(data_file), {
+        'version': ANALYTICS_VERSION,
+        'source': data_fingerprint(data_file),
+        'analytics': analytics,
+    }, indent=None)
+
+
+def stored_analytics(data_file='enhanced_books.json', today: Optional[date] = None) -> Optional[Dict]:
+    """The stored analytics if the library is unchanged and they're from today, else None"""
+    today = today or date.today()
+    try:
+        with open(analytics_path(data_file), 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+        if stored.get('version') == ANALYTICS_VERSION and \
+                stored.get('source') == data_fingerprint(data_file) and \
+                stored['analytics']['computed_on'] == today.isoformat():
+            return stored['analytics']
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+    return None
+
+
+def load_analytics(data_file='enhanced_books.json', today: Optional[date] = None,
+                   books=None) -> Dict:
+    """The stored analytics if the library is unchanged and they're from today, else recomputed (and saved)
+
+    Pass ``books`` when they're already loaded so recomputing doesn't read them again.
+    """
+    analytics = stored_analytics(data_file, today)
+    if analytics is not None:
+        return analytics
+
+    analytics = library_analytics(data_file, today, books)
+    try:
+        save_analytics(analytics, data_file)
+    except OSError as e:
+        print(f"⚠️  Couldn't save analytics: {e}")
+    return analytics
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Reading streaks, velocity and pace as JSON")
+    parser.add_argument('data_file', nargs='?', default='enhanced_books.json')
+    parser.add_argument('--output', help="where to write it (default: <data_file>.analytics.json)")
+    args = parser.parse_args()
+    try:
+        if args.output:
+            save_analytics(library_analytics(args.data_file), args.data_file, args.output)
+        else:
+            load_analytics(args.data_file)
+        print(f"✅ Reading analytics saved to {args.output or analytics_path(args.data_file)}")
+    except FileNotFoundError:
+        print(f"❌ {args.data_file} not found!")
+        sys.exit(1)
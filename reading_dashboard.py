@@ -1,98 +1,107 @@
-import json
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pandas as pd
-import numpy as np
-from collections import Counter, defaultdict
-from datetime import datetime
 import warnings
+import argparse
+import os
+from book_parsing import parse_finished_dates
+from book_snapshot import read_snapshot, typed_columns, write_snapshot
+from book_store import load_books
+from book_summary import ReadingSummary, load_summary
+from dashboard_panels import DEFAULT_CACHE_DIR, PANELS, PanelRenderer, apply_style, compose
+from dashboard_reports import FORMATS, ReportRenderer, reports_by_year
+from reading_analytics import compute_analytics
+from reading_timeline import MONTHS, finished_days, month_matrix
 warnings.filterwarnings('ignore')
 
-# Set up beautiful plotting style
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+# pandas, numpy, matplotlib and seaborn are imported where they're used, and the
+# plot style (dashboard_panels.apply_style) is set just before drawing, so
+# importing this module or asking for --help doesn't pay for them
 
 class ReadingAnalyzer:
     def __init__(self, json_file='enhanced_books.json'):
         self.json_file = json_file
-        self.books = []
+        self._books = None
         self.df = None
+        self.summary = None
         self.load_data()
-        
-    def load_data(self):
-        """Load and prepare data for analysis"""
-        with open(self.json_file, 'r', encoding='utf-8') as f:
-            self.books = json.load(f)
-        
-        # Convert to DataFrame for easier analysis
-        self.df = pd.DataFrame(self.books)
-        print(f"📊 Loaded {len(self.df)} books for analysis")
-        
-        # Add derived columns
-        self.df['has_rating'] = self.df['rating'].notna()
-        self.df['decade_read'] = (self.df['year_read'] // 10) * 10
-        self.df['pages_numeric'] = pd.to_numeric(self.df['pages'], errors='coerce')
-        
-        # Clean up categories
-        self.df['primary_genre'] = self.df['categories'].apply(
-            lambda x: x[0] if x and len(x) > 0 else 'Unknown'
-        )
     
-    def create_dashboard(self):
-        """Generate comprehensive reading dashboard"""
-        # Create a large figure with subplots
-        fig = plt.figure(figsize=(20, 24))
-        
-        # Main title
-        fig.suptitle('📚 YOUR READING JOURNEY (2011-2025)', 
-                    fontsize=24, fontweight='bold', y=0.98)
-        
-        # Grid layout: 6 rows, 2 columns
-        gs = fig.add_gridspec(6, 2, height_ratios=[1, 1, 1, 1, 1, 1], 
-                             width_ratios=[1, 1], hspace=0.3, wspace=0.2)
-        
-        # 1. Books per Year Timeline
-        ax1 = fig.add_subplot(gs[0, :])
-        self.plot_books_per_year(ax1)
+    @property
+    def books(self):
+        """The full book dicts - only read from JSON when the snapshot covered the analysis"""
+        if self._books is None:
+            self._books = load_books(self.json_file)
+        return self._books
         
-        # 2. Genre Distribution
-        ax2 = fig.add_subplot(gs[1, 0])
-        self.plot_genre_distribution(ax2)
-        
-        # 3. Page Count Analysis
-        ax3 = fig.add_subplot(gs[1, 1])
-        self.plot_page_analysis(ax3)
-        
-        # 4. Reading Intensity Heatmap
-        ax4 = fig.add_subplot(gs[2, :])
-        self.plot_reading_heatmap(ax4)
-        
-        # 5. Rating Analysis (if available)
-        ax5 = fig.add_subplot(gs[3, 0])
-        ax6 = fig.add_subplot(gs[3, 1])
-        self.plot_rating_analysis(ax5, ax6)
+    def load_data(self):
+        """Load and prepare data for analysis
         
-        # 6. Author Analysis
-        ax7 = fig.add_subplot(gs[4, 0])
-        self.plot_top_authors(ax7)
+        A fresh columnar snapshot (typed and derived columns, memory-mapped)
+        is used when there is one; otherwise the JSON is parsed and the
+        snapshot rewritten for next time.
+        """
+        import pandas as pd
+
+        self.df = read_snapshot(self.json_file)
+        if self.df is not None:
+            self._books = None
+            print(f"📊 Loaded {len(self.df)} books for analysis (snapshot)")
+        else:
+            self._books = load_books(self.json_file)
+            
+            # Convert to DataFrame for easier analysis
+            self.df = pd.DataFrame(self.books)
+            print(f"📊 Loaded {len(self.df)} books for analysis")
+            
+            # Add derived columns
+            self.df['has_rating'] = self.df['rating'].notna()
+            self.df['decade_read'] = (self.df['year_read'] // 10) * 10
+            self.df['pages_numeric'] = pd.to_numeric(self.df['pages'], errors='coerce')
+            
+            # Clean up categories (first category, or 'Unknown' for none)
+            self.df['primary_genre'] = self.df['categories'].str[0].fillna('Unknown')
+            
+            # Finish dates; older imports only have them in the CSV text's (MM.DD.YY)
+            dates = self.df.get('date_finished', pd.Series(None, index=self.df.index, dtype=object))
+            if 'original_text' in self.df:
+                dates = dates.where(dates.notna(), parse_finished_dates(self.df['original_text']))
+            self.df['finished_day'] = finished_days(dates)
+            # The same dtypes a snapshot load gives, so both share cached panels
+            typed_columns(self.df)
+            
+            try:
+                write_snapshot(self.df, self.json_file)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Couldn't write snapshot: {e}")
         
-        # 7. Reading Patterns
-        ax8 = fig.add_subplot(gs[4, 1])
-        self.plot_reading_patterns(ax8)
+        # Totals shared with quick_stats and the enhancer, stored next to the data
+        self.summary = load_summary(self.json_file, self._books)
+    
+    def create_dashboard(self, dpi=300, cache_dir=DEFAULT_CACHE_DIR, workers=None, show=True):
+        """Generate comprehensive reading dashboard
         
-        # 8. Summary Stats
-        ax9 = fig.add_subplot(gs[5, :])
-        self.plot_summary_stats(ax9)
+        Each panel is drawn on its own in a process pool and cached under a
+        hash of the columns it uses, so after editing a rating only the
+        rating panels are redrawn. The dashboard is stitched from the panels.
+        """
+        renderer = PanelRenderer(cache_dir, workers)
+        images = renderer.render(self.df, dpi=dpi, summary=self.summary)
+        print(f"🧩 {renderer.stats['rendered']} panels drawn, {renderer.stats['cached']} from cache")
         
         # Save the dashboard
-        plt.tight_layout()
-        plt.savefig('reading_dashboard.png', dpi=300, bbox_inches='tight')
-        plt.savefig('reading_dashboard.pdf', bbox_inches='tight')
+        renderer.save(images, ['reading_dashboard.png', 'reading_dashboard.pdf'], dpi)
         print("📈 Dashboard saved as 'reading_dashboard.png' and 'reading_dashboard.pdf'")
-        plt.show()
+        
+        if show:
+            import matplotlib.pyplot as plt
+
+            apply_style()
+            plt.figure(figsize=(20, 24))
+            plt.imshow(compose(images))
+            plt.axis('off')
+            plt.show()
     
     def plot_books_per_year(self, ax):
         """Plot books read per year with trend line"""
+        import numpy as np
+
         yearly_counts = self.df['year_read'].value_counts().sort_index()
         
         # Create bar plot
@@ -128,6 +137,9 @@ class ReadingAnalyzer:
     
     def plot_genre_distribution(self, ax):
         """Plot top genres as pie chart"""
+        import matplotlib.pyplot as plt
+        import numpy as np
+
         genre_counts = self.df['primary_genre'].value_counts().head(8)
         
         # Create pie chart with better colors
@@ -171,42 +183,36 @@ class ReadingAnalyzer:
             ax.set_title('📄 Book Length Distribution', fontsize=14, fontweight='bold')
     
     def plot_reading_heatmap(self, ax):
-        """Create reading intensity heatmap by year and month"""
-        # For now, we'll simulate monthly data since we don't have exact dates
-        # In the future, this could use actual reading dates
-        
-        years = sorted(self.df['year_read'].unique())
-        months = list(range(1, 13))
+        """Create reading intensity heatmap by year and month
         
-        # Create a matrix of reading intensity (simulated)
-        np.random.seed(42)  # For reproducible "random" data
-        yearly_totals = self.df['year_read'].value_counts()
-        
-        heatmap_data = []
-        for year in years:
-            year_total = yearly_totals.get(year, 0)
-            # Simulate monthly distribution (some months busier than others)
-            monthly_weights = np.random.dirichlet(np.ones(12)) * year_total
-            heatmap_data.append(monthly_weights)
-        
-        heatmap_matrix = np.array(heatmap_data)
+        Books with a finish date count in the month they were finished; only
+        undated books are spread over their year as an estimate.
+        """
+        undated = [float('nan')] * len(self.df)
+        heatmap_matrix, years, dated = month_matrix(self.df['year_read'],
+                                                    self.df.get('finished_day', undated))
         
         # Create heatmap
         im = ax.imshow(heatmap_matrix, cmap='YlOrRd', aspect='auto')
         
         # Set ticks and labels
         ax.set_xticks(range(12))
-        ax.set_xticklabels(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun',
-                           'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])
+        ax.set_xticklabels(MONTHS)
         ax.set_yticks(range(len(years)))
         ax.set_yticklabels(years)
         
-        ax.set_title('🔥 Reading Intensity Heatmap (Estimated)', fontsize=14, fontweight='bold')
+        if dated == len(self.df):
+            title = '🔥 Reading Intensity Heatmap'
+        elif dated:
+            title = f'🔥 Reading Intensity Heatmap ({dated / len(self.df):.0%} dated, rest estimated)'
+        else:
+            title = '🔥 Reading Intensity Heatmap (Estimated)'
+        ax.set_title(title, fontsize=14, fontweight='bold')
         ax.set_xlabel('Month')
         ax.set_ylabel('Year')
         
         # Add colorbar
-        cbar = plt.colorbar(im, ax=ax, shrink=0.8)
+        cbar = ax.figure.colorbar(im, ax=ax, shrink=0.8)
         cbar.set_label('Books Read', rotation=270, labelpad=15)
     
     def plot_rating_analysis(self, ax1, ax2):
@@ -269,6 +275,8 @@ class ReadingAnalyzer:
     
     def plot_reading_patterns(self, ax):
         """Analyze reading patterns"""
+        import pandas as pd
+
         # Books by decade published
         decade_counts = self.df['published_year'].apply(
             lambda x: (int(x) // 10) * 10 if pd.notna(x) and str(x).isdigit() else None
@@ -292,29 +300,33 @@ class ReadingAnalyzer:
     
     def plot_summary_stats(self, ax):
         """Display key summary statistics"""
+        import pandas as pd
+
         ax.axis('off')
         
+        # Precomputed totals; a panel drawn from a slice of the library sums up just that slice
+        summary = getattr(self, 'summary', None) or ReadingSummary.build(self.df.to_dict('records'))
+        
         # Calculate key stats
-        total_books = len(self.df)
-        years_reading = self.df['year_read'].max() - self.df['year_read'].min() + 1
+        total_books = summary.total
+        years_reading = summary.years_span
         avg_books_per_year = total_books / years_reading
         
-        total_pages = self.df['pages_numeric'].sum(skipna=True)
-        avg_pages = self.df['pages_numeric'].mean(skipna=True)
+        total_pages = summary.pages_total
+        avg_pages = summary.average_pages
         
-        rated_books = len(self.df[self.df['has_rating']])
-        avg_rating = self.df['rating'].mean(skipna=True) if rated_books > 0 else 0
+        rated_books = summary.rated
+        avg_rating = summary.average_rating
         
-        unique_authors = self.df['author'].nunique()
-        most_read_author = self.df['author'].value_counts().index[0]
-        most_read_count = self.df['author'].value_counts().iloc[0]
+        unique_authors = len(summary.authors)
+        most_read_author, most_read_count = summary.authors.most_common(1)[0]
         
         # Create stats text
         stats_text = f"""
         📊 READING STATISTICS SUMMARY
         
         🔢 Total Books Read: {total_books:,}
-        📅 Years of Reading: {years_reading} years ({self.df['year_read'].min()}-{self.df['year_read'].max()})
+        📅 Years of Reading: {years_reading} years ({summary.first_year}-{summary.last_year})
         📈 Average Books/Year: {avg_books_per_year:.1f}
         
         📄 Total Pages Read: {total_pages:,.0f} pages
@@ -332,13 +344,79 @@ class ReadingAnalyzer:
         ax.text(0.05, 0.95, stats_text, transform=ax.transAxes, fontsize=12,
                verticalalignment='top', fontfamily='monospace',
                bbox=dict(boxstyle="round,pad=1", facecolor="lightblue", alpha=0.8))
+        
+        # Streaks and pace from the same slice of books
+        undated = [float('nan')] * len(self.df)
+        analytics = compute_analytics(self.df['year_read'],
+                                      pd.to_numeric(self.df['pages'], errors='coerce'),
+                                      self.df.get('finished_day', undated))
+        longest = analytics['streaks']['years']['longest']
+        days_streak = analytics['streaks']['days']['longest']
+        velocity = analytics['velocity']
+        projection = analytics['projection']
+        lines = ["🔥 STREAKS & PACE", "",
+                 f"📆 Longest Streak: {longest['length']} years ({longest['start']}-{longest['end']})",
+                 f"⏳ Current Streak: {analytics['streaks']['years']['current']['length']} years"]
+        if days_streak['length'] > 1:
+            lines.append(f"📅 Most Days in a Row: {days_streak['length']} (ending {days_streak['end']})")
+        if velocity['recent_per_year'] is not None:
+            change = f" ({velocity['change']:+.0%})" if velocity['change'] is not None else ''
+            lines += ["", f"🚀 Last 3 Years: {velocity['recent_per_year']:.1f} books/year{change}"]
+        if projection['basis']:
+            lines.append(f"🎯 {projection['year']} Projection: {projection['projected_books']} books, "
+                         f"{projection['projected_pages']:,} pages")
+        pace_text = "\n" + "\n".join(f"        {line}" for line in lines) + "\n"
+        
+        ax.text(0.55, 0.95, pace_text, transform=ax.transAxes, fontsize=12,
+               verticalalignment='top', fontfamily='monospace',
+               bbox=dict(boxstyle="round,pad=1", facecolor="lightyellow", alpha=0.8))
 
-def main():
+def render_reports(args):
+    """Headless mode: no window, just report files for each library (or each year)"""
+    renderer = ReportRenderer(args.out_dir, args.formats, args.dpi, args.panels,
+                              track_memory=args.trace_memory)
+    
+    def reports():
+        for data_file in args.data_files:
+            analyzer = ReadingAnalyzer(data_file)
+            name = os.path.splitext(os.path.basename(data_file))[0]
+            if args.by == 'year':
+                yield from reports_by_year(name, analyzer.df)
+            else:
+                yield name, analyzer.df, analyzer.summary
+    
+    renderer.render_all(reports())
+
+def main(argv=None):
     """Generate the reading dashboard"""
+    parser = argparse.ArgumentParser(description="Reading stats dashboard")
+    parser.add_argument('data_files', nargs='*', default=['enhanced_books.json'],
+                        help="one or more libraries (one report each in headless mode)")
+    parser.add_argument('--headless', action='store_true',
+                        help="write report files only - no window, no fixed PNG+PDF pair")
+    parser.add_argument('--formats', default='png', help=f"comma separated: {', '.join(FORMATS)}")
+    parser.add_argument('--dpi', type=int, default=150)
+    parser.add_argument('--panels', help=f"comma separated subset of: {', '.join(PANELS)}")
+    parser.add_argument('--by', choices=['library', 'year'], default='library',
+                        help="one report per library or one per year read")
+    parser.add_argument('--out-dir', default='reports')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="also report each report's tracemalloc peak (slower)")
+    args = parser.parse_args(argv)
+    
+    if args.headless:
+        try:
+            render_reports(args)
+        except FileNotFoundError as e:
+            print(f"❌ {e.filename} not found!")
+        except ValueError as e:
+            print(f"❌ {e}")
+        return
+    
     print("🎨 Generating your Reading Stats Dashboard...")
     
     try:
-        analyzer = ReadingAnalyzer()
+        analyzer = ReadingAnalyzer(args.data_files[0])
         analyzer.create_dashboard()
         
         print(f"\n🎉 Dashboard complete!")
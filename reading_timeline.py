@@ -0,0 +1,83 @@
+from typing import TYPE_CHECKING, List, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+# Seed of the monthly estimate for books without a date (the old heatmap's)
+ESTIMATE_SEED = 42
+
+
+def finished_days(date_finished) -> 'np.ndarray':
+    """Days since 1970-01-01 of 'YYYY-MM-DD' dates as floats, NaN for missing or unparsable ones"""
+    import numpy as np
+    import pandas as pd
+
+    dates = pd.to_datetime(pd.Series(date_finished, dtype=object), format='%Y-%m-%d',
+                           errors='coerce')
+    days = dates.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]')
+    return np.where(np.isnat(days), np.nan, days.astype(np.int64).astype(np.float64))
+
+
+def _dates(finished_day) -> Tuple['np.ndarray', 'np.ndarray']:
+    """(dated mask, datetime64[D] dates of the dated books) of a finished_day column"""
+    import numpy as np
+
+    days = np.asarray(finished_day, dtype=np.float64)
+    dated = ~np.isnan(days)
+    return dated, days[dated].astype(np.int64).astype('datetime64[D]')
+
+
+def _year_rows(years, first, span) -> 'np.ndarray':
+    """Which of the years first..first+span-1 occur in ``years`` (a bincount, no sorting)"""
+    import numpy as np
+
+    return np.bincount(years - first, minlength=span) > 0
+
+
+def month_matrix(year_read, finished_day) -> Tuple['np.ndarray', List[int], int]:
+    """Books per (year, month) as a years x 12 matrix, the years, and how many books were dated
+
+    Dated books are counted in the month they were finished (one bincount
+    over months since 1970). Books without a date are spread over their
+    year_read with the old seeded Dirichlet estimate, so a library with no
+    dates gives the same matrix as before.
+    """
+    import numpy as np
+
+    dated, dates = _dates(finished_day)
+    months = dates.astype('datetime64[M]').astype(np.int64)  # since 1970-01
+    undated_years = np.asarray(year_read, dtype=np.float64)[~dated]
+    undated_years = undated_years[~np.isnan(undated_years)].astype(np.int64)
+    all_years = np.concatenate([months // 12 + 1970, undated_years])
+    if not len(all_years):
+        return np.zeros((0, 12)), [], 0
+
+    first = int(all_years.min())
+    span = int(all_years.max()) - first + 1
+    rows = _year_rows(all_years, first, span)
+    counts = np.bincount(months - (first - 1970) * 12, minlength=span * 12)
+    counts = counts.reshape(span, 12)[rows].astype(np.float64)
+    undated = np.bincount(undated_years - first, minlength=span)[rows]
+    if undated.any():
+        weights = np.random.RandomState(ESTIMATE_SEED).dirichlet(np.ones(12), size=len(counts))
+        counts += weights * undated[:, None]
+    return counts, [int(year) for year in np.flatnonzero(rows) + first], int(dated.sum())
+
+
+def day_matrix(finished_day) -> Tuple['np.ndarray', List[int]]:
+    """Dated books per (year, day of year) as a years x 366 matrix (histogram2d), and the years"""
+    import numpy as np
+
+    _, dates = _dates(finished_day)
+    if not len(dates):
+        return np.zeros((0, 366)), []
+    years = dates.astype('datetime64[Y]')
+    day_of_year = (dates - years).astype(np.int64)
+    years = years.astype(np.int64) + 1970
+    first = int(years.min())
+    span = int(years.max()) - first + 1
+    matrix, _, _ = np.histogram2d(years - first, day_of_year, bins=[span, 366],
+                                  range=[[0, span], [0, 366]])
+    rows = _year_rows(years, first, span)
+    return matrix[rows], [int(year) for year in np.flatnonzero(rows) + first]
@@ -0,0 +1,229 @@
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from book_enrichment import RETRY_STATUSES, TokenBucket, make_session
+from book_matching import match_books
+from book_store import atomic_write_json, open_store
+
+READWISE_URL = "https://readwise.io/api/v2"
+DEFAULT_STATE_FILE = '.readwise_sync.json'
+PAGE_SIZE = 1000
+
+
+def empty_state():
+    return {'watermark': None, 'pending': None, 'books': {}}
+
+
+def merge_quotes(quotes, highlights) -> List[str]:
+    """Existing quotes plus any highlight texts not already among them"""
+    merged = list(quotes or [])
+    seen = set(merged)
+    for text in highlights:
+        if text and text not in seen:
+            merged.append(text)
+            seen.add(text)
+    return merged
+
+
+class ReadwiseSync:
+    """Incremental Readwise export: changed books, then their highlights in parallel
+
+    Everything fetched is kept in a small state file next to the library.
+    A sync remembers when it started; the next one only asks Readwise for
+    books and highlights updated after that (``updated__gt``). An interrupted
+    sync leaves its book list in the state file and picks up where it stopped.
+    """
+
+    def __init__(self, token: str, state_file: str = DEFAULT_STATE_FILE,
+                 base_url: str = READWISE_URL, workers: int = 4, rate: float = 3.0,
+                 retries: int = 3, timeout: float = 30, checkpoint_every: int = 25):
+        self.headers = {"Authorization": f"Token {token}"}
+        self.state_file = state_file
+        self.base_url = base_url.rstrip('/')
+        self.workers = workers
+        self.retries = retries
+        self.timeout = timeout
+        self.checkpoint_every = checkpoint_every
+        self.limiter = TokenBucket(rate)
+        self.session = make_session(workers)
+        self.stats = {'requests': 0, 'retries': 0, 'books': 0, 'highlights': 0}
+        self._lock = threading.Lock()
+        self.state = self.load_state()
+
+    def load_state(self) -> Dict:
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return empty_state()
+
+    def save_state(self):
+        with self._lock:
+            atomic_write_json(self.state_file, self.state)
+
+    def _get(self, url: str, params: Optional[Dict] = None) -> Dict:
+        """GET one page, waiting out 429s (Retry-After) and retrying server errors"""
+        import requests
+
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            with self._lock:
+                self.stats['requests'] += 1
+            try:
+                response = self.session.get(url, params=params, headers=self.headers,
+                                            timeout=self.timeout)
+            except requests.RequestException as e:
+                response, error, wait = None, e, 2 ** attempt
+            if response is not None:
+                if response.status_code not in RETRY_STATUSES:
+                    # A bad token (401) or request won't get better: fail on the first one
+                    response.raise_for_status()
+                    return response.json()
+                error = f"HTTP {response.status_code}"
+                wait = float(response.headers.get('Retry-After', 2 ** attempt))
+
+            if attempt < self.retries:
+                with self._lock:
+                    self.stats['retries'] += 1
+                time.sleep(wait)
+
+        raise RuntimeError(f"gave up on {url} after {self.retries + 1} attempts ({error})")
+
+    def _pages(self, path: str, params: Dict):
+        """Yield every result of a paginated endpoint, following the ``next`` cursors"""
+        url, params = f"{self.base_url}/{path}/", dict(params, page_size=PAGE_SIZE)
+        while url:
+            page = self._get(url, params)
+            yield from page.get('results', [])
+            # ``next`` is a complete URL that already carries the query string
+            url, params = page.get('next'), None
+
+    def changed_books(self, since: Optional[str]) -> List[Dict]:
+        params = {'updated__gt': since} if since else {}
+        return list(self._pages('books', params))
+
+    def book_highlights(self, book_id, since: Optional[str]) -> List[Dict]:
+        params = {'book_id': book_id}
+        if since:
+            params['updated__gt'] = since
+        return list(self._pages('highlights', params))
+
+    def _store_book(self, rw_book: Dict, highlights: List[Dict]):
+        with self._lock:
+            key = str(rw_book['id'])
+            stored = self.state['books'].setdefault(key, {'highlights': {}})
+            stored.update(title=rw_book.get('title'), author=rw_book.get('author'),
+                          category=rw_book.get('category'))
+            for highlight in highlights:
+                if highlight.get('is_deleted'):
+                    stored['highlights'].pop(str(highlight['id']), None)
+                else:
+                    stored['highlights'][str(highlight['id'])] = highlight.get('text')
+            stored['num_highlights'] = len(stored['highlights'])
+            self.state['pending']['done'].append(key)
+            self.stats['books'] += 1
+            self.stats['highlights'] += len(highlights)
+
+    def sync(self) -> List[str]:
+        """Pull everything changed since the last sync; returns the Readwise ids of changed books"""
+        pending = self.state.get('pending')
+        if pending:
+            print(f"🔁 Resuming sync started {pending['started']}")
+        else:
+            started = datetime.now(timezone.utc).isoformat()
+            books = self.changed_books(self.state.get('watermark'))
+            pending = {'started': started, 'since': self.state.get('watermark'),
+                       'books': books, 'done': []}
+            self.state['pending'] = pending
+            self.save_state()
+
+        done = set(pending['done'])
+        todo = [b for b in pending['books'] if str(b['id']) not in done]
+        print(f"📥 {len(pending['books'])} changed books, {len(todo)} left to fetch")
+
+        errors = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.book_highlights, b['id'], pending['since']): b
+                       for b in todo}
+            for count, future in enumerate(as_completed(futures), 1):
+                rw_book = futures[future]
+                if future.cancelled():
+                    continue
+                try:
+                    self._store_book(rw_book, future.result())
+                except Exception as e:
+                    errors.append(e)
+                    print(f"❌ Highlights for '{rw_book.get('title')}' failed: {e}")
+                    # Likely an outage or rate limit - stop here rather than fail every book
+                    for other in futures:
+                        other.cancel()
+                if count % self.checkpoint_every == 0:
+                    self.save_state()
+
+        if errors:
+            # Keep the pending list so the next run only retries what's missing
+            self.save_state()
+            left = len(pending['books']) - len(pending['done'])
+            raise RuntimeError(f"stopped with {left} books left; run the sync again to resume")
+
+        changed = [str(b['id']) for b in pending['books']]
+        self.state['watermark'] = pending['started']
+        self.state['pending'] = None
+        self.save_state()
+        return changed
+
+    def apply_to_books(self, books: List[Dict], threshold: float = 0.8) -> List[Dict]:
+        """Copy synced highlights onto matching library dicts; returns the ones that changed"""
+        synced = list(self.state['books'].values())
+        matches = match_books([(b.get('title'), b.get('author')) for b in books],
+                              [(rw.get('title'), rw.get('author')) for rw in synced],
+                              threshold)
+        changed = []
+        for match in matches:
+            book, rw_book = books[match.book_index], synced[match.source_index]
+            quotes = merge_quotes(book.get('favorite_quotes'), rw_book['highlights'].values())
+            if (quotes != book.get('favorite_quotes')
+                    or book.get('readwise_highlights_count') != rw_book['num_highlights']):
+                book['favorite_quotes'] = quotes
+                book['readwise_highlights_count'] = rw_book['num_highlights']
+                changed.append(book)
+        return changed
+
+    def close(self):
+        self.session.close()
+
+
+def main(data_file='enhanced_books.json'):
+    token = os.environ.get('READWISE_TOKEN')
+    if not token:
+        print("❌ Set READWISE_TOKEN to your Readwise access token")
+        return
+
+    store = open_store(data_file)
+    books = store.load(repair=True)
+    syncer = ReadwiseSync(token, state_file=os.path.join(
+        os.path.dirname(os.path.abspath(data_file)), DEFAULT_STATE_FILE))
+    try:
+        changed = syncer.sync()
+        print(f"✅ Synced {len(changed)} books, {syncer.stats['highlights']} highlights "
+              f"({syncer.stats['requests']} requests)")
+    except Exception as e:
+        print(f"❌ Readwise sync stopped: {e}")
+    finally:
+        syncer.close()
+
+    updated = syncer.apply_to_books(books)
+    for book in updated:
+        store.record(book, 'favorite_quotes', 'readwise_highlights_count')
+    store.flush()
+    print(f"📚 Updated highlights on {len(updated)} of {len(books)} books")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else 'enhanced_books.json')
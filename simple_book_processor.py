@@ -1,108 +1,99 @@
 import pandas as pd
+import hashlib
 import json
+import os
 import requests
 import time
 from datetime import datetime
+from book_enrichment import (GOOGLE_BOOKS_URL, EnrichmentEngine, book_info_from_volume,
+                             empty_book_info)
+from book_parsing import clean_book_title_author, parse_book_column  # noqa: F401 (re-export)
+from book_providers import PROVIDERS, MetadataResolver, make_resolver
+from book_store import JSON_STYLES, atomic_write_json, iter_books, load_books, replace_books
+from lookup_cache import DEFAULT_CACHE_FILE, LookupCache, normalize_query, trim_volume_info
 
-def clean_book_title_author(book_text):
-    """
-    Parse your book format - adjust this based on how your data looks
-    Examples it handles:
-    - "Master of the Senate: Years of Lyndon B Johnson by Robert Caro (Book 3) (08.13.24)"
-    - "A Walk in the Woods by Bill Bryson (audio) (08.13.24)"
-    """
-    # Remove date at the end if present
-    book_text = book_text.strip()
-    
-    # Remove dates like (08.13.24) or (MM.DD.YY)
-    import re
-    book_text = re.sub(r'\s*\(\d{1,2}\.\d{1,2}\.\d{2,4}\)\s*$', '', book_text)
-    
-    # Check if it's audio
-    is_audio = '(audio)' in book_text.lower()
-    book_text = book_text.replace('(audio)', '').replace('(Audio)', '')
-    
-    # Split by "by"
-    if ' by ' in book_text:
-        title, author = book_text.split(' by ', 1)
-        title = title.strip()
-        author = author.strip()
-        
-        # Clean up any remaining parentheses for series info
-        author = re.sub(r'\s*\([^)]*\)\s*$', '', author).strip()
-    else:
-        title = book_text.strip()
-        author = "Unknown"
-    
-    return {
-        'title': title,
-        'author': author,
-        'format': 'audio' if is_audio else 'unknown'
-    }
+# Fields you fill in by hand - an incremental import never overwrites these
+USER_FIELDS = ('rating', 'personal_tags', 'notes', 'favorite_quotes', 'date_finished')
 
-def get_book_info_from_api(title, author):
-    """Get additional info from Google Books API"""
+def get_book_info_from_api(title, author, base_url=GOOGLE_BOOKS_URL, cache=None):
+    """Get additional info from Google Books API (one book at a time)"""
+    if cache is not None:
+        hit, volume_info = cache.get(normalize_query(title, author))
+        if hit:
+            return book_info_from_volume(volume_info)
+    
     try:
         # Create search query
         query = f"{title} {author}".replace(' ', '+')
-        url = f"https://www.googleapis.com/books/v1/volumes?q={query}&maxResults=1"
+        url = f"{base_url}?q={query}&maxResults=1"
         
         response = requests.get(url, timeout=5)
         time.sleep(0.5)  # Be nice to the API
         
         if response.status_code == 200:
             data = response.json()
-            if data.get('totalItems', 0) > 0:
-                book_info = data['items'][0]['volumeInfo']
-                
-                return {
-                    'pages': book_info.get('pageCount'),
-                    'published_year': book_info.get('publishedDate', '').split('-')[0] if book_info.get('publishedDate') else None,
-                    'categories': book_info.get('categories', []),
-                    'description': book_info.get('description', '')[:500] + '...' if book_info.get('description') else None
-                }
+            volume_info = data['items'][0]['volumeInfo'] if data.get('totalItems', 0) > 0 else None
+            if cache is not None:
+                cache.put(normalize_query(title, author), trim_volume_info(volume_info))
+            return book_info_from_volume(volume_info)
     except Exception as e:
         print(f"API error for '{title}': {e}")
     
-    return {'pages': None, 'published_year': None, 'categories': [], 'description': None}
+    return empty_book_info()
 
-def process_books_csv(csv_file_path):
-    """Main function to process your CSV"""
-    print(f"Reading CSV file: {csv_file_path}")
+def read_source_rows(df):
+    """Collect (book_text, year_read) for every non-empty CSV row"""
+    # Adjust column names if needed
+    book_texts = df['Book'].map(str) if 'Book' in df.columns else pd.Series('', index=df.index)
+    years = df['Year'] if 'Year' in df.columns else pd.Series(2024, index=df.index)
     
-    try:
-        df = pd.read_csv(csv_file_path)
-        print(f"Found {len(df)} rows in CSV")
-        print("Column names:", df.columns.tolist())
-        print("\nFirst few rows:")
-        print(df.head())
-        
-    except Exception as e:
-        print(f"Error reading CSV: {e}")
-        return
+    empty = (book_texts == '') | (book_texts == 'nan')
+    for index in book_texts.index[empty]:
+        print(f"Skipping empty row {index + 1}")
+    
+    return list(zip(book_texts[~empty].tolist(), years[~empty].tolist()))
+
+def make_engine(workers=8, rate=5.0, cache=None, providers=None, mode='concurrent'):
+    """Google Books lookups, or with ``providers`` (e.g. ['google', 'openlibrary']) a MetadataResolver"""
+    if providers:
+        return make_resolver(providers, mode=mode, rate=rate, workers=workers, cache=cache)
+    return EnrichmentEngine(workers=workers, rate=rate, cache=cache)
+
+def print_engine_stats(engine):
+    if isinstance(engine, MetadataResolver):
+        print(engine.report())
+    else:
+        print(f"API requests: {engine.stats['requests']} "
+              f"(retries: {engine.stats['retries']}, failures: {engine.stats['failures']})")
+
+def build_books(rows, workers=8, rate=5.0, cache_file=DEFAULT_CACHE_FILE, engine=None,
+                providers=None, mode='concurrent'):
+    """Parse and enrich (book_text, year_read) rows into book records, keeping row order"""
+    # Parse every row first so the API lookups can run as one batch
+    parsed_rows = parse_book_column([book_text for book_text, _ in rows]).to_dict('records')
+    
+    # Get additional info from API (optional - pass workers=0 to skip)
+    if engine is not None and rows:
+        # Caller owns a long-lived engine (e.g. across streaming chunks)
+        api_results = engine.enrich_all([(p['title'], p['author']) for p in parsed_rows])
+    elif workers and rows:
+        print(f"\nLooking up {len(rows)} books with {workers} workers...")
+        cache = LookupCache(cache_file) if cache_file else None
+        engine = make_engine(workers, rate, cache, providers, mode)
+        try:
+            api_results = engine.enrich_all([(p['title'], p['author']) for p in parsed_rows])
+        finally:
+            engine.close()
+            if cache is not None:
+                print(cache.summary())
+                cache.close()
+        print_engine_stats(engine)
+    else:
+        api_results = [empty_book_info() for _ in rows]
     
-    # Process each book
     enhanced_books = []
     
-    for index, row in df.iterrows():
-        print(f"\nProcessing book {index + 1}/{len(df)}")
-        
-        # Get book info from your format
-        book_text = str(row.get('Book', ''))  # Adjust column name if needed
-        year_read = row.get('Year', 2024)     # Adjust column name if needed
-        
-        if not book_text or book_text == 'nan':
-            print(f"Skipping empty row {index + 1}")
-            continue
-        
-        print(f"Processing: {book_text}")
-        
-        # Parse title and author
-        parsed = clean_book_title_author(book_text)
-        
-        # Get additional info from API (optional - comment out if too slow)
-        api_info = get_book_info_from_api(parsed['title'], parsed['author'])
-        
+    for (book_text, year_read), parsed, api_info in zip(rows, parsed_rows, api_results):
         # Combine all info
         book_data = {
             'original_text': book_text,
@@ -114,12 +105,14 @@ def process_books_csv(csv_file_path):
             'published_year': api_info['published_year'],
             'categories': api_info['categories'],
             'description': api_info['description'],
+            'isbn': api_info['isbn'],
             # Placeholder fields for you to fill later
             'rating': None,
             'personal_tags': [],
             'notes': '',
             'favorite_quotes': [],
-            'date_finished': None
+            # From the (MM.DD.YY) in the CSV text, when there is one
+            'date_finished': parsed['date_finished']
         }
         
         enhanced_books.append(book_data)
@@ -128,10 +121,229 @@ def process_books_csv(csv_file_path):
     
     return enhanced_books
 
-def save_results(books_data, output_file='enhanced_books.json'):
-    """Save the results to JSON file"""
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(books_data, f, indent=2, ensure_ascii=False)
+def read_csv(csv_file_path):
+    """Load the CSV and show a preview, or return None if it can't be read"""
+    print(f"Reading CSV file: {csv_file_path}")
+    
+    try:
+        df = pd.read_csv(csv_file_path)
+        print(f"Found {len(df)} rows in CSV")
+        print("Column names:", df.columns.tolist())
+        print("\nFirst few rows:")
+        print(df.head())
+        return df
+        
+    except Exception as e:
+        print(f"Error reading CSV: {e}")
+        return None
+
+def process_books_csv(csv_file_path, workers=8, rate=5.0, cache_file=DEFAULT_CACHE_FILE,
+                      providers=None, mode='concurrent'):
+    """Main function to process your CSV (API lookups run in parallel, rows stay in order)"""
+    df = read_csv(csv_file_path)
+    if df is None:
+        return
+    
+    return build_books(read_source_rows(df), workers=workers, rate=rate, cache_file=cache_file,
+                       providers=providers, mode=mode)
+
+def row_fingerprint(book_text, year_read):
+    """Fingerprint a source row by its original text plus year"""
+    try:
+        year = str(int(float(year_read)))
+    except (TypeError, ValueError):
+        year = str(year_read)
+    return hashlib.sha1(f"{str(book_text).strip()}\x1f{year}".encode('utf-8')).hexdigest()
+
+def _book_key(book):
+    return (str(book.get('title', '')).lower(), str(book.get('author', '')).lower())
+
+def process_books_csv_incremental(csv_file_path, output_file='enhanced_books.json',
+                                  workers=8, rate=5.0, cache_file=DEFAULT_CACHE_FILE,
+                                  providers=None, mode='concurrent'):
+    """Only parse and enrich CSV rows that are new or changed since the last import
+    
+    Rows whose fingerprint is already in ``output_file`` keep their existing
+    record untouched. A changed row that still parses to the same title and
+    author inherits that book's ratings, tags, notes, quotes and dates.
+    Records no CSV row points at (e.g. books added by hand) are kept at the end.
+    """
+    try:
+        existing = load_books(output_file, repair=True)
+    except FileNotFoundError:
+        existing = []
+    
+    df = read_csv(csv_file_path)
+    if df is None:
+        return
+    
+    by_fingerprint = {}
+    for i, book in enumerate(existing):
+        by_fingerprint.setdefault(row_fingerprint(book.get('original_text', ''), book.get('year_read')), i)
+    
+    merged = []
+    used = set()
+    delta_positions = []
+    delta_rows = []
+    
+    for book_text, year_read in read_source_rows(df):
+        i = by_fingerprint.get(row_fingerprint(book_text, year_read))
+        if i is not None and i not in used:
+            used.add(i)
+            merged.append(existing[i])
+        else:
+            delta_positions.append(len(merged))
+            delta_rows.append((book_text, year_read))
+            merged.append(None)
+    
+    print(f"\n🔁 {len(merged) - len(delta_rows)} unchanged rows, {len(delta_rows)} new or changed")
+    new_books = build_books(delta_rows, workers=workers, rate=rate, cache_file=cache_file,
+                            providers=providers, mode=mode)
+    
+    # Changed rows that still describe a known book keep what you entered by hand
+    leftovers = {}
+    for i, book in enumerate(existing):
+        if i not in used:
+            leftovers.setdefault(_book_key(book), i)
+    
+    carried = 0
+    for position, book in zip(delta_positions, new_books):
+        i = leftovers.pop(_book_key(book), None)
+        if i is not None:
+            used.add(i)
+            for field in USER_FIELDS:
+                if existing[i].get(field):
+                    book[field] = existing[i][field]
+            carried += 1
+        merged[position] = book
+    
+    kept = [book for i, book in enumerate(existing) if i not in used]
+    merged.extend(kept)
+    
+    print(f"Carried personal fields over to {carried} changed rows, "
+          f"kept {len(kept)} records not in the CSV")
+    return merged
+
+def csv_source(csv_file_path):
+    """The CSV's path, size and mtime, so a streaming run resumes only against the same file"""
+    stat = os.stat(csv_file_path)
+    return {'path': os.path.abspath(csv_file_path), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def process_books_csv_streaming(csv_file_path, output_file='enhanced_books.json', chunksize=500,
+                                workers=8, rate=5.0, cache_file=DEFAULT_CACHE_FILE, style='indent',
+                                providers=None, mode='concurrent'):
+    """Process a large CSV chunk by chunk, writing each finished chunk to disk as it goes
+    
+    Finished books are appended to ``<output>.partial.ndjson`` (one per line,
+    fsynced per chunk). After each chunk a progress marker records the CSV
+    rows consumed and the partial file's length, replaced atomically, so a
+    crashed run keeps its completed chunks and resumes after them: anything
+    written past the recorded length is cut off first. The marker also
+    records the CSV's path, size and mtime; a different CSV starts over.
+    The final JSON array is then written from that file without loading it.
+    """
+    partial_file = f"{output_file}.partial.ndjson"
+    progress_file = f"{output_file}.partial.progress"
+    try:
+        source = csv_source(csv_file_path)
+    except OSError as e:
+        print(f"Error reading CSV: {e}")
+        return None
+    
+    progress = None
+    if os.path.exists(partial_file) and os.path.exists(progress_file):
+        try:
+            with open(progress_file, 'r', encoding='utf-8') as f:
+                progress = json.load(f)
+            progress = progress if isinstance(progress, dict) and progress.get('source') == source \
+                else None
+        except ValueError:
+            progress = None
+        if progress is None:
+            print(f"⚠️  {progress_file} is from another CSV (or unreadable); starting over")
+    
+    rows_done = progress['rows'] if progress else 0
+    with open(partial_file, 'r+b' if progress else 'wb') as f:
+        # Drop books written after the last recorded chunk (a crash before its marker landed)
+        f.truncate(progress['bytes'] if progress else 0)
+    if progress:
+        print(f"↪️  Resuming after {rows_done} CSV rows already in {partial_file}")
+    
+    print(f"Streaming CSV file: {csv_file_path} ({chunksize} rows per chunk)")
+    try:
+        chunks = pd.read_csv(csv_file_path, chunksize=chunksize,
+                             skiprows=range(1, rows_done + 1) if rows_done else None)
+    except Exception as e:
+        print(f"Error reading CSV: {e}")
+        return None
+    
+    cache = LookupCache(cache_file) if (workers and cache_file) else None
+    engine = make_engine(workers, rate, cache, providers, mode) if workers else None
+    try:
+        with open(partial_file, 'a', encoding='utf-8') as out:
+            for chunk in chunks:
+                books = build_books(read_source_rows(chunk), workers=0, engine=engine)
+                for book in books:
+                    out.write(json.dumps(book, ensure_ascii=False) + '\n')
+                out.flush()
+                os.fsync(out.fileno())
+                
+                rows_done += len(chunk)
+                atomic_write_json(progress_file, {'rows': rows_done,
+                                                  'bytes': os.fstat(out.fileno()).st_size,
+                                                  'source': source}, indent=None)
+                print(f"💾 {rows_done} CSV rows done")
+    finally:
+        if engine is not None:
+            engine.close()
+            print_engine_stats(engine)
+        if cache is not None:
+            print(cache.summary())
+            cache.close()
+    
+    # Turn the NDJSON lines into the library file, one book at a time
+    count = replace_books(output_file, iter_books(partial_file), style)
+    os.remove(partial_file)
+    os.remove(progress_file)
+    
+    print(f"\n✅ Streamed {count} books to {output_file}")
+    return count
+
+def reenrich_books(output_file='enhanced_books.json', workers=8, rate=5.0,
+                   cache_file=DEFAULT_CACHE_FILE, providers=None, mode='concurrent', style='indent'):
+    """Refresh the looked-up fields of an existing library, ISBN first
+    
+    Books with an ISBN are fetched in batches by ISBN; only the rest are
+    searched by title and author. Your ratings and notes are untouched.
+    """
+    books = load_books(output_file, repair=True)
+    cache = LookupCache(cache_file) if cache_file else None
+    resolver = make_resolver(providers or ('google', 'openlibrary'), mode=mode, rate=rate,
+                             workers=max(1, workers), cache=cache)
+    print(f"\nRe-enriching {len(books)} books ({sum(1 for b in books if b.get('isbn'))} with an ISBN)...")
+    try:
+        results = resolver.enrich_all([(b.get('title'), b.get('author'), b.get('isbn')) for b in books])
+    finally:
+        resolver.close()
+        if cache is not None:
+            cache.close()
+    print(resolver.report())
+    
+    updated = 0
+    for book, api_info in zip(books, results):
+        changed = {field: value for field, value in api_info.items()
+                   if value and value != book.get(field)}
+        if changed:
+            book.update(changed)
+            updated += 1
+    
+    replace_books(output_file, books, style)
+    print(f"\n✅ Updated {updated} of {len(books)} books in {output_file}")
+    return books
+
+def save_results(books_data, output_file='enhanced_books.json', style='indent'):
+    """Save the results to JSON file, one book at a time (``style``: indent, compact or ndjson)"""
+    replace_books(output_file, books_data, style)
     
     print(f"\n✅ Saved {len(books_data)} books to {output_file}")
 
@@ -162,17 +374,53 @@ def print_summary(books_data):
 
 # MAIN EXECUTION
 if __name__ == "__main__":
-    # CHANGE THIS to your CSV file path
-    csv_file = "my_books.csv"  # ← Change this to your file name
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Convert your reading CSV into enhanced_books.json")
+    # CHANGE THIS default to your CSV file path (or pass it on the command line)
+    parser.add_argument('csv_file', nargs='?', default="my_books.csv")
+    parser.add_argument('--incremental', action='store_true',
+                        help="only process new/changed rows and keep your ratings and notes")
+    parser.add_argument('--stream', action='store_true',
+                        help="process very large files chunk by chunk, writing as it goes")
+    parser.add_argument('--reenrich', action='store_true',
+                        help="refresh pages, genres etc. of enhanced_books.json (by ISBN where known)")
+    parser.add_argument('--chunksize', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=8, help="parallel API lookups (0 = skip API)")
+    parser.add_argument('--providers',
+                        help="comma separated metadata providers to combine (google, openlibrary); "
+                             "default is Google Books only")
+    parser.add_argument('--failover', action='store_true',
+                        help="ask --providers in order until pages and genres are found, "
+                             "instead of all at once")
+    parser.add_argument('--json-style', choices=JSON_STYLES, default='indent',
+                        help="indented JSON (default), compact JSON or one book per line")
+    args = parser.parse_args()
+    csv_file = args.csv_file
+    providers = [p.strip() for p in args.providers.split(',')] if args.providers else None
+    if providers and any(p not in PROVIDERS for p in providers):
+        parser.error(f"--providers: choose from {', '.join(PROVIDERS)}")
+    lookup = {'providers': providers, 'mode': 'failover' if args.failover else 'concurrent'}
     
     print("🚀 Starting book data processing...")
     
     # Process the CSV
-    books = process_books_csv(csv_file)
+    if args.reenrich:
+        books = None
+        reenrich_books(workers=args.workers, style=args.json_style, **lookup)
+    elif args.stream:
+        # Books go straight to disk, so there's no in-memory list to summarise
+        books = None
+        process_books_csv_streaming(csv_file, chunksize=args.chunksize, workers=args.workers,
+                                    style=args.json_style, **lookup)
+    elif args.incremental:
+        books = process_books_csv_incremental(csv_file, workers=args.workers, **lookup)
+    else:
+        books = process_books_csv(csv_file, workers=args.workers, **lookup)
     
     if books:
         # Save results
-        save_results(books)
+        save_results(books, style=args.json_style)
         
         # Print summary
         print_summary(books)
@@ -182,5 +430,5 @@ if __name__ == "__main__":
         print(f"1. Open enhanced_books.json to see your data")
         print(f"2. Add ratings and personal notes")
         print(f"3. We can build the web interface!")
-    else:
+    elif not (args.stream or args.reenrich):
         print("❌ No books were processed. Check your CSV file and column names.")
@@ -0,0 +1,98 @@
+"""The HTTP API end to end: filters, pagination bounds, ETag/304, gzip and reloading."""
+import gzip
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('numpy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import book_api  # noqa: E402
+from book_api import make_server  # noqa: E402
+from book_store import write_books  # noqa: E402
+
+
+def library(count):
+    return [{'title': f"Book {i}", 'author': f"Author {i % 4}", 'year_read': 2020 + i % 3,
+             'rating': [4.5, 4, None][i % 3], 'pages': 100 + i, 'categories': ['Fiction'],
+             'description': 'x' * 50} for i in range(count)]
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    monkeypatch.setattr(book_api, 'RELOAD_CHECK_SECONDS', 0)
+    path = str(tmp_path / 'books.json')
+    write_books(path, library(120))
+    server = make_server(path, port=0)
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+
+    def get(url, **headers):
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        conn.request('GET', url, headers=headers)
+        response = conn.getresponse()
+        body = response.read()
+        conn.close()
+        return response, body
+    get.path, get.server = path, server
+    yield get
+    server.shutdown()
+    server.server_close()
+
+
+def test_rating_filter_takes_half_stars(api):
+    response, body = api('/books?rating=4.5&per_page=500')
+    assert response.status == 200
+    books = json.loads(body)['books']
+    assert len(books) == 40 and all(book['rating'] == 4.5 for book in books)
+    assert json.loads(api('/books?rating=4&per_page=500')[1])['total'] == 40
+    assert api('/books?rating=four')[0].status == 400
+
+
+@pytest.mark.parametrize('query', ['page=0', 'per_page=0', f"per_page={book_api.MAX_PAGE_SIZE + 1}",
+                                   'page=x'])
+def test_pagination_bounds(api, query):
+    assert api(f"/books?{query}")[0].status == 400
+
+
+def test_last_page_and_past_the_end(api):
+    last = json.loads(api('/books?per_page=50&page=3')[1])
+    assert (last['pages'], last['total'], len(last['books'])) == (3, 120, 20)
+    assert json.loads(api('/books?per_page=50&page=4')[1])['books'] == []
+
+
+def test_etag_revalidates_with_304(api):
+    response, body = api('/stats')
+    etag = response.getheader('ETag')
+    assert response.status == 200 and body
+
+    response, body = api('/stats', **{'If-None-Match': etag})
+    assert response.status == 304 and body == b''
+    assert api('/stats', **{'If-None-Match': '"other"'})[0].status == 200
+
+
+def test_gzip_only_when_accepted(api):
+    response, body = api('/books', **{'Accept-Encoding': 'gzip'})
+    assert response.getheader('Content-Encoding') == 'gzip'
+    plain_response, plain = api('/books')
+    assert plain_response.getheader('Content-Encoding') is None
+    assert gzip.decompress(body) == plain
+    assert response.getheader('ETag') == plain_response.getheader('ETag')
+
+
+def test_edited_library_is_reloaded(api):
+    etag = api('/stats')[0].getheader('ETag')
+    write_books(api.path, library(130))
+
+    deadline = time.time() + 5
+    while api.server.library.reloads == 0 and time.time() < deadline:
+        api('/')
+        time.sleep(0.01)
+    response, body = api('/stats', **{'If-None-Match': etag})
+    assert response.status == 200
+    assert json.loads(body)['total'] == 130
@@ -0,0 +1,59 @@
+"""The SQLite store's stats path: aggregate queries must add up to the same summary as the books."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import book_db  # noqa: E402
+from book_db import BookDatabase  # noqa: E402
+from book_summary import ReadingSummary, load_summary  # noqa: E402
+
+BOOKS = [
+    {'title': 'Dune', 'author': 'Frank Herbert', 'year_read': 2021, 'pages': 412, 'rating': 5,
+     'categories': ['Fiction', 'Science Fiction'], 'original_text': 'Dune by Frank Herbert (03.04.21)'},
+    {'title': 'Emma', 'author': 'Jane Austen', 'year_read': 2019, 'pages': 474, 'rating': 4.5,
+     'categories': ['Classics', 'Fiction']},
+    {'title': 'Persuasion', 'author': 'Jane Austen', 'year_read': 2021, 'pages': 0, 'rating': None,
+     'categories': ['Classics'], 'date_finished': '2021-08-01'},
+    {'title': 'Untitled', 'author': '', 'year_read': None, 'categories': []},
+    {'title': 'Walden', 'author': 'Henry David Thoreau', 'year_read': 2022, 'pages': 412, 'rating': 5,
+     'categories': ['Nature', 'Classics'], 'personal_tags': ['slow'], 'favorite_quotes': ['Simplify']},
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = str(tmp_path / 'books.db')
+    database = BookDatabase(path)
+    database.import_books(BOOKS)
+    yield database
+    database.close()
+
+
+def test_aggregate_summary_matches_one_built_from_the_books(db):
+    assert db.summary().to_dict() == ReadingSummary.build(db.all_books()).to_dict()
+
+    db.update_book(db.books_by_titles(['Persuasion'])[0]['id'], rating=3, categories=['Romance'])
+    assert db.summary().to_dict() == ReadingSummary.build(db.all_books()).to_dict()
+
+
+def test_stats_path_loads_no_books(db, monkeypatch):
+    def no_rows(*args, **kwargs):
+        raise AssertionError("loaded whole books")
+    monkeypatch.setattr(book_db.BookDatabase, '_query', no_rows)
+
+    summary = load_summary(db.path)
+    assert (summary.total, summary.rated, summary.years[2021]) == (5, 3, 2)
+    assert summary.genres.most_common(1) == [('Classics', 3)]
+
+
+def test_analytics_reads_only_its_columns(db, monkeypatch):
+    pytest.importorskip('numpy')
+    from reading_analytics import book_columns, library_columns
+
+    expected = [list(column) for column in book_columns(db.all_books())]
+    monkeypatch.setattr(book_db.BookDatabase, '_query', lambda *a, **k: pytest.fail("loaded whole books"))
+    got = [list(column) for column in library_columns(db.path)]
+    assert str(got) == str(expected)  # NaN-safe
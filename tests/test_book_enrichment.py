@@ -0,0 +1,61 @@
+"""Google Books retries: only rate limiting, server errors and network errors are retried."""
+import json
+import os
+import sys
+
+import pytest
+
+requests = pytest.importorskip('requests')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_enrichment import EnrichmentEngine  # noqa: E402
+
+
+def response(status, body=None):
+    r = requests.Response()
+    r.status_code = status
+    r._content = json.dumps(body or {}).encode()
+    return r
+
+
+class FakeSession:
+    """Replays ``replies`` (responses, or exceptions to raise) and counts the requests"""
+
+    def __init__(self, *replies):
+        self.replies, self.requests = list(replies), 0
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        reply = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+def engine(*replies):
+    e = EnrichmentEngine(workers=1, rate=1000, retries=3, backoff=0)
+    e.session = FakeSession(*replies)
+    return e
+
+
+@pytest.mark.parametrize('status', [400, 401, 403, 404])
+def test_client_errors_fail_without_retrying(status):
+    e = engine(response(status))
+    with pytest.raises(requests.HTTPError):
+        e._request_volume_info('Dune', 'Frank Herbert')
+    assert e.session.requests == 1
+    assert e.stats['retries'] == 0
+
+
+def test_transient_errors_are_retried():
+    volume = {'totalItems': 1, 'items': [{'volumeInfo': {'title': 'Dune'}}]}
+    e = engine(response(503), requests.ConnectionError('reset'), response(200, volume))
+    assert e._request_volume_info('Dune', 'Frank Herbert') == {'title': 'Dune'}
+    assert e.session.requests == 3
+
+
+def test_gives_up_after_the_retries():
+    e = engine(response(429))
+    with pytest.raises(RuntimeError, match='HTTP 429'):
+        e._request_volume_info('Dune', 'Frank Herbert')
+    assert e.session.requests == 4
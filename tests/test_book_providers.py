@@ -0,0 +1,110 @@
+"""MetadataResolver over stub providers: coalescing, ISBN batching, caching; HTTP retries."""
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_providers import GoogleBooksProvider, MetadataResolver, StubProvider  # noqa: E402
+from lookup_cache import LookupCache  # noqa: E402
+
+DUNE = {'title': 'Dune', 'author': 'Frank Herbert', 'pages': 412, 'categories': ['Fiction']}
+
+
+def isbn(i):
+    return f"978{i:010d}"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LookupCache(str(tmp_path / 'cache.sqlite'), negative_ttl_days=0)
+    yield cache
+    cache.close()
+
+
+def test_simultaneous_lookups_share_one_resolution():
+    release = threading.Event()
+
+    def answer(title, author, isbn):
+        release.wait(5)
+        return DUNE
+    stub = StubProvider('stub', answer)
+    resolver = MetadataResolver([stub], workers=4)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(resolver.resolve('Dune', 'Frank Herbert')))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    deadline = time.time() + 5
+    while resolver.stats['coalesced'] < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert stub.calls == 1
+    assert resolver.stats['coalesced'] == 3
+    assert [result['pages'] for result in results] == [412] * 4
+
+
+def test_isbns_are_looked_up_in_batches_first():
+    records = {isbn(i): dict(DUNE, title=f"Book {i}") for i in range(120)}
+    batched = StubProvider('openlibrary', records, batch_size=50)
+    single = StubProvider('google', records)
+    resolver = MetadataResolver([single, batched], workers=2)
+
+    results = resolver.resolve_many([(f"Book {i}", 'Frank Herbert', isbn(i)) for i in range(120)])
+    assert batched.calls == 3
+    assert single.calls == 0  # the batches already had pages and genres
+    assert all(result['pages'] == 412 for result in results)
+    assert resolver.stats['by_isbn'] == 120
+
+
+def test_no_match_is_cached_with_the_negative_ttl(cache):
+    stub = StubProvider('stub', {})
+    resolver = MetadataResolver([stub], cache=cache)
+
+    assert resolver.resolve('Unknown', 'Nobody')['sources'] == {}
+    assert cache.conn.execute("SELECT value FROM lookups").fetchone() == (None,)
+    resolver.resolve('Unknown', 'Nobody')
+    assert stub.calls == 2  # the miss expired (negative TTL 0); a hit would not have
+
+
+def test_match_is_cached_with_the_full_ttl(cache):
+    stub = StubProvider('stub', {isbn(1): DUNE}, batch_size=50)
+    resolver = MetadataResolver([stub], cache=cache)
+
+    resolver.resolve_many([('Dune', 'Frank Herbert', isbn(1))])
+    assert resolver.resolve_many([('Dune', 'Frank Herbert', isbn(1))])[0]['pages'] == 412
+    assert stub.calls == 1
+
+
+def test_failed_lookup_is_not_cached(cache):
+    stub = StubProvider('stub', {}, error_rate=1.0)
+    resolver = MetadataResolver([stub], cache=cache)
+
+    resolver.resolve('Dune', 'Frank Herbert')
+    assert cache.conn.execute("SELECT COUNT(*) FROM lookups").fetchone() == (0,)
+
+
+def test_http_client_errors_are_not_retried():
+    requests = pytest.importorskip('requests')
+    sent = []
+
+    class Session:
+        def get(self, url, **kwargs):
+            sent.append(url)
+            response = requests.Response()
+            response.status_code = 403
+            response._content = json.dumps({}).encode()
+            return response
+
+    provider = GoogleBooksProvider(rate=1000, retries=3, backoff=0)
+    provider.session = Session()
+    with pytest.raises(requests.HTTPError):
+        provider.search('Dune', 'Frank Herbert')
+    assert len(sent) == 1
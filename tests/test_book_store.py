@@ -0,0 +1,123 @@
+"""Crash injection for the journaled store: kill a write between its steps, then load what's on disk."""
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import book_store  # noqa: E402
+from book_store import JournaledBookStore, load_books, replace_books, write_books  # noqa: E402
+
+
+class Crash(Exception):
+    pass
+
+
+def crash_on(monkeypatch, name):
+    """Make ``os.<name>`` inside book_store raise, as if the process died right there"""
+    def die(*args, **kwargs):
+        raise Crash(name)
+    monkeypatch.setattr(book_store.os, name, die)
+
+
+@pytest.fixture
+def library(tmp_path):
+    path = str(tmp_path / 'books.json')
+    write_books(path, [{'title': 'A'}, {'title': 'B'}])
+    return path
+
+
+def titles(books):
+    return [book['title'] for book in books]
+
+
+def journal_lines(path):
+    with open(book_store.journal_path(path), encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def edited_store(path):
+    """A writer with an added book and a rating buffered, then flushed to the journal"""
+    store = JournaledBookStore(path, backup_retention=0)
+    books = store.load(repair=True)
+    store.add({'title': 'C'})
+    books[0]['rating'] = 5
+    store.record(books[0], 'rating')
+    store.flush(compact=False)
+    return store
+
+
+def test_journal_replays_on_load(library):
+    edited_store(library)
+    assert journal_lines(library)[0]['op'] == 'base'
+    books = load_books(library)
+    assert titles(books) == ['A', 'B', 'C']
+    assert books[0]['rating'] == 5
+
+
+def test_crash_after_compacted_file_lands(library, monkeypatch):
+    store = edited_store(library)
+    crash_on(monkeypatch, 'remove')  # the journal can't be dropped
+    with pytest.raises(Crash):
+        store.compact()
+    monkeypatch.undo()
+
+    assert os.path.exists(book_store.journal_path(library))
+    books = load_books(library)
+    assert titles(books) == ['A', 'B', 'C']  # not A, B, C, C
+    assert books[0]['rating'] == 5
+
+    # The writer moves the stale journal aside and starts a fresh one
+    store = JournaledBookStore(library)
+    books = store.load(repair=True)
+    assert not os.path.exists(book_store.journal_path(library))
+    books[1]['rating'] = 2
+    store.record(books[1], 'rating')
+    store.flush(compact=False)
+    assert [book.get('rating') for book in load_books(library)] == [5, 2, None]
+
+
+def test_crash_before_compacted_file_lands(library, monkeypatch):
+    store = edited_store(library)
+    crash_on(monkeypatch, 'replace')  # the new file never replaces the old one
+    with pytest.raises(Crash):
+        store.compact()
+    monkeypatch.undo()
+
+    books = load_books(library)
+    assert titles(books) == ['A', 'B', 'C']
+    assert books[0]['rating'] == 5
+
+
+def test_crash_after_replace_books_reorders(library, monkeypatch):
+    edited_store(library)
+    crash_on(monkeypatch, 'remove')
+    with pytest.raises(Crash):
+        replace_books(library, [{'title': 'Z'}, {'title': 'A', 'rating': 5}])
+    monkeypatch.undo()
+
+    # The index-based rating edit must not land on Z
+    assert load_books(library) == [{'title': 'Z'}, {'title': 'A', 'rating': 5}]
+
+
+def test_torn_line_only_cut_by_the_writer(library):
+    edited_store(library)
+    journal = book_store.journal_path(library)
+    with open(journal, 'a', encoding='utf-8') as f:
+        f.write('{"op": "add", "book": {"ti')  # an append still in progress
+    size = os.path.getsize(journal)
+
+    assert titles(load_books(library)) == ['A', 'B', 'C']
+    assert os.path.getsize(journal) == size
+
+    JournaledBookStore(library).load(repair=True)
+    assert os.path.getsize(journal) < size
+    assert titles(load_books(library)) == ['A', 'B', 'C']
+
+
+def test_unstamped_journal_still_replays(library):
+    with open(book_store.journal_path(library), 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'op': 'set', 'index': 1, 'fields': {'rating': 4}}) + '\n')
+    assert load_books(library)[1]['rating'] == 4
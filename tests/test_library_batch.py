@@ -0,0 +1,59 @@
+"""Batch stats over a directory of libraries: discovery, bad files, and the map/merge step."""
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('numpy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from book_summary import ReadingSummary  # noqa: E402
+from library_batch import CohortSummary, batch_stats, discover_libraries, run_batch  # noqa: E402
+
+
+def library(reader, count):
+    return [{'title': f"{reader} book {i}", 'author': f"Author {i % 3}", 'year_read': 2018 + i % 5,
+             'pages': 100 + 10 * i, 'rating': i % 5 + 1 if i % 2 else None,
+             'genres': ['Fiction' if i % 2 else 'History']} for i in range(count)]
+
+
+@pytest.fixture
+def readers(tmp_path):
+    """A directory with two library files, one reader subdirectory and a stray notes.json"""
+    libraries = {'ann': library('ann', 12), 'bob': library('bob', 7), 'cy': library('cy', 3)}
+    for name in ('ann', 'bob'):
+        with open(tmp_path / f"{name}.json", 'w', encoding='utf-8') as f:
+            json.dump(libraries[name], f)
+    (tmp_path / 'cy').mkdir()
+    with open(tmp_path / 'cy' / 'enhanced_books.json', 'w', encoding='utf-8') as f:
+        json.dump(libraries['cy'], f)
+    with open(tmp_path / 'notes.json', 'w', encoding='utf-8') as f:
+        json.dump({'x': 1}, f)
+    return str(tmp_path), libraries
+
+
+def test_stray_json_is_an_error_row_not_a_reader(readers):
+    source, libraries = readers
+    report = run_batch(source, workers=1)
+
+    rows = {row['name']: row for row in report['libraries']}
+    assert set(rows) == {'ann', 'bob', 'cy', 'notes'}
+    assert "isn't a library" in rows['notes']['error']
+    assert report['cohort']['readers'] == 3
+    assert report['cohort']['books'] == 22
+
+
+def test_merged_partial_cohorts_match_a_single_pass(readers):
+    source, libraries = readers
+    single = CohortSummary()
+    for books in libraries.values():
+        single.add(ReadingSummary.build(books))
+
+    found = [entry for entry in discover_libraries(source) if entry[0] != 'notes']
+    _, one_worker = batch_stats(found, workers=1)
+    rows, two_workers = batch_stats(found, workers=2)
+
+    assert [row['name'] for row in rows] == ['ann', 'bob', 'cy']
+    assert one_worker.to_dict() == single.to_dict()
+    assert two_workers.to_dict() == single.to_dict()
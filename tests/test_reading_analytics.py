@@ -0,0 +1,34 @@
+"""Year figures in compute_analytics: years without books up to last year count as 0."""
+import math
+import os
+import sys
+from datetime import date
+
+import pytest
+
+pytest.importorskip('numpy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reading_analytics import compute_analytics  # noqa: E402
+
+
+def analytics(years, today):
+    return compute_analytics(years, [300] * len(years), [math.nan] * len(years), today=today)
+
+
+def test_empty_years_since_the_last_book_are_complete_years():
+    result = analytics([2018, 2019, 2020, 2021, 2022], date(2026, 6, 1))
+
+    assert [y['year'] for y in result['years']] == list(range(2018, 2026))
+    assert [y['books'] for y in result['years']][-3:] == [0, 0, 0]
+    assert result['velocity']['recent_per_year'] == 0
+    assert result['velocity']['previous_per_year'] == 1
+    assert result['velocity']['change'] == -1
+    assert result['projection']['basis'] == 'last 3 complete years'
+    assert result['projection']['projected_books'] == 0
+    assert result['projection']['milestone_date'] is None
+
+
+def test_years_stop_at_the_current_year():
+    result = analytics([2024, 2026], date(2026, 6, 1))
+    assert [(y['year'], y['books']) for y in result['years']] == [(2024, 1), (2025, 0), (2026, 1)]
@@ -0,0 +1,63 @@
+"""Readwise requests: a bad token fails at once, rate limits and server errors are retried."""
+import json
+import os
+import sys
+
+import pytest
+
+requests = pytest.importorskip('requests')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import readwise_sync  # noqa: E402
+from readwise_sync import ReadwiseSync  # noqa: E402
+
+
+def response(status, body=None, headers=None):
+    r = requests.Response()
+    r.status_code = status
+    r._content = json.dumps(body or {}).encode()
+    r.headers.update(headers or {})
+    return r
+
+
+class FakeSession:
+    """Replays ``replies`` (responses, or exceptions to raise) and counts the requests"""
+
+    def __init__(self, *replies):
+        self.replies, self.requests = list(replies), 0
+
+    def get(self, url, **kwargs):
+        self.requests += 1
+        reply = self.replies.pop(0) if len(self.replies) > 1 else self.replies[0]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    waited = []
+    monkeypatch.setattr(readwise_sync.time, 'sleep', waited.append)
+    return waited
+
+
+def syncer(tmp_path, *replies):
+    s = ReadwiseSync('token', state_file=str(tmp_path / 'state.json'), rate=1000)
+    s.session = FakeSession(*replies)
+    return s
+
+
+def test_bad_token_fails_without_retrying(tmp_path, sleeps):
+    s = syncer(tmp_path, response(401))
+    with pytest.raises(requests.HTTPError):
+        s._get('https://readwise.io/api/v2/books/')
+    assert s.session.requests == 1
+    assert sleeps == []
+
+
+def test_rate_limits_and_network_errors_are_retried(tmp_path, sleeps):
+    s = syncer(tmp_path, response(429, headers={'Retry-After': '7'}),
+               requests.ConnectionError('reset'), response(200, {'results': []}))
+    assert s._get('https://readwise.io/api/v2/books/') == {'results': []}
+    assert s.session.requests == 3
+    assert sleeps == [7.0, 2]
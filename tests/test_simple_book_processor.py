@@ -0,0 +1,117 @@
+"""CSV imports: a streaming resume neither repeats nor skips rows; a re-import keeps your edits."""
+import json
+import os
+import sys
+
+import pytest
+
+pytest.importorskip('pandas')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import simple_book_processor  # noqa: E402
+from book_store import load_books, write_books  # noqa: E402
+from simple_book_processor import (  # noqa: E402
+    process_books_csv_incremental, process_books_csv_streaming)
+
+
+class Crash(Exception):
+    pass
+
+
+def write_csv(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('Book,Year\n' + ''.join(f"Title {i} by Author {i},2024\n" for i in range(rows)))
+
+
+def stream(csv_file, output):
+    """Titles in the library a full 10-rows-a-chunk run writes"""
+    process_books_csv_streaming(csv_file, output, chunksize=10, workers=0)
+    with open(output, encoding='utf-8') as f:
+        return [book['title'] for book in json.load(f)]
+
+
+def crash_before_marker(csv_file, output, monkeypatch, marker):
+    """Run the import until it dies just before writing progress marker number ``marker``"""
+    real, calls = simple_book_processor.atomic_write_json, []
+
+    def write_marker(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == marker:
+            raise Crash()
+        return real(*args, **kwargs)
+    monkeypatch.setattr(simple_book_processor, 'atomic_write_json', write_marker)
+    with pytest.raises(Crash):
+        process_books_csv_streaming(csv_file, output, chunksize=10, workers=0)
+    monkeypatch.undo()
+
+
+def test_resume_after_chunk_written_without_its_marker(tmp_path, monkeypatch):
+    csv_file, output = str(tmp_path / 'books.csv'), str(tmp_path / 'out.json')
+    write_csv(csv_file, 25)
+    crash_before_marker(csv_file, output, monkeypatch, 2)
+    # And a torn line past the last marker, as from a crash mid-write
+    with open(f"{output}.partial.ndjson", 'a', encoding='utf-8') as f:
+        f.write('{"title": "Tit')
+
+    assert stream(csv_file, output) == [f"Title {i}" for i in range(25)]
+    assert not os.path.exists(f"{output}.partial.progress")
+
+
+def test_resume_against_another_csv_starts_over(tmp_path, monkeypatch):
+    csv_file, output = str(tmp_path / 'books.csv'), str(tmp_path / 'out.json')
+    write_csv(csv_file, 25)
+    crash_before_marker(csv_file, output, monkeypatch, 3)
+    write_csv(csv_file, 30)
+
+    assert stream(csv_file, output) == [f"Title {i}" for i in range(30)]
+
+
+def write_rows(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('Book,Year\n' + ''.join(f'"{text}",{year}\n' for text, year in rows))
+
+
+def reimport(csv_file, output):
+    books = process_books_csv_incremental(csv_file, output, workers=0)
+    write_books(output, books)
+    return books
+
+
+def test_reimport_keeps_personal_fields(tmp_path):
+    csv_file, output = str(tmp_path / 'books.csv'), str(tmp_path / 'books.json')
+    write_rows(csv_file, [('Dune by Frank Herbert', 2021), ('Emma by Jane Austen', 2019),
+                          ('Walden by Henry David Thoreau', 2022)])
+    reimport(csv_file, output)
+
+    # Edits by hand: a rating and notes, tags, quotes, and a book not in the CSV
+    books = load_books(output)
+    books[0].update(rating=5, notes='Reread it')
+    books[1].update(personal_tags=['classic'], rating=4)
+    books[2].update(favorite_quotes=['Simplify, simplify.'])
+    books.append({'title': 'Handwritten', 'author': 'Me', 'year_read': 2020, 'rating': 3})
+    write_books(output, books)
+    unchanged_dune = dict(books[0])
+
+    # Reordered, one row edited (now an audiobook), one new row
+    write_rows(csv_file, [('Walden by Henry David Thoreau', 2022), ('Dune by Frank Herbert', 2021),
+                          ('Emma by Jane Austen (audio)', 2019), ('Ulysses by James Joyce', 2023)])
+    books = reimport(csv_file, output)
+
+    assert [book['title'] for book in books] == ['Walden', 'Dune', 'Emma', 'Ulysses', 'Handwritten']
+    assert books[0]['favorite_quotes'] == ['Simplify, simplify.']
+    assert books[1] == unchanged_dune
+    assert books[2]['format'] == 'audio'
+    assert (books[2]['rating'], books[2]['personal_tags']) == (4, ['classic'])
+    assert books[3].get('rating') is None and not books[3].get('personal_tags')
+    assert books[4] == {'title': 'Handwritten', 'author': 'Me', 'year_read': 2020, 'rating': 3}
+
+
+def test_reimport_of_an_unchanged_csv_changes_nothing(tmp_path):
+    csv_file, output = str(tmp_path / 'books.csv'), str(tmp_path / 'books.json')
+    write_rows(csv_file, [('Dune by Frank Herbert', 2021), ('Dune by Frank Herbert', 2021)])
+    reimport(csv_file, output)
+    books = load_books(output)
+    books[1]['rating'] = 2
+    write_books(output, books)
+
+    assert reimport(csv_file, output) == books